@@ -0,0 +1,29 @@
+"""Index events for reminders
+
+Revision ID: 07c945a152fc
+Revises: 83df8794532a
+Create Date: 2026-10-17 05:09:25.310411
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "07c945a152fc"
+down_revision: Union[str, Sequence[str], None] = "83df8794532a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_events_start_at", "events", ["start_at"], unique=False)
+    op.create_index("ix_events_synced_at", "events", ["synced_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_events_synced_at", table_name="events")
+    op.drop_index("ix_events_start_at", table_name="events")
@@ -0,0 +1,36 @@
+"""Back off failed channel renewals
+
+Revision ID: 32ed8c274f92
+Revises: 89c248d2f047
+Create Date: 2026-10-17 05:30:23.882345
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "32ed8c274f92"
+down_revision: Union[str, Sequence[str], None] = "89c248d2f047"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "sync_states",
+        sa.Column("renewal_failures", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "sync_states",
+        sa.Column("renewal_retry_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("sync_states", "renewal_retry_at")
+    op.drop_column("sync_states", "renewal_failures")
@@ -0,0 +1,41 @@
+"""Sync states per calendar
+
+Revision ID: 83df8794532a
+Revises: 83ed098afea3
+Create Date: 2026-10-17 05:01:38.776552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "83df8794532a"
+down_revision: Union[str, Sequence[str], None] = "83ed098afea3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "sync_states",
+        sa.Column("calendar_id", sa.String(), server_default="primary", nullable=False),
+    )
+    op.drop_constraint(op.f("uq_sync_states_user_id"), "sync_states", type_="unique")
+    op.create_unique_constraint(
+        "uq_sync_states_user_calendar", "sync_states", ["user_id", "calendar_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_sync_states_user_calendar", "sync_states", type_="unique")
+    # Only the primary calendar fits the per-user constraint
+    op.execute("DELETE FROM sync_states WHERE calendar_id <> 'primary'")
+    op.create_unique_constraint(
+        op.f("uq_sync_states_user_id"), "sync_states", ["user_id"]
+    )
+    op.drop_column("sync_states", "calendar_id")
@@ -0,0 +1,28 @@
+"""Add sync_jobs.traceparent
+
+Revision ID: 83ed098afea3
+Revises: da99a8e39f10
+Create Date: 2026-10-17 04:51:58.511990
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "83ed098afea3"
+down_revision: Union[str, Sequence[str], None] = "da99a8e39f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("sync_jobs", sa.Column("traceparent", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("sync_jobs", "traceparent")
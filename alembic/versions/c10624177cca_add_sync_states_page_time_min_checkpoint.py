@@ -0,0 +1,28 @@
+"""Add sync_states.page_time_min checkpoint
+
+Revision ID: c10624177cca
+Revises: 32ed8c274f92
+Create Date: 2026-10-17 05:32:35.235141
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c10624177cca"
+down_revision: Union[str, Sequence[str], None] = "32ed8c274f92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("sync_states", sa.Column("page_time_min", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("sync_states", "page_time_min")
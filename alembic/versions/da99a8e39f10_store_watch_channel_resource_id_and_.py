@@ -0,0 +1,34 @@
+"""Store watch channel resource id and index expiration
+
+Revision ID: da99a8e39f10
+Revises: 19d248334afb
+Create Date: 2026-10-17 04:45:39.162016
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "da99a8e39f10"
+down_revision: Union[str, Sequence[str], None] = "19d248334afb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "sync_states", sa.Column("channel_resource_id", sa.String(), nullable=True)
+    )
+    op.create_index(
+        "ix_sync_states_expiration", "sync_states", ["expiration"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_sync_states_expiration", table_name="sync_states")
+    op.drop_column("sync_states", "channel_resource_id")
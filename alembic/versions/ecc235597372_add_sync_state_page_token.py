@@ -0,0 +1,28 @@
+"""Add sync_states.page_token checkpoint
+
+Revision ID: ecc235597372
+Revises: 4422171a6ddb
+Create Date: 2026-10-17 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ecc235597372"
+down_revision: Union[str, Sequence[str], None] = "4422171a6ddb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("sync_states", sa.Column("page_token", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("sync_states", "page_token")
@@ -0,0 +1,3 @@
+"""
+One-off maintenance commands, run as `python -m app.commands.<name>`.
+"""
@@ -0,0 +1,175 @@
+"""
+Register watch channels and run the initial sync for many users at once.
+
+    python -m app.commands.backfill [--concurrency 20] [--chunk-size 500]
+                                    [--skip-watch] [--skip-sync]
+
+For onboarding a workspace or recovering from an outage. Users with Google
+credentials are streamed from the `users` table in keyset-paginated chunks.
+Each user runs in its own session under a semaphore, so one failure does not
+stop the rest. After every chunk the last finished user is checkpointed; a
+re-run resumes after it. Failed users are listed in the checkpoint and in
+the log.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select
+
+from app.commands.checkpoint import clear_checkpoint, read_checkpoint, write_checkpoint
+from app.db.models import GoogleCredentials, User
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = ".backfill.checkpoint"
+
+
+@dataclass
+class BackfillProgress:
+    total: int
+    done: int = 0
+    failed: list[str] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def report(self) -> str:
+        rate = self.rate
+        remaining = max(self.total - self.done, 0)
+        eta = f"{remaining / rate:.0f}s" if rate else "?"
+        return (
+            f"{self.done}/{self.total} users, {len(self.failed)} failed, "
+            f"{rate:.1f} users/s, ETA {eta}"
+        )
+
+
+async def backfill_user(user_id: str, watch: bool = True, sync: bool = True) -> bool:
+    """Re-watch and initially sync one user. Returns False on failure."""
+    from app.services.calendar_service import CalendarService
+
+    if watch:
+        async with SessionLocal() as session:
+            if not await CalendarService(session).watch_events(user_id):
+                return False
+    if sync:
+        async with SessionLocal() as session:
+            await CalendarService(session).sync_events(user_id)
+    return True
+
+
+async def user_chunk(after: str, size: int, session_factory=SessionLocal) -> list[str]:
+    """Next `size` users with credentials after slack_id `after`."""
+    stmt = (
+        select(User.slack_id)
+        .join(GoogleCredentials, GoogleCredentials.user_id == User.slack_id)
+        .where(User.slack_id > after)
+        .order_by(User.slack_id)
+        .limit(size)
+    )
+    async with session_factory() as session:
+        return list((await session.execute(stmt)).scalars())
+
+
+async def count_users(after: str, session_factory=SessionLocal) -> int:
+    stmt = (
+        select(func.count())
+        .select_from(User)
+        .join(GoogleCredentials, GoogleCredentials.user_id == User.slack_id)
+        .where(User.slack_id > after)
+    )
+    async with session_factory() as session:
+        return (await session.execute(stmt)).scalar_one()
+
+
+async def backfill(
+    concurrency: int = 20,
+    chunk_size: int = 500,
+    user_timeout: float = 120.0,
+    checkpoint: str = DEFAULT_CHECKPOINT,
+    handler: Callable[[str], Awaitable[bool]] = backfill_user,
+    session_factory=SessionLocal,
+) -> BackfillProgress:
+    state = read_checkpoint(checkpoint)
+    after = state.get("last_user_id", "")
+    if after:
+        logger.info(f"Resuming after user {after}")
+
+    progress = BackfillProgress(total=await count_users(after, session_factory))
+    progress.failed = state.get("failed", [])
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(user_id: str) -> None:
+        async with semaphore:
+            try:
+                ok = await asyncio.wait_for(handler(user_id), timeout=user_timeout)
+            except Exception as e:
+                logger.error(f"Backfill failed for {user_id}: {e!r}")
+                ok = False
+        if not ok:
+            progress.failed.append(user_id)
+        progress.done += 1
+
+    while chunk := await user_chunk(after, chunk_size, session_factory):
+        await asyncio.gather(*(run_one(user_id) for user_id in chunk))
+        after = chunk[-1]
+        write_checkpoint(checkpoint, {"last_user_id": after, "failed": progress.failed})
+        logger.info(f"Backfill progress: {progress.report()}")
+
+    if progress.failed:
+        # Keep the checkpoint (all users done) so the failures stay on record
+        logger.warning(f"Backfill failed for: {', '.join(progress.failed)}")
+    else:
+        clear_checkpoint(checkpoint)
+    logger.info(f"Backfill finished: {progress.report()}")
+    return progress
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument(
+        "--user-timeout", type=float, default=120.0, help="seconds per user"
+    )
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--skip-watch", action="store_true")
+    parser.add_argument("--skip-sync", action="store_true")
+    args = parser.parse_args()
+
+    async def handler(user_id: str) -> bool:
+        return await backfill_user(
+            user_id, watch=not args.skip_watch, sync=not args.skip_sync
+        )
+
+    async def main() -> None:
+        from app.core.google_calendar import close_http_session
+        from app.services.digest import digest_buffer
+        from app.services.token_writeback import token_writeback
+
+        writeback_task = asyncio.create_task(token_writeback.run())
+        try:
+            await backfill(
+                args.concurrency,
+                args.chunk_size,
+                args.user_timeout,
+                args.checkpoint,
+                handler,
+            )
+        finally:
+            # Send notifications still inside their debounce window
+            await digest_buffer.drain()
+            writeback_task.cancel()
+            await asyncio.gather(writeback_task, return_exceptions=True)
+            await close_http_session()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,31 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+def read_checkpoint(path: str | Path) -> dict[str, Any]:
+    """Load a command checkpoint; an absent file means start from scratch."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_checkpoint(path: str | Path, state: dict[str, Any]) -> None:
+    """
+    Atomically replace the checkpoint, so an interrupted run never leaves a
+    half-written file behind.
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def clear_checkpoint(path: str | Path) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
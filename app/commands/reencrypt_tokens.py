@@ -0,0 +1,137 @@
+"""
+Re-encrypt google_credentials.refresh_token under the current SECRET_KEY.
+
+    python -m app.commands.reencrypt_tokens [--batch-size 500] [--pause 0.1]
+
+Rotation procedure: move the old key to PREVIOUS_SECRET_KEYS, set the new
+SECRET_KEY, deploy, then run this command. Once it finishes the old key can
+be dropped from PREVIOUS_SECRET_KEYS.
+
+Rows are walked by primary key in small batches, each in its own short
+transaction, and every UPDATE is guarded by the old ciphertext so a token
+saved concurrently by the OAuth callback is never overwritten. Progress is
+checkpointed after each batch; re-running resumes where it stopped.
+Rows no configured key can decrypt are logged and skipped; the users listed
+in the final summary have to authorize Google again.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from cryptography.fernet import InvalidToken
+from sqlalchemy import and_, bindparam, select, update
+
+from app.commands.checkpoint import clear_checkpoint, read_checkpoint, write_checkpoint
+from app.core.security import is_current_key, rotate_token
+from app.db.models import GoogleCredentials
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = ".reencrypt_tokens.checkpoint"
+
+_credentials = GoogleCredentials.__table__
+
+
+async def reencrypt_batch(
+    last_id: int, batch_size: int, session_factory=SessionLocal
+) -> tuple[int | None, int, list[str]]:
+    """
+    Rotate one batch of rows with id > last_id.
+    Returns (last id seen or None when done, number of rows rewritten,
+    user ids whose token could not be decrypted).
+    """
+    async with session_factory() as session:
+        result = await session.execute(
+            select(
+                _credentials.c.id, _credentials.c.user_id, _credentials.c.refresh_token
+            )
+            .where(_credentials.c.id > last_id)
+            .order_by(_credentials.c.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            return None, 0, []
+
+        params = []
+        skipped = []
+        for row_id, user_id, token in rows:
+            if not token or is_current_key(token):
+                continue
+            try:
+                new_token = rotate_token(token)
+            except InvalidToken:
+                # Encrypted under a key no longer in PREVIOUS_SECRET_KEYS
+                logger.error(f"Cannot decrypt refresh token of {user_id}, skipping")
+                skipped.append(user_id)
+                continue
+            params.append({"b_id": row_id, "b_old": token, "b_new": new_token})
+        if params:
+            stmt = (
+                update(_credentials)
+                .where(
+                    and_(
+                        _credentials.c.id == bindparam("b_id"),
+                        _credentials.c.refresh_token == bindparam("b_old"),
+                    )
+                )
+                .values(refresh_token=bindparam("b_new"))
+            )
+            await session.execute(stmt, params)
+            await session.commit()
+        return rows[-1][0], len(params), skipped
+
+
+async def reencrypt_tokens(
+    batch_size: int = 500,
+    pause: float = 0.1,
+    checkpoint: str = DEFAULT_CHECKPOINT,
+    session_factory=SessionLocal,
+) -> int:
+    """Rotate every stored refresh token. Returns the number rewritten."""
+    state = read_checkpoint(checkpoint)
+    last_id = state.get("last_id", 0)
+    total = state.get("rewritten", 0)
+    skipped: list[str] = state.get("skipped", [])
+    if last_id:
+        logger.info(f"Resuming after id {last_id} ({total} already rewritten)")
+
+    while True:
+        next_id, rewritten, unreadable = await reencrypt_batch(
+            last_id, batch_size, session_factory
+        )
+        if next_id is None:
+            break
+        last_id = next_id
+        total += rewritten
+        skipped.extend(unreadable)
+        write_checkpoint(
+            checkpoint, {"last_id": last_id, "rewritten": total, "skipped": skipped}
+        )
+        logger.info(f"Re-encrypted {total} tokens (up to id {last_id})")
+        if pause:
+            # Leave room for regular traffic between batches
+            await asyncio.sleep(pause)
+
+    clear_checkpoint(checkpoint)
+    logger.info(
+        f"Re-encryption finished: {total} tokens rewritten, " f"{len(skipped)} skipped"
+    )
+    if skipped:
+        logger.warning(f"Tokens that could not be decrypted: {', '.join(skipped)}")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--pause", type=float, default=0.1, help="seconds to sleep between batches"
+    )
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(reencrypt_tokens(args.batch_size, args.pause, args.checkpoint))
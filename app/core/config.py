@@ -15,22 +15,105 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "password"
     POSTGRES_DB: str = "panager"
     POSTGRES_PORT: int = 5432
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 to disable
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PGBOUNCER_MODE: bool = False  # disable prepared statement caching
+    DB_ECHO: bool | None = None  # log SQL; defaults to on in local only
 
     # Security
     SECRET_KEY: str
+    PREVIOUS_SECRET_KEYS: str = ""  # comma-separated, still accepted for decryption
+    TOKEN_DECRYPT_CACHE_SIZE: int = 1024
+    TOKEN_DECRYPT_CACHE_TTL: float = 300.0
 
     # App
     PUBLIC_URL: str | None = None
+    SHUTDOWN_GRACE_PERIOD: float = 10.0  # seconds to finish background tasks
+
+    # Access log: per-path fraction of requests logged (errors and slow
+    # requests are always logged)
+    ACCESS_LOG_SAMPLE_RATES: dict[str, float] = {"/api/v1/webhook/google/calendar": 0.1}
+    ACCESS_LOG_SLOW_MS: float = 1000.0
+
+    # Leader election (singleton background tasks across replicas)
+    LEADER_ELECTION_ENABLED: bool = True
+    LEADER_RENEW_INTERVAL: float = 5.0
+    LEADER_RETRY_INTERVAL: float = 5.0
+
+    # Tracing: "memory" (ring buffer), "file" (JSON lines) or "none"
+    TRACING_EXPORTER: str = "memory"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_MEMORY_SPANS: int = 10000
+
+    # Webhooks
+    WEBHOOK_COALESCE_WINDOW: float = 2.0
+
+    # Watch channel renewal
+    CHANNEL_RENEWAL_INTERVAL: float = 300.0  # seconds between sweeps
+    CHANNEL_RENEWAL_LEAD: float = 86400.0  # renew channels expiring within this
+    CHANNEL_RENEWAL_BATCH_SIZE: int = 100
+    CHANNEL_RENEWAL_CONCURRENCY: int = 5
+    CHANNEL_RENEWAL_JITTER: float = 30.0  # max random delay per renewal
+    # Failed renewals back off from INTERVAL, doubling up to this
+    CHANNEL_RENEWAL_MAX_BACKOFF: float = 86400.0
+
+    # Event reminders (leader only)
+    REMINDER_LEAD: float = 600.0  # seconds before an event starts
+    REMINDER_HORIZON: float = 86400.0  # upcoming starts kept in memory
+    REMINDER_POLL_INTERVAL: float = 30.0  # seconds between mirror polls
+
+    # Sync worker (python -m app.worker)
+    SYNC_WORKER_CONCURRENCY: int = 4
+    SYNC_WORKER_POLL_INTERVAL: float = 1.0
+    SYNC_JOB_MAX_ATTEMPTS: int = 5
+    SYNC_JOB_RETRY_DELAY: float = 30.0
+    SYNC_JOB_STALE_AFTER: float = 600.0
+    SYNC_JOB_HEARTBEAT_INTERVAL: float = 60.0  # must stay well below STALE_AFTER
+    # Full resyncs after a 410 (expired sync token) running at once per
+    # process; each user's run one at a time
+    SYNC_RESYNC_CONCURRENCY: int = 2
 
     # Google
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
     GOOGLE_REDIRECT_URI: str
+    GOOGLE_HTTP_POOL_SIZE: int = 100
+    GOOGLE_HTTP_KEEPALIVE: float = 60.0
+    GOOGLE_HTTP_TIMEOUT: float = 30.0
+    GOOGLE_CLIENT_CACHE_SIZE: int = 1024
+    GOOGLE_CLIENT_CACHE_TTL: float = 600.0
+    GOOGLE_TOKEN_CACHE_SIZE: int = 10000
+    GOOGLE_TOKEN_EXPIRY_SKEW: float = 60.0
+    GOOGLE_TOKEN_WRITEBACK_INTERVAL: float = 5.0
+    SYNC_MAX_CALENDARS: int = 25  # calendars watched and synced per user
 
     # Slack
     SLACK_APP_TOKEN: str
     SLACK_BOT_TOKEN: str
     SLACK_SIGNING_SECRET: str
+    # Run Socket Mode inside the API process; turn off when the separate
+    # `python -m app.slack_worker` process is deployed
+    SLACK_SOCKET_MODE_IN_API: bool = True
+    SLACK_DISPATCH_CONCURRENCY: int = 10
+    SLACK_MAX_RETRIES: int = 3
+    SLACK_POST_MESSAGE_RATE: float = 5.0  # per second, workspace-wide
+    SLACK_CHANNEL_RATE: float = 1.0  # per second, per channel
+    # Changes within this many seconds are sent to a user as one digest
+    NOTIFY_DIGEST_WINDOW: float = 10.0
+    NOTIFY_DIGEST_MAX_ITEMS: int = 10  # listed per digest, the rest are "+N more"
+    NOTIFY_DIGEST_MAX_ATTEMPTS: int = 5
+    NOTIFY_DIGEST_RETRY_INTERVAL: float = (
+        60.0  # seconds between retries of unsent digests
+    )
+
+    @property
+    def DB_SQL_ECHO(self) -> bool:
+        if self.DB_ECHO is not None:
+            return self.DB_ECHO
+        return self.ENVIRONMENT == "local"
 
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -26,3 +26,12 @@ class CalendarSyncError(ServiceError):
     """Raised when Calendar synchronization fails."""
 
     pass
+
+
+class GoogleApiError(CalendarSyncError):
+    """Raised when a Google API call returns an error response."""
+
+    def __init__(self, status: int, message: str, reason: str | None = None):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
@@ -0,0 +1,517 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from urllib.parse import quote, urlencode, urlparse
+
+import aiohttp
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exceptions import AuthError, GoogleApiError
+from app.core.metrics import (
+    google_request_duration,
+    google_requests,
+    google_response_bytes,
+    google_response_parse_duration,
+)
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
+CALENDAR_API_BASE = "https://www.googleapis.com/calendar/v3"
+GOOGLE_BATCH_URI = "https://www.googleapis.com/batch/calendar/v3"
+# Google accepts at most 50 calls in one batch request
+BATCH_LIMIT = 50
+
+# Partial responses (the `fields` parameter), named by what the caller reads.
+# Full event resources carry attendees, descriptions, conference data and
+# reminders that Panager never looks at.
+FIELD_PROFILES = {
+    # Sync: the events mirror (event_store.event_row) plus the notification
+    # text (status, summary, start, htmlLink)
+    "mirror": (
+        "nextPageToken,nextSyncToken,"
+        "items(id,etag,status,summary,start,end,updated,htmlLink)"
+    ),
+    # events.watch: what SyncState stores about the channel
+    "watch": "id,resourceId,expiration",
+    # calendarList.list: what calendar discovery filters on
+    "calendars": "nextPageToken,items(id,primary,deleted,hidden,accessRole)",
+}
+
+# Google only serves gzip when the User-Agent also mentions it
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip",
+    "User-Agent": f"panager/{settings.VERSION} (gzip)",
+}
+
+# One keep-alive connection pool shared by every Google call in the process.
+_http_session: aiohttp.ClientSession | None = None
+
+# Latest access token per user with its expiry. Outlives cached clients, so a
+# rebuilt client does not start from the (possibly expired) token in the DB.
+access_token_cache: TTLCache[str, tuple[str, datetime | None]] = TTLCache(
+    maxsize=settings.GOOGLE_TOKEN_CACHE_SIZE, ttl=3600
+)
+
+# Refreshes in progress, keyed by user: concurrent syncs share one round trip
+_inflight_refreshes: dict[str, asyncio.Task] = {}
+
+TokenRefreshCallback = Callable[[str, str, datetime | None], None]
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Return the shared aiohttp session, creating it on first use.
+    Must be called from within the running event loop.
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.GOOGLE_HTTP_POOL_SIZE,
+            keepalive_timeout=settings.GOOGLE_HTTP_KEEPALIVE,
+        )
+        _http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.GOOGLE_HTTP_TIMEOUT),
+        )
+    return _http_session
+
+
+async def close_http_session() -> None:
+    """Close the shared session (called on application shutdown)."""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
+def _parse_error(status: int, payload: Any) -> GoogleApiError:
+    """Build a GoogleApiError from a Google JSON error body."""
+    message = f"Google API error {status}"
+    reason = None
+    if isinstance(payload, dict) and isinstance(payload.get("error"), dict):
+        error = payload["error"]
+        message = error.get("message", message)
+        errors = error.get("errors") or []
+        if errors:
+            reason = errors[0].get("reason")
+    return GoogleApiError(status, message, reason)
+
+
+class GoogleCalendarClient:
+    """
+    Minimal asyncio client for the Calendar v3 endpoints Panager uses.
+    Refreshes the access token with the stored refresh token when needed.
+    """
+
+    def __init__(
+        self,
+        access_token: str | None,
+        refresh_token: str | None,
+        expires_at: datetime | None = None,
+        user_id: str | None = None,
+        on_refresh: TokenRefreshCallback | None = None,
+        session: aiohttp.ClientSession | None = None,
+        base_url: str = CALENDAR_API_BASE,
+        token_uri: str = GOOGLE_TOKEN_URI,
+        batch_url: str = GOOGLE_BATCH_URI,
+    ):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_at = _as_utc(expires_at)
+        self.user_id = user_id
+        self.on_refresh = on_refresh
+        self._session = session
+        self.base_url = base_url
+        self.token_uri = token_uri
+        self.batch_url = batch_url
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self._session or get_http_session()
+
+    def token_is_valid(self) -> bool:
+        """True if the access token is set and not about to expire."""
+        if not self.access_token:
+            return False
+        if self.expires_at is None:
+            return True
+        skew = timedelta(seconds=settings.GOOGLE_TOKEN_EXPIRY_SKEW)
+        return self.expires_at - skew > datetime.now(timezone.utc)
+
+    async def refresh_access_token(self) -> str:
+        """
+        Exchange the refresh token for a new access token.
+        Concurrent callers for the same user share a single request.
+        """
+        if not self.refresh_token:
+            raise AuthError("No refresh token available")
+
+        key = self.user_id or self.refresh_token
+        task = _inflight_refreshes.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_token())
+            _inflight_refreshes[key] = task
+            task.add_done_callback(lambda _: _inflight_refreshes.pop(key, None))
+
+        self.access_token, self.expires_at = await asyncio.shield(task)
+        return self.access_token
+
+    async def _fetch_token(self) -> tuple[str, datetime | None]:
+        data = {
+            "grant_type": "refresh_token",
+            "refresh_token": self.refresh_token,
+            "client_id": settings.GOOGLE_CLIENT_ID,
+            "client_secret": settings.GOOGLE_CLIENT_SECRET,
+        }
+        with (
+            tracer.span("google.oauth.token"),
+            google_request_duration.time(operation="oauth.token"),
+        ):
+            async with self.session.post(
+                self.token_uri, data=data, headers=DEFAULT_HEADERS
+            ) as response:
+                payload = await response.json(content_type=None)
+        google_requests.inc(operation="oauth.token", status=str(response.status))
+        if response.status != 200:
+            raise AuthError(f"Token refresh failed ({response.status}): {payload}")
+
+        access_token = payload["access_token"]
+        expires_at = None
+        expires_in = payload.get("expires_in")
+        if expires_in:
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(expires_in))
+        logger.debug("Refreshed Google access token")
+
+        if self.user_id:
+            access_token_cache.set(self.user_id, (access_token, expires_at))
+            if self.on_refresh:
+                self.on_refresh(self.user_id, access_token, expires_at)
+        return access_token, expires_at
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+        operation: str = "other",
+        fields: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        One Calendar API call. `fields` names a FIELD_PROFILES entry to
+        request a partial response.
+        """
+        if not self.token_is_valid():
+            await self.refresh_access_token()
+
+        url = f"{self.base_url}{path}"
+        if fields:
+            params = {**(params or {}), "fields": FIELD_PROFILES[fields]}
+        with tracer.span(f"google.{operation}") as span:
+            for attempt in range(2):
+                used_token = self.access_token
+                headers = {**DEFAULT_HEADERS, "Authorization": f"Bearer {used_token}"}
+                start = time.perf_counter()
+                try:
+                    response = await self.session.request(
+                        method,
+                        url,
+                        params=_encode_params(params),
+                        json=json,
+                        headers=headers,
+                    )
+                except Exception:
+                    google_requests.inc(operation=operation, status="error")
+                    raise
+                async with response:
+                    google_request_duration.observe(
+                        time.perf_counter() - start, operation=operation
+                    )
+                    google_requests.inc(
+                        operation=operation, status=str(response.status)
+                    )
+                    span.set_attribute("status", response.status)
+                    if response.status == 401 and attempt == 0:
+                        # Token revoked or expired early: refresh once and retry,
+                        # unless a concurrent call already replaced it
+                        if self.access_token == used_token:
+                            await self.refresh_access_token()
+                        continue
+                    if response.status == 204:
+                        return {}
+                    payload = _decode_json(
+                        await response.read(), _wire_size(response), operation
+                    )
+                    if response.status >= 400:
+                        raise _parse_error(response.status, payload)
+                    return payload or {}
+
+            raise AuthError("Google rejected the refreshed access token")
+
+    async def list_events(
+        self, calendar_id: str = "primary", fields: str = "mirror", **params: Any
+    ) -> dict[str, Any]:
+        """events.list - one page of events."""
+        return await self._request(
+            "GET",
+            f"/calendars/{_quote(calendar_id)}/events",
+            params=params,
+            operation="events.list",
+            fields=fields,
+        )
+
+    async def iter_event_pages(
+        self, calendar_id: str = "primary", page_token: str | None = None, **params: Any
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        events.list over every nextPageToken page. Pages are yielded one at a
+        time so the caller can process and drop each before the next request.
+        """
+        while True:
+            page = await self.list_events(calendar_id, pageToken=page_token, **params)
+            yield page
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return
+
+    async def batch_list_events(
+        self, calls: list[tuple[str, dict[str, Any]]], fields: str = "mirror"
+    ) -> list[dict[str, Any] | GoogleApiError]:
+        """
+        events.list for several calendars in one HTTP round trip, through
+        Google's batch endpoint. `calls` are (calendar_id, params) pairs.
+        Returns one page or GoogleApiError per call, in order; a failing
+        calendar does not fail the others.
+        """
+        if len(calls) == 1:
+            # Nothing to combine: skip the multipart overhead
+            calendar_id, params = calls[0]
+            try:
+                return [await self.list_events(calendar_id, fields=fields, **params)]
+            except GoogleApiError as e:
+                return [e]
+
+        results: list[dict[str, Any] | GoogleApiError] = []
+        for start in range(0, len(calls), BATCH_LIMIT):
+            chunk = calls[start : start + BATCH_LIMIT]
+            results.extend(await self._batch(chunk, fields))
+        return results
+
+    async def _batch(
+        self, calls: list[tuple[str, dict[str, Any]]], fields: str
+    ) -> list[dict[str, Any] | GoogleApiError]:
+        if not self.token_is_valid():
+            await self.refresh_access_token()
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        # Inner request paths are relative to the API root, e.g. /calendar/v3
+        prefix = urlparse(self.base_url).path.rstrip("/")
+        parts = []
+        for index, (calendar_id, params) in enumerate(calls):
+            params = {**params, "fields": FIELD_PROFILES[fields]}
+            query = urlencode(_encode_params(params) or {})
+            path = f"{prefix}/calendars/{_quote(calendar_id)}/events"
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <{index}>\r\n\r\n"
+                f"GET {path}{'?' + query if query else ''} HTTP/1.1\r\n\r\n"
+            )
+        body = "".join(parts) + f"--{boundary}--\r\n"
+
+        with tracer.span("google.events.batch", calls=len(calls)) as span:
+            for attempt in range(2):
+                used_token = self.access_token
+                headers = {
+                    **DEFAULT_HEADERS,
+                    "Authorization": f"Bearer {used_token}",
+                    "Content-Type": f"multipart/mixed; boundary={boundary}",
+                }
+                start = time.perf_counter()
+                try:
+                    response = await self.session.post(
+                        self.batch_url, data=body, headers=headers
+                    )
+                except Exception:
+                    google_requests.inc(operation="events.batch", status="error")
+                    raise
+                async with response:
+                    google_request_duration.observe(
+                        time.perf_counter() - start, operation="events.batch"
+                    )
+                    google_requests.inc(
+                        operation="events.batch", status=str(response.status)
+                    )
+                    span.set_attribute("status", response.status)
+                    if response.status == 401 and attempt == 0:
+                        if self.access_token == used_token:
+                            await self.refresh_access_token()
+                        continue
+                    body = await response.read()
+                    wire_size = _wire_size(response)
+                    if response.status >= 400:
+                        payload = _decode_json(body, wire_size, "events.batch")
+                        raise _parse_error(response.status, payload)
+                    _record_size(body, wire_size, "events.batch")
+                    text = body.decode(response.charset or "utf-8")
+                    return _parse_batch_response(
+                        response.headers.get("Content-Type", ""), text, len(calls)
+                    )
+
+            raise AuthError("Google rejected the refreshed access token")
+
+    async def list_calendars(self) -> list[dict[str, Any]]:
+        """calendarList.list - every calendar on the user's list."""
+        calendars: list[dict[str, Any]] = []
+        page_token = None
+        while True:
+            page = await self._request(
+                "GET",
+                "/users/me/calendarList",
+                params={"pageToken": page_token},
+                operation="calendarList.list",
+                fields="calendars",
+            )
+            calendars.extend(page.get("items", []))
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return calendars
+
+    async def watch_events(
+        self, calendar_id: str, body: dict[str, Any]
+    ) -> dict[str, Any]:
+        """events.watch - open a push notification channel."""
+        return await self._request(
+            "POST",
+            f"/calendars/{_quote(calendar_id)}/events/watch",
+            json=body,
+            operation="events.watch",
+            fields="watch",
+        )
+
+    async def stop_channel(self, channel_id: str, resource_id: str) -> None:
+        """channels.stop - close a push notification channel."""
+        await self._request(
+            "POST",
+            "/channels/stop",
+            json={"id": channel_id, "resourceId": resource_id},
+            operation="channels.stop",
+        )
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    """google-auth hands out naive UTC expiries; the DB returns aware ones."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _quote(value: str) -> str:
+    return quote(value, safe="")
+
+
+def _wire_size(response: aiohttp.ClientResponse) -> int | None:
+    """Bytes received before gzip decoding (aiohttp 3.10+)."""
+    return getattr(response.content, "total_raw_bytes", None)
+
+
+def _record_size(body: bytes, wire_size: int | None, operation: str) -> None:
+    google_response_bytes.observe(len(body), operation=operation, encoding="decoded")
+    google_response_bytes.observe(
+        len(body) if wire_size is None else wire_size,
+        operation=operation,
+        encoding="wire",
+    )
+
+
+def _decode_json(body: bytes, wire_size: int | None, operation: str) -> Any:
+    """Parse a JSON body, recording its size and parse time."""
+    _record_size(body, wire_size, operation)
+    if not body:
+        return None
+    with google_response_parse_duration.time(operation=operation):
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+
+def _parse_batch_response(
+    content_type: str, text: str, expected: int
+) -> list[dict[str, Any] | GoogleApiError]:
+    """
+    Split a multipart/mixed batch response into per-call results, matched by
+    Content-ID (`<response-N>`), since Google may reorder the parts.
+    """
+    boundary = None
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary":
+            boundary = value.strip('"')
+    if not boundary:
+        raise GoogleApiError(502, "Batch response without a multipart boundary")
+
+    missing = GoogleApiError(502, "Missing response in batch")
+    results: list[dict[str, Any] | GoogleApiError] = [missing] * expected
+    for part in text.split(f"--{boundary}"):
+        part = part.strip()
+        if not part or part == "--":
+            continue
+        # Outer MIME headers, then the embedded HTTP response
+        mime_headers, _, http = part.replace("\r\n", "\n").partition("\n\n")
+        index = None
+        for line in mime_headers.split("\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-id":
+                index = value.strip().strip("<>").removeprefix("response-")
+        if index is None or not index.isdigit() or int(index) >= expected:
+            continue
+
+        head, _, payload_text = http.partition("\n\n")
+        status_line = head.split("\n", 1)[0].split()
+        status = int(status_line[1]) if len(status_line) > 1 else 502
+        try:
+            payload = json.loads(payload_text) if payload_text.strip() else {}
+        except ValueError:
+            payload = None
+        if status >= 400:
+            results[int(index)] = _parse_error(status, payload)
+        else:
+            results[int(index)] = payload or {}
+    return results
+
+
+def _encode_params(params: dict[str, Any] | None) -> dict[str, str] | None:
+    """aiohttp only accepts str/int/float query values; Google expects lowercase bools."""
+    if not params:
+        return None
+    encoded = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        encoded[key] = str(value)
+    return encoded
+
+
+# Per-user clients keyed by slack_id, so a webhook does not have to decrypt
+# credentials on every sync. Each entry keeps the refresh token ciphertext it
+# was built from: re-auth in another process changes it, which drops the entry.
+client_cache: TTLCache[str, tuple[str | None, GoogleCalendarClient]] = TTLCache(
+    maxsize=settings.GOOGLE_CLIENT_CACHE_SIZE, ttl=settings.GOOGLE_CLIENT_CACHE_TTL
+)
+
+
+def invalidate_client(slack_id: str) -> None:
+    """Drop the cached client and token for a user (e.g. after new tokens are saved)."""
+    client_cache.pop(slack_id)
+    access_token_cache.pop(slack_id)
@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import logging
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+TaskFactory = Callable[[], Awaitable[None]]
+
+_leader_gauge = registry.gauge(
+    "leader", "1 if this process holds the leader lock", ("name",)
+)
+
+
+def lock_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key for a lock name."""
+    digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class LeaderElector:
+    """
+    Runs registered background tasks in exactly one process, elected with a
+    Postgres session-level advisory lock.
+
+    The lock lives as long as a dedicated connection: the leader checks that
+    connection every `renew_interval` seconds and steps down (cancelling its
+    tasks) if it is gone. Followers retry the lock every `retry_interval`
+    seconds. A leader shutting down unlocks explicitly and a crashed one
+    drops its connection, which releases the lock at once; TCP keepalives
+    bound how long a half-dead connection can keep it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        engine: AsyncEngine | None = None,
+        renew_interval: float = settings.LEADER_RENEW_INTERVAL,
+        retry_interval: float = settings.LEADER_RETRY_INTERVAL,
+        enabled: bool = settings.LEADER_ELECTION_ENABLED,
+    ):
+        self.name = name
+        self.key = lock_key(name)
+        self.renew_interval = renew_interval
+        self.retry_interval = retry_interval
+        self.enabled = enabled
+        self._engine = engine
+        self._owns_engine = engine is None
+        self._factories: list[TaskFactory] = []
+        self._tasks: list[asyncio.Task] = []
+        self.is_leader = False
+
+    def register(self, factory: TaskFactory) -> TaskFactory:
+        """Add a coroutine function to run (until cancelled) while leader."""
+        self._factories.append(factory)
+        return factory
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            # Own connection outside the app pool; it is held for the whole lease
+            self._engine = create_async_engine(
+                settings.SQLALCHEMY_DATABASE_URI, poolclass=NullPool
+            )
+        return self._engine
+
+    async def run(self) -> None:
+        """Campaign for leadership until cancelled."""
+        if not self.enabled:
+            # Single process: lead unconditionally, no lock needed
+            self._start_tasks()
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await self._stop_tasks()
+            return
+
+        try:
+            while True:
+                conn = await self._try_acquire()
+                if conn is None:
+                    await asyncio.sleep(self.retry_interval)
+                    continue
+                try:
+                    self._start_tasks()
+                    await self._hold(conn)
+                finally:
+                    await self._stop_tasks()
+                    await self._release(conn)
+        finally:
+            if self._owns_engine and self._engine is not None:
+                await self._engine.dispose()
+                self._engine = None
+
+    async def _try_acquire(self) -> AsyncConnection | None:
+        try:
+            conn = await self.engine.connect()
+        except Exception as e:
+            logger.warning(f"Leader election for {self.name}: cannot connect: {e}")
+            return None
+        try:
+            # Detect a vanished peer within ~keepalive idle + interval * count
+            await conn.execute(text("SET tcp_keepalives_idle = 10"))
+            await conn.execute(text("SET tcp_keepalives_interval = 5"))
+            await conn.execute(text("SET tcp_keepalives_count = 3"))
+            acquired = await conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            )
+            # Keep the connection out of a transaction while holding the lock
+            await conn.commit()
+        except Exception as e:
+            logger.warning(f"Leader election for {self.name} failed: {e}")
+            acquired = False
+        if not acquired:
+            await self._close(conn)
+            return None
+        logger.info(f"Became leader for {self.name}")
+        return conn
+
+    async def _hold(self, conn: AsyncConnection) -> None:
+        """Renew the lease until the lock connection fails."""
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            try:
+                await conn.execute(text("SELECT 1"))
+                await conn.commit()
+            except Exception as e:
+                logger.error(f"Lost leader lock for {self.name}: {e}")
+                return
+
+    async def _release(self, conn: AsyncConnection) -> None:
+        try:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": self.key}
+            )
+            await conn.commit()
+        except Exception:
+            pass  # Closing the connection releases it anyway
+        await self._close(conn)
+        logger.info(f"Released leader lock for {self.name}")
+
+    @staticmethod
+    async def _close(conn: AsyncConnection) -> None:
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+    def _start_tasks(self) -> None:
+        self.is_leader = True
+        _leader_gauge.set(1, name=self.name)
+        self._tasks = [asyncio.create_task(factory()) for factory in self._factories]
+        for task in self._tasks:
+            task.add_done_callback(self._log_task_exit)
+
+    async def _stop_tasks(self) -> None:
+        self.is_leader = False
+        _leader_gauge.set(0, name=self.name)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _log_task_exit(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception():
+            logger.error(f"Leader task for {self.name} failed: {task.exception()!r}")
@@ -0,0 +1,252 @@
+"""
+Minimal in-process metrics registry exposed in Prometheus text format.
+
+Metrics are plain dicts keyed by label-value tuples, updated inline on the
+hot paths (no locks needed on a single event loop). Values that already
+live elsewhere (DB pool, webhook queue, Slack dispatcher) are read only at
+scrape time through collectors registered with `registry.collector`.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+# Seconds; tuned for HTTP calls and syncs (5ms .. 30s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Sample]:
+        for key, value in self._values.items():
+            yield f"{self.name}_total", self._labels(key), value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Sample]:
+        for key, value in self._values.items():
+            yield self.name, self._labels(key), value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        data = self._values.get(key)
+        if data is None:
+            data = self._values[key] = [0] * (len(self.buckets) + 2)
+        # Non-cumulative here; made cumulative at scrape time
+        data[bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        data = self._values.get(self._key(labels))
+        return int(sum(data[:-1])) if data else 0
+
+    def sum(self, **labels: str) -> float:
+        data = self._values.get(self._key(labels))
+        return data[-1] if data else 0.0
+
+    def samples(self) -> Iterator[Sample]:
+        for key, data in self._values.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), data[:-1]):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": _format_value(bound)},
+                    cumulative,
+                )
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, data[-1]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name} already registered")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(
+            Histogram(name, documentation, labelnames, buckets=buckets)
+        )
+
+    def collector(self, func: Callable[[], None]) -> Callable[[], None]:
+        """Register a function that refreshes gauges right before a scrape."""
+        self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        for collect in self._collectors:
+            collect()
+
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# HTTP
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+
+# Webhooks and sync
+webhook_notifications = registry.counter(
+    "webhook_notifications",
+    "Google push notifications received",
+    ("state", "known"),
+)
+sync_duration = registry.histogram(
+    "sync_duration_seconds", "Calendar sync duration", ("outcome",)
+)
+sync_event_count = registry.histogram(
+    "sync_events",
+    "Events received per sync",
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000),
+)
+sync_changed_events = registry.counter(
+    "sync_changed_events", "New or changed events found by syncs"
+)
+sync_full_resyncs = registry.counter(
+    "sync_full_resyncs", "Full resyncs after an expired sync token", ("outcome",)
+)
+watch_registrations = registry.counter(
+    "watch_registrations", "Watch channel registrations", ("kind", "outcome")
+)
+oauth_callbacks = registry.counter(
+    "oauth_callbacks", "Google OAuth callbacks", ("outcome",)
+)
+
+# Outbound APIs
+google_request_duration = registry.histogram(
+    "google_api_request_duration_seconds",
+    "Google API call latency",
+    ("operation",),
+)
+google_requests = registry.counter(
+    "google_api_requests", "Google API calls by status", ("operation", "status")
+)
+google_response_bytes = registry.histogram(
+    "google_api_response_bytes",
+    "Google API response body size, on the wire and after gzip decoding",
+    ("operation", "encoding"),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+google_response_parse_duration = registry.histogram(
+    "google_api_response_parse_seconds",
+    "Time spent decoding Google API JSON responses",
+    ("operation",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+)
+slack_request_duration = registry.histogram(
+    "slack_api_request_duration_seconds", "Slack Web API call latency", ("method",)
+)
+slack_requests = registry.counter(
+    "slack_api_requests", "Slack Web API calls by outcome", ("method", "outcome")
+)
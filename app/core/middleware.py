@@ -1,37 +1,105 @@
-import time
 import logging
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+import random
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import http_request_duration
 
 logger = logging.getLogger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        start_time = time.time()
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI access-log middleware: one structured record per request, the
+    per-route latency histogram and an `X-Process-Time` header, without
+    BaseHTTPMiddleware's extra task and body stream wrapping.
 
-        # Log Request
-        logger.info(f"Incoming Request: {request.method} {request.url}")
+    Hot routes can be sampled via `sample_rates` (path -> fraction logged).
+    Server errors and requests slower than `slow_ms` are always logged.
+    """
 
-        try:
-            response = await call_next(request)
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rates: dict[str, float] | None = None,
+        slow_ms: float = settings.ACCESS_LOG_SLOW_MS,
+    ):
+        self.app = app
+        self.sample_rates = (
+            settings.ACCESS_LOG_SAMPLE_RATES if sample_rates is None else sample_rates
+        )
+        self.slow_ms = slow_ms
 
-            # Log Response
-            process_time = time.time() - start_time
-            logger.info(
-                f"Request Completed: {request.method} {request.url} - "
-                f"Status: {response.status_code} - Time: {process_time:.4f}s"
-            )
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+        status = 500
 
-            response.headers["X-Process-Time"] = str(process_time)
-            return response
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = (time.perf_counter_ns() - start) / 1e9
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", f"{elapsed:.6f}")
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_with_timing)
         except Exception as e:
-            process_time = time.time() - start_time
+            self._record(scope, 500, start, error=e)
+            raise
+        self._record(scope, status, start)
+
+    def _record(
+        self, scope: Scope, status: int, start: int, error: Exception | None = None
+    ) -> None:
+        duration_ms = (time.perf_counter_ns() - start) / 1e6
+        path = scope["path"]
+
+        # Route template (e.g. /api/v1/auth/google/callback) keeps the
+        # label set bounded; unmatched paths are folded together
+        route = scope.get("route")
+        http_request_duration.observe(
+            duration_ms / 1000,
+            method=scope["method"],
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+        if status < 500 and duration_ms < self.slow_ms:
+            rate = self.sample_rates.get(path, 1.0)
+            if rate < 1.0 and random.random() >= rate:
+                return
+
+        record = {
+            "method": scope["method"],
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration_ms, 3),
+        }
+        if error is not None:
+            record["error"] = repr(error)
             logger.error(
-                f"Request Failed: {request.method} {request.url} - "
-                f"Error: {e} - Time: {process_time:.4f}s"
+                "%s %s failed: %r (%.1fms)",
+                record["method"],
+                path,
+                error,
+                duration_ms,
+                extra={"http": record},
+            )
+        else:
+            logger.info(
+                "%s %s %d %.1fms",
+                record["method"],
+                path,
+                status,
+                duration_ms,
+                extra={"http": record},
             )
-            raise e
@@ -0,0 +1,43 @@
+import time
+from collections.abc import Callable
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of polling.
+
+    `reserve()` always takes a token, letting the balance go negative, and
+    returns how long the caller must wait before using it. Callers therefore
+    get their slots in FIFO order without a wake-up/retry loop.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._timer = timer
+        self.tokens = capacity
+        self.updated = timer()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def reserve(self) -> float:
+        """Take one token; return the seconds to wait before it may be used."""
+        now = self._timer()
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Block the bucket, e.g. for a server-provided Retry-After."""
+        self.blocked_until = max(self.blocked_until, self._timer() + seconds)
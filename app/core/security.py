@@ -1,4 +1,7 @@
-from cryptography.fernet import Fernet
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 # In a real production app, ensure SECRET_KEY is a valid Fernet key (32 url-safe base64-encoded bytes)
@@ -6,15 +9,28 @@ from app.core.config import settings
 # To keep it simple for MVP and avoid "InvalidToken" errors if key changes,
 # let's assume settings.SECRET_KEY is used as a consistent seed or we use a dedicated key.
 
+# Decrypted tokens keyed by ciphertext. Small and short-lived: it only saves
+# the repeated decrypts of the same refresh token across back-to-back syncs.
+_decrypted_cache: TTLCache[str, str] = TTLCache(
+    maxsize=settings.TOKEN_DECRYPT_CACHE_SIZE, ttl=settings.TOKEN_DECRYPT_CACHE_TTL
+)
+
+
+def _fernet_keys() -> list[str]:
+    """SECRET_KEY first (used to encrypt), then previous keys still accepted."""
+    previous = [k.strip() for k in settings.PREVIOUS_SECRET_KEYS.split(",")]
+    return [settings.SECRET_KEY] + [k for k in previous if k]
 
-def _get_fernet() -> Fernet:
+
+@lru_cache(maxsize=1)
+def _get_fernet() -> MultiFernet:
     """
-    Ensure we have a valid Fernet key.
-    If SECRET_KEY isn't compliant, this might raise an error.
-    For this MVP, we assume the user provides a valid key or we handle it.
+    Build the cipher once per process.
+    Encrypts with SECRET_KEY and decrypts with SECRET_KEY or any key in
+    PREVIOUS_SECRET_KEYS, so SECRET_KEY can be rotated without downtime.
     """
     try:
-        return Fernet(settings.SECRET_KEY)
+        return MultiFernet([Fernet(key) for key in _fernet_keys()])
     except Exception:
         # Fallback for dev if the key in .env isn't a valid fernet key
         # In PROD, this should fail loudly.
@@ -25,6 +41,11 @@ def _get_fernet() -> Fernet:
         )
 
 
+@lru_cache(maxsize=1)
+def _get_primary_fernet() -> Fernet:
+    return Fernet(settings.SECRET_KEY)
+
+
 def encrypt_token(token: str) -> str:
     """Encrypt a raw token string."""
     f = _get_fernet()
@@ -33,5 +54,23 @@ def encrypt_token(token: str) -> str:
 
 def decrypt_token(encrypted_token: str) -> str:
     """Decrypt an encrypted token string."""
-    f = _get_fernet()
-    return f.decrypt(encrypted_token.encode()).decode()
+    token = _decrypted_cache.get(encrypted_token)
+    if token is None:
+        f = _get_fernet()
+        token = f.decrypt(encrypted_token.encode()).decode()
+        _decrypted_cache.set(encrypted_token, token)
+    return token
+
+
+def is_current_key(encrypted_token: str) -> bool:
+    """True if the token is already encrypted with the current SECRET_KEY."""
+    try:
+        _get_primary_fernet().decrypt(encrypted_token.encode())
+        return True
+    except InvalidToken:
+        return False
+
+
+def rotate_token(encrypted_token: str) -> str:
+    """Re-encrypt a token under the current SECRET_KEY."""
+    return _get_fernet().rotate(encrypted_token.encode()).decode()
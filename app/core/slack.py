@@ -1,12 +1,28 @@
-from slack_bolt.async_app import AsyncApp
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from app.core.config import settings
 
-slack_app = AsyncApp(
-    token=settings.SLACK_BOT_TOKEN, signing_secret=settings.SLACK_SIGNING_SECRET
-)
+if TYPE_CHECKING:
+    from slack_bolt.async_app import AsyncApp
+
+
+@lru_cache(maxsize=1)
+def get_slack_app() -> "AsyncApp":
+    """
+    The Bolt app, built on first use.
+    slack_bolt is heavy to import, and most API requests never touch it.
+    """
+    from slack_bolt.async_app import AsyncApp
+
+    app = AsyncApp(
+        token=settings.SLACK_BOT_TOKEN, signing_secret=settings.SLACK_SIGNING_SECRET
+    )
+    app.message("로그인")(handle_login_message)
+    app.action("google_login")(handle_google_login_action)
+    return app
 
 
-@slack_app.message("로그인")
 async def handle_login_message(message, say):
     """
     Handle '로그인' message.
@@ -64,7 +80,6 @@ async def handle_login_message(message, say):
     )
 
 
-@slack_app.action("google_login")
 async def handle_google_login_action(ack, body, logger):
     """
     Handle the button click.
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from collections.abc import Coroutine
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class TaskTracker:
+    """
+    Keeps references to fire-and-forget tasks (so they are not garbage
+    collected mid-flight), logs their failures and lets shutdown wait for
+    them instead of dropping them.
+    """
+
+    def __init__(self):
+        self._tasks: set[asyncio.Task] = set()
+        self.started = 0
+        self.failed = 0
+
+    def spawn(self, coro: Coroutine[Any, Any, Any], name: str | None = None):
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        self.started += 1
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.failed += 1
+            logger.error(f"Background task {task.get_name()} failed: {error!r}")
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """Wait for running tasks; cancel whatever is left after `timeout`."""
+        if not self._tasks:
+            return
+        _, still_running = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            logger.warning(f"Cancelled {len(still_running)} background tasks")
+            await asyncio.gather(*still_running, return_exceptions=True)
+
+
+background_tasks = TaskTracker()
@@ -0,0 +1,229 @@
+"""
+Lightweight in-process tracing.
+
+Spans are opened with `tracer.span(name, **attributes)` and nest through a
+contextvar, so asyncio tasks created inside a span become its children. A
+span can continue a trace from another process via a W3C `traceparent`
+string (used to follow a webhook through the sync_jobs table into the
+worker).
+
+Finished spans go to a local exporter only: an in-memory ring buffer or a
+JSON-lines file (TRACING_EXPORTER=memory|file|none). Print the traces in a
+file with:
+
+    python -m app.core.tracing traces.jsonl [--min-ms 100]
+"""
+
+import json
+import logging
+import os
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    start_time: int = 0  # epoch ns
+    duration_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class InMemoryExporter:
+    """Keeps the most recent finished spans (for tests and debugging)."""
+
+    def __init__(self, maxlen: int = 10_000):
+        self.spans: deque[Span] = deque(maxlen=maxlen)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def trace(self, trace_id: str) -> list[Span]:
+        return [s for s in self.spans if s.trace_id == trace_id]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlExporter:
+    """Appends one JSON object per finished span to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def export(self, span: Span) -> None:
+        if self._file is None:
+            # Line-buffered: each span is on disk when its line is complete
+            self._file = open(self.path, "a", buffering=1)
+        self._file.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class NullExporter:
+    def export(self, span: Span) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def _parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """(trace_id, parent span_id) from a W3C traceparent header."""
+    if not value:
+        return None
+    parts = value.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, exporter=None):
+        self.exporter = exporter or NullExporter()
+
+    @contextmanager
+    def span(
+        self, name: str, traceparent: str | None = None, **attributes: Any
+    ) -> Iterator[Span]:
+        """
+        Open a span under the current one, or continue the trace given by
+        `traceparent`, or start a new trace.
+        """
+        parent = _current_span.get()
+        remote = _parse_traceparent(traceparent)
+        if remote:
+            trace_id, parent_id = remote
+        elif parent:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent_id,
+            start_time=time.time_ns(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        start = time.perf_counter_ns()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            span.duration_ns = time.perf_counter_ns() - start
+            _current_span.reset(token)
+            try:
+                self.exporter.export(span)
+            except Exception as e:
+                logger.warning(f"Failed to export span {name}: {e}")
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def current_traceparent() -> str | None:
+    span = _current_span.get()
+    return span.traceparent if span else None
+
+
+def _build_exporter():
+    if settings.TRACING_EXPORTER == "file":
+        return JsonlExporter(settings.TRACING_FILE)
+    if settings.TRACING_EXPORTER == "memory":
+        return InMemoryExporter(settings.TRACING_MEMORY_SPANS)
+    return NullExporter()
+
+
+tracer = Tracer(_build_exporter())
+
+
+def format_traces(spans: Iterable[dict[str, Any]], min_ms: float = 0.0) -> str:
+    """Render spans (as dicts) as indented trees, one per trace."""
+    by_trace: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        by_trace[span["trace_id"]].append(span)
+
+    lines = []
+    for trace_id, trace in by_trace.items():
+        ids = {s["span_id"] for s in trace}
+        roots = [s for s in trace if s["parent_id"] not in ids]
+        total_ms = max(s["duration_ns"] for s in roots) / 1e6
+        if total_ms < min_ms:
+            continue
+
+        children = defaultdict(list)
+        for s in trace:
+            children[s["parent_id"]].append(s)
+
+        lines.append(f"trace {trace_id} ({total_ms:.1f}ms)")
+
+        def walk(span: dict[str, Any], depth: int) -> None:
+            attrs = " ".join(f"{k}={v}" for k, v in span["attributes"].items())
+            error = f" ERROR {span['error']}" if span["error"] else ""
+            lines.append(
+                f"{'  ' * (depth + 1)}{span['name']} "
+                f"{span['duration_ns'] / 1e6:.1f}ms {attrs}{error}".rstrip()
+            )
+            for child in sorted(
+                children[span["span_id"]], key=lambda s: s["start_time"]
+            ):
+                walk(child, depth + 1)
+
+        for root in sorted(roots, key=lambda s: s["start_time"]):
+            walk(root, 0)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print traces from a JSONL file")
+    parser.add_argument("path")
+    parser.add_argument("--min-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with open(args.path) as f:
+        print(format_traces((json.loads(line) for line in f), args.min_ms))
@@ -1,5 +1,15 @@
 from datetime import datetime, timezone
-from sqlalchemy import String, Integer, DateTime, ForeignKey
+from sqlalchemy import (
+    String,
+    Integer,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -26,6 +36,9 @@ class User(Base):
 
 class GoogleCredentials(Base):
     __tablename__ = "google_credentials"
+    __table_args__ = (
+        UniqueConstraint("user_id", name="uq_google_credentials_user_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.slack_id"))
@@ -42,12 +55,126 @@ class GoogleCredentials(Base):
 
 
 class SyncState(Base):
+    """
+    Sync token and watch channel of one of a user's calendars.
+    """
+
     __tablename__ = "sync_states"
+    __table_args__ = (
+        UniqueConstraint("user_id", "calendar_id", name="uq_sync_states_user_calendar"),
+        # Channel renewal scans by expiration
+        Index("ix_sync_states_expiration", "expiration"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.slack_id"))
-    resource_id: Mapped[str] = mapped_column(String)  # Webhook Channel ID
+    calendar_id: Mapped[str] = mapped_column(
+        String, default="primary", server_default="primary"
+    )
+    resource_id: Mapped[str] = mapped_column(
+        String, unique=True, index=True
+    )  # Webhook Channel ID
+    # Google's resourceId for the channel, needed to stop it
+    channel_resource_id: Mapped[str | None] = mapped_column(String, nullable=True)
     sync_token: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Checkpoint of an unfinished paginated sync (nextPageToken of the last page)
+    page_token: Mapped[str | None] = mapped_column(String, nullable=True)
+    # timeMin of the initial sync that checkpoint belongs to; every page of a
+    # listing must be requested with the same parameters
+    page_time_min: Mapped[str | None] = mapped_column(String, nullable=True)
     expiration: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Consecutive failed channel renewals, and when the next one may run
+    renewal_failures: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0"
+    )
+    renewal_retry_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
 
     user: Mapped["User"] = relationship(back_populates="sync_states")
+
+
+class SyncJob(Base):
+    """
+    Durable sync request, consumed by `python -m app.worker`.
+    At most one pending job exists per user (partial unique index).
+    """
+
+    __tablename__ = "sync_jobs"
+    __table_args__ = (
+        Index(
+            "uq_sync_jobs_pending_user",
+            "user_id",
+            unique=True,
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index("ix_sync_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.slack_id"))
+    status: Mapped[str] = mapped_column(String, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+    # W3C traceparent of the request that queued the job
+    traceparent: Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class PendingNotification(Base):
+    """
+    Calendar change waiting to be sent in a user's Slack digest.
+    Written in the sync transaction that mirrors the change and deleted once
+    the digest is sent, so a crash or a failed send does not lose it.
+    """
+
+    __tablename__ = "pending_notifications"
+    __table_args__ = (Index("ix_pending_notifications_user_id", "user_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.slack_id"))
+    # The fields of the Google event the digest line is built from
+    event: Mapped[dict] = mapped_column(JSONB)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class CalendarEvent(Base):
+    """
+    Local mirror of a Google Calendar event, used to skip unchanged events
+    (by etag) and to answer read queries without calling Google.
+    """
+
+    __tablename__ = "events"
+    __table_args__ = (
+        # Reminder scheduler: upcoming starts, and rows changed since its last poll
+        Index("ix_events_start_at", "start_at"),
+        Index("ix_events_synced_at", "synced_at"),
+    )
+
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.slack_id"), primary_key=True)
+    calendar_id: Mapped[str] = mapped_column(String, primary_key=True)
+    event_id: Mapped[str] = mapped_column(String, primary_key=True)
+    etag: Mapped[str | None] = mapped_column(String, nullable=True)
+    status: Mapped[str | None] = mapped_column(String, nullable=True)
+    summary: Mapped[str | None] = mapped_column(String, nullable=True)
+    start_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    end_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    all_day: Mapped[bool] = mapped_column(Boolean, default=False)
+    updated: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    synced_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
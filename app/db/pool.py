@@ -0,0 +1,53 @@
+import time
+from typing import Any
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait for a connection.
+    A growing wait means pool_size / max_overflow are too small for the
+    current concurrency.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # Keep counters across dispose()/recreate
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.checkout_timeouts = self.checkout_timeouts
+        pool.wait_total = self.wait_total
+        pool.wait_max = self.wait_max
+        return pool
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "idle": self.checkedin(),
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "wait_avg": self.wait_total / self.checkouts if self.checkouts else 0.0,
+            "wait_max": self.wait_max,
+        }
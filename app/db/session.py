@@ -1,13 +1,43 @@
 from collections.abc import AsyncGenerator
+from typing import Any
+from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.core.metrics import registry
+from app.db.pool import InstrumentedPool
+
+
+def engine_options(config: Settings) -> dict[str, Any]:
+    """
+    create_async_engine() keyword arguments for the given settings.
+    """
+    connect_args: dict[str, Any] = {
+        # asyncpg's own cache and SQLAlchemy's prepared statement cache
+        "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+    }
+    if config.DB_PGBOUNCER_MODE:
+        # Transaction pooling: a statement prepared on one server connection
+        # may not exist on the next, so never cache them and avoid name clashes
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+    return {
+        "echo": config.DB_SQL_ECHO,
+        "poolclass": InstrumentedPool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
 
 engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    echo=True,  # Log SQL queries for dev
-    future=True,
+    settings.SQLALCHEMY_DATABASE_URI, **engine_options(settings)
 )
 
 SessionLocal = async_sessionmaker(
@@ -18,6 +48,22 @@ SessionLocal = async_sessionmaker(
 )
 
 
+def pool_stats() -> dict[str, Any]:
+    """Connections in use and checkout wait times of the app's pool."""
+    return engine.pool.stats()
+
+
+_pool_gauge = registry.gauge(
+    "db_pool", "DB connection pool usage and checkout waits", ("stat",)
+)
+
+
+@registry.collector
+def _collect_pool_stats() -> None:
+    for stat, value in pool_stats().items():
+        _pool_gauge.set(value, stat=stat)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency to get DB session.
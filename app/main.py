@@ -1,31 +1,71 @@
 from fastapi import FastAPI
+from fastapi.responses import Response
 from app.core.config import settings
+from app.core.google_calendar import close_http_session
+from app.core.metrics import CONTENT_TYPE, registry
+from app.core.leader import LeaderElector
 from app.core.middleware import RequestLoggingMiddleware
+from app.core.tasks import background_tasks
+from app.core.tracing import tracer
 
 import asyncio
 from contextlib import asynccontextmanager
-from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
 
 from app.api.routes import auth, webhooks
-from app.core.slack import slack_app
+from app.core.slack import get_slack_app
+from app.services.channel_renewal import channel_renewal
+from app.services.digest import digest_buffer
+from app.services.reminders import reminder_scheduler
+from app.services.token_writeback import token_writeback
+from app.services.webhook_queue import webhook_queue
+
+
+async def run_socket_mode() -> None:
+    """Hold the Slack Socket Mode connection until cancelled."""
+    from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+
+    handler = AsyncSocketModeHandler(get_slack_app(), settings.SLACK_APP_TOKEN)
+    try:
+        await handler.connect_async()
+        await asyncio.Event().wait()
+    finally:
+        await handler.close_async()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Start generic async task for Slack Socket Mode
-    # WARNING: In production, you might want to run this as a separate process/worker
-    # instead of inside the same event loop as FastAPI.
-    # But for MVP, this is fine.
+    # Persist refreshed Google access tokens in batches (every process)
+    writeback_task = asyncio.create_task(token_writeback.run())
 
+    # Singleton tasks run only in the process holding the leader lock
+    leader = LeaderElector("panager-api")
+    # Renew Google push channels before they expire
+    leader.register(channel_renewal.run)
+    # Remind users of upcoming events
+    leader.register(reminder_scheduler.run)
+    # Slack Socket Mode, unless `python -m app.slack_worker` owns it.
     # Check if app token is set (it might be dummy in CI/test)
-    if settings.SLACK_APP_TOKEN and "xapp" in settings.SLACK_APP_TOKEN:
-        handler = AsyncSocketModeHandler(slack_app, settings.SLACK_APP_TOKEN)
-        # Run in background
-        _ = asyncio.create_task(handler.start_async())
-        yield
-        # Shutdown logic if needed (handler doesn't have stop properly exposed in easy way?)
-    else:
-        yield
+    if (
+        settings.SLACK_SOCKET_MODE_IN_API
+        and settings.SLACK_APP_TOKEN
+        and "xapp" in settings.SLACK_APP_TOKEN
+    ):
+        leader.register(run_socket_mode)
+    leader_task = asyncio.create_task(leader.run())
+
+    yield
+
+    # Shutdown: hand over leadership, finish queued webhook syncs and
+    # post-login follow-ups, send pending digests, flush refreshed tokens,
+    # then release pooled Google connections
+    leader_task.cancel()
+    await webhook_queue.drain()
+    await background_tasks.drain(timeout=settings.SHUTDOWN_GRACE_PERIOD)
+    await digest_buffer.drain()
+    writeback_task.cancel()
+    await asyncio.gather(writeback_task, leader_task, return_exceptions=True)
+    await close_http_session()
+    tracer.exporter.close()
 
 
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, lifespan=lifespan)
@@ -48,3 +88,11 @@ async def health():
     Used by container orchestration to verify app is running.
     """
     return {"status": "healthy", "version": settings.VERSION}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint (text exposition format).
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,235 +1,601 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import partial
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from app.db.models import SyncState, GoogleCredentials
 from app.core.config import settings
+from app.core.exceptions import CalendarSyncError, GoogleApiError
+from app.core.google_calendar import (
+    GoogleCalendarClient,
+    access_token_cache,
+    client_cache,
+    invalidate_client,
+)
+from app.core.metrics import (
+    sync_changed_events,
+    sync_duration,
+    sync_event_count,
+    sync_full_resyncs,
+    watch_registrations,
+    webhook_notifications,
+)
 from app.core.security import decrypt_token
+from app.core.tracing import current_span, tracer
+from app.services.digest import digest_buffer
+from app.services.event_store import EventStore
+from app.services.token_writeback import token_writeback
+from app.services.webhook_queue import webhook_queue
+import asyncio
 import logging
+import time
 import uuid
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 
 logger = logging.getLogger(__name__)
 
+# Calendar list access roles that can read events (not just free/busy)
+READABLE_ROLES = {"reader", "writer", "owner"}
+
+
+class ResyncLimiter:
+    """
+    Caps full resyncs: at most `concurrency` per process, and one at a time
+    per user, so many sync tokens expiring together cannot stampede Google.
+    """
+
+    def __init__(self, concurrency: int = settings.SYNC_RESYNC_CONCURRENCY):
+        self._slots = asyncio.Semaphore(concurrency)
+        self._users: dict[str, asyncio.Lock] = {}
+        self._holders: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, user_id: str) -> AsyncIterator[None]:
+        lock = self._users.setdefault(user_id, asyncio.Lock())
+        self._holders[user_id] = self._holders.get(user_id, 0) + 1
+        try:
+            async with lock, self._slots:
+                yield
+        finally:
+            self._holders[user_id] -= 1
+            if not self._holders[user_id]:
+                del self._holders[user_id]
+                del self._users[user_id]
+
+
+resync_limiter = ResyncLimiter()
+
 
 class CalendarService:
     def __init__(self, session: AsyncSession):
         self.session = session
+        self._staged_notifications = False
 
-    async def process_webhook(self, channel_id: str, resource_state: str):
+    async def process_webhook(self, channel_id: str, resource_state: str) -> bool:
         """
         Process Google Calendar Webhook.
         1. Validate channel_id (resource_id in DB).
-        2. If valid, trigger sync.
+        2. If valid, queue a sync (coalesced per channel, runs after the response).
         """
-        stmt = select(SyncState).where(SyncState.resource_id == channel_id)
-        result = await self.session.execute(stmt)
-        sync_state = result.scalar_one_or_none()
-
-        if not sync_state:
-            logger.warning(f"Received webhook for unknown channel: {channel_id}")
-            # We return True even if not found to tell Google to stop?
-            # Or False/Error? Google retries on 500.
-            # If we return 200, Google thinks it's delivered.
-            # If it's unknown, maybe we should return 404?
-            # But that might cause retries. 200 is safer to stop spam.
-            return False
-
-        logger.info(
-            f"Processing webhook for user {sync_state.user_id}, state: {resource_state}"
-        )
+        with tracer.span("calendar.process_webhook", channel_id=channel_id) as span:
+            stmt = select(SyncState).where(SyncState.resource_id == channel_id)
+            result = await self.session.execute(stmt)
+            sync_state = result.scalar_one_or_none()
 
-        if resource_state == "sync":
-            # Initial sync or renewal
-            pass
-        elif resource_state == "exists":
-            # Something changed
-            await self.sync_events(sync_state.user_id)
+            webhook_notifications.inc(
+                state=resource_state, known="true" if sync_state else "false"
+            )
+            if not sync_state:
+                logger.warning(f"Received webhook for unknown channel: {channel_id}")
+                # We return True even if not found to tell Google to stop?
+                # Or False/Error? Google retries on 500.
+                # If we return 200, Google thinks it's delivered.
+                # If it's unknown, maybe we should return 404?
+                # But that might cause retries. 200 is safer to stop spam.
+                return False
+
+            span.set_attribute("user_id", sync_state.user_id)
+            logger.info(
+                f"Processing webhook for user {sync_state.user_id}, state: {resource_state}"
+            )
+
+            if resource_state == "sync":
+                # Initial sync or renewal
+                pass
+            elif resource_state == "exists":
+                # Something changed; the queued task inherits this span
+                webhook_queue.submit(channel_id, sync_state.user_id)
 
-        return True
+            return True
 
-    async def _get_service(self, slack_id: str):
+    async def _get_client(self, slack_id: str) -> GoogleCalendarClient | None:
         stmt = select(GoogleCredentials).where(GoogleCredentials.user_id == slack_id)
         result = await self.session.execute(stmt)
         creds_db = result.scalars().first()
 
         if not creds_db:
+            invalidate_client(slack_id)
             return None
 
+        cached = client_cache.get(slack_id)
+        if cached:
+            if cached[0] == creds_db.refresh_token:
+                return cached[1]
+            # Re-authorized since the client was built (possibly by another
+            # process): its cached access token belongs to the old grant too
+            invalidate_client(slack_id)
+
         refresh_token = (
             decrypt_token(creds_db.refresh_token) if creds_db.refresh_token else None
         )
 
-        creds = Credentials(
-            token=creds_db.access_token,
+        # A token refreshed earlier may not be written back to the DB yet
+        access_token, expires_at = access_token_cache.get(slack_id) or (
+            creds_db.access_token,
+            creds_db.expires_at,
+        )
+
+        client = GoogleCalendarClient(
+            access_token=access_token,
             refresh_token=refresh_token,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=settings.GOOGLE_CLIENT_ID,
-            client_secret=settings.GOOGLE_CLIENT_SECRET,
-            scopes=["https://www.googleapis.com/auth/calendar.events"],
+            expires_at=expires_at,
+            user_id=slack_id,
+            on_refresh=partial(
+                token_writeback.record, refresh_token=creds_db.refresh_token
+            ),
         )
-        return build("calendar", "v3", credentials=creds)
+        client_cache.set(slack_id, (creds_db.refresh_token, client))
+        return client
 
     async def sync_events(self, user_id: str):
         """
         Sync events for user and send notification to Slack.
+        Covers every calendar with a SyncState. Each round fetches the next
+        page of all unfinished calendars in one batch request; after each round
+        the page cursors are checkpointed so an interrupted sync resumes there.
+        Raises CalendarSyncError if any calendar failed, so the job is retried.
         """
+        with tracer.span("calendar.sync_events", user_id=user_id):
+            await self._sync_events(user_id)
+
+    async def _sync_events(self, user_id: str):
         logger.info(f"Syncing events for user {user_id}")
 
-        service = await self._get_service(user_id)
-        if not service:
+        client = await self._get_client(user_id)
+        if not client:
             logger.error(f"Cannot sync, no credentials for {user_id}")
             return
 
-        # Get Sync Token from DB
-        stmt = select(SyncState).where(SyncState.user_id == user_id)
-        result = await self.session.execute(stmt)
-        sync_state = result.scalars().first()
-        sync_token = (
-            sync_state.sync_token if sync_state and sync_state.sync_token else None
+        # Sync tokens (and page checkpoints) of the user's calendars
+        stmt = (
+            select(SyncState).where(SyncState.user_id == user_id).order_by(SyncState.id)
         )
-
+        states = list((await self.session.execute(stmt)).scalars())
+        if not states:
+            # Not watched yet: a one-off initial sync of the primary calendar
+            states = [SyncState(user_id=user_id, calendar_id="primary")]
+
+        start = time.perf_counter()
+        outcome = "error"
+        total = 0
         try:
-            # List events (incremental sync)
-            list_args = {"calendarId": "primary", "singleEvents": True}
-            is_initial_sync = False
-
-            if sync_token:
-                list_args["syncToken"] = sync_token
-            else:
-                # Initial sync: Just get the token, don't notify
-                is_initial_sync = True
-                import datetime
-
-                now = datetime.datetime.utcnow().isoformat() + "Z"
-                list_args["timeMin"] = now
-                # Limit results on initial sync to avoid fetching too much data
-                # We just need the nextSyncToken
-                # But Google API requires iterating pages to get syncToken usually.
-                # However, if we just want to suppress notification, we can fetch but skip loop.
-
-            events_result = service.events().list(**list_args).execute()
-
-            items = events_result.get("items", [])
-            next_sync_token = events_result.get("nextSyncToken")
-
-            # Update sync token
-            if sync_state:
-                sync_state.sync_token = next_sync_token
-                await self.session.commit()
-
-            if not items:
+            event_store = EventStore(self.session)
+            pending = [(state, *self._list_args(state)) for state in states]
+            failed = False
+            expired = []
+
+            while pending:
+                calls = [
+                    (state.calendar_id, {**list_args, "pageToken": state.page_token})
+                    for state, list_args, _ in pending
+                ]
+                results = await client.batch_list_events(calls)
+
+                next_round = []
+                for (state, list_args, is_initial_sync), page in zip(pending, results):
+                    if _sync_token_expired(page):
+                        # Keep the dead token until the resync replaces it, so
+                        # an interrupted resync is retried by the next sync
+                        expired.append(state)
+                        continue
+                    if isinstance(page, Exception):
+                        failed = True
+                        self._handle_sync_error(state, page)
+                        continue
+
+                    items = page.get("items", [])
+                    total += len(items)
+
+                    # Mirror the page; events whose etag did not change are dropped
+                    changed = await event_store.apply_page(
+                        user_id, state.calendar_id, items
+                    )
+                    sync_changed_events.inc(len(changed))
+
+                    # Skip notifications for initial sync (prevent spam)
+                    if changed and not is_initial_sync:
+                        await self._notify_events(user_id, changed)
+
+                    # Checkpoint: the next page cursor, or the new sync token on the last page
+                    state.page_token = page.get("nextPageToken")
+                    state.page_time_min = (
+                        list_args.get("timeMin") if state.page_token else None
+                    )
+                    if state.page_token:
+                        next_round.append((state, list_args, is_initial_sync))
+                    else:
+                        state.sync_token = page.get("nextSyncToken")
+                        if is_initial_sync:
+                            logger.info(
+                                f"Initial sync of {state.calendar_id} complete "
+                                "(notifications skipped)."
+                            )
+
+                # Committed together with the mirrored rows
+                await self._commit(user_id)
+                pending = next_round
+
+            for state in expired:
+                try:
+                    total += await self._full_resync(client, state)
+                except Exception as e:
+                    failed = True
+                    logger.error(f"Full resync of {state.calendar_id} failed: {e}")
+
+            if failed:
+                # Calendars that synced stay committed; the job is retried
+                raise CalendarSyncError(f"Sync failed for some calendars of {user_id}")
+            if not total:
                 logger.info("No new events found.")
-                return
+            outcome = "ok"
 
-            # Skip notifications for initial sync (prevent spam)
-            if is_initial_sync:
+        except Exception as e:
+            logger.error(f"Error syncing events: {e}")
+            if isinstance(e, CalendarSyncError):
+                raise
+            raise CalendarSyncError(f"Sync failed for {user_id}: {e}") from e
+        finally:
+            sync_duration.observe(time.perf_counter() - start, outcome=outcome)
+            sync_event_count.observe(total)
+            span = current_span()
+            if span:
+                span.set_attribute("calendars", len(states))
+                span.set_attribute("events", total)
+                span.set_attribute("outcome", outcome)
+
+    @staticmethod
+    def _list_args(state: SyncState) -> tuple[dict, bool]:
+        """events.list parameters for a calendar, and whether it is an initial sync."""
+        list_args = {"singleEvents": True}
+        if state.sync_token:
+            # Incremental sync
+            list_args["syncToken"] = state.sync_token
+            return list_args, False
+
+        # Initial sync: Just get the token, don't notify
+        if state.page_token and state.page_time_min:
+            # Same window as the pages before the checkpoint
+            logger.info(f"Resuming sync of {state.calendar_id} from page checkpoint")
+            list_args["timeMin"] = state.page_time_min
+            return list_args, True
+        if state.page_token:
+            # Checkpoint without its window: its pages cannot be matched
+            logger.warning(
+                f"Restarting sync of {state.calendar_id}, page checkpoint has no window"
+            )
+            state.page_token = None
+        list_args["timeMin"] = (
+            datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        )
+        return list_args, True
+
+    @staticmethod
+    def _handle_sync_error(state: SyncState, error: Exception) -> None:
+        """Reset a calendar's page cursor when Google rejects it; the caller commits."""
+        if (
+            state.page_token
+            and isinstance(error, GoogleApiError)
+            and error.status == 400
+        ):
+            # Checkpointed page token rejected: start this sync over next time
+            logger.warning(
+                f"Page checkpoint rejected for {state.calendar_id}, clearing..."
+            )
+            state.page_token = None
+            state.page_time_min = None
+        logger.error(f"Error syncing calendar {state.calendar_id}: {error}")
+
+    async def _full_resync(self, client: GoogleCalendarClient, state: SyncState) -> int:
+        """
+        Rebuild a calendar whose sync token Google invalidated (410).
+        Streams a fresh listing page by page and notifies only what differs
+        from the mirror: new or changed events per page, then the mirrored
+        events Google no longer lists (deleted while the token was dead).
+        The new sync token is saved last. Returns the number of events listed.
+        """
+        user_id, calendar_id = state.user_id, state.calendar_id
+        async with resync_limiter.slot(user_id):
+            with tracer.span(
+                "calendar.full_resync", user_id=user_id, calendar_id=calendar_id
+            ) as span:
+                logger.warning(f"Sync token expired for {calendar_id}, resyncing...")
+                outcome = "error"
+                try:
+                    window_start = datetime.now(timezone.utc)
+                    time_min = window_start.isoformat().replace("+00:00", "Z")
+                    event_store = EventStore(self.session)
+                    seen: set[str] = set()
+                    last_page: dict = {}
+
+                    async for page in client.iter_event_pages(
+                        calendar_id, singleEvents=True, timeMin=time_min
+                    ):
+                        items = page.get("items", [])
+                        seen.update(item["id"] for item in items if item.get("id"))
+                        changed = await event_store.apply_page(
+                            user_id, calendar_id, items
+                        )
+                        sync_changed_events.inc(len(changed))
+                        if changed:
+                            await self._notify_events(user_id, changed)
+                        # Mirrored rows only; a crash restarts the resync, and
+                        # pages already applied no longer differ
+                        await self._commit(user_id)
+                        last_page = page
+
+                    removed = await event_store.mark_missing(
+                        user_id, calendar_id, seen, since=window_start
+                    )
+                    sync_changed_events.inc(len(removed))
+                    if removed:
+                        await self._notify_events(user_id, removed)
+
+                    state.sync_token = last_page.get("nextSyncToken")
+                    state.page_token = None
+                    state.page_time_min = None
+                    await self._commit(user_id)
+                    outcome = "ok"
+                finally:
+                    sync_full_resyncs.inc(outcome=outcome)
+                span.set_attribute("events", len(seen))
                 logger.info(
-                    f"Initial sync complete. Found {len(items)} events (notifications skipped)."
+                    f"Resynced {calendar_id}: {len(seen)} listed, "
+                    f"{len(removed)} removed"
                 )
-                return
+                return len(seen)
 
-            # Notify Slack
-            from app.core.slack import slack_app
-            from app.services.slack_service import SlackService
-
-            slack = SlackService(slack_app)
+    async def _notify_events(self, user_id: str, items: list[dict]) -> None:
+        """
+        Stage changed events for the user's Slack digest in the current
+        transaction; changes within the debounce window are sent together
+        as one message.
+        """
+        digest_buffer.stage(self.session, user_id, items)
+        self._staged_notifications = True
+
+    async def _commit(self, user_id: str) -> None:
+        """Commit, then open the digest window for the changes staged with it."""
+        await self.session.commit()
+        if self._staged_notifications:
+            self._staged_notifications = False
+            digest_buffer.schedule(user_id)
+
+    async def _register_channel(
+        self, client: GoogleCalendarClient, slack_id: str, calendar_id: str = "primary"
+    ) -> tuple[str, dict]:
+        """
+        Open a new push channel on one of the user's calendars.
+        Returns (channel_id, Google's watch response).
+        """
+        channel_id = str(uuid.uuid4())
+        # Ideally, we need a public HTTPS URL.
+        # For local dev, we use ngrok URL from settings.
+        # If not set, it will fail or we mock it.
+        webhook_url = (
+            f"{settings.PUBLIC_URL}/api/v1/webhook/google/calendar"
+            if hasattr(settings, "PUBLIC_URL")
+            else "https://example.com/webhook"
+        )
 
-            for event in items:
-                # "cancelled" status means deleted
-                status = event.get("status")
-                summary = event.get("summary", "(No Title)")
-                start = event.get("start", {}).get(
-                    "dateTime", event.get("start", {}).get("date")
-                )
-                html_link = event.get("htmlLink", "#")
+        body = {"id": channel_id, "type": "web_hook", "address": webhook_url}
+        logger.info(
+            f"Registering watch for {slack_id} ({calendar_id}) with URL {webhook_url}"
+        )
 
-                msg = ""
-                if status == "cancelled":
-                    msg = f"🗑️ 일정이 삭제되었습니다: *{summary}*"
-                else:
-                    msg = f"📅 일정이 변경/생성되었습니다: *<{html_link}|{summary}>*\n⏰ 시작: {start}"
+        response = await client.watch_events(calendar_id, body)
+        logger.info(f"Watch response: {response}")
+        return channel_id, response
 
-                await slack.send_dm(user_id, msg)
+    async def discover_calendars(
+        self, client: GoogleCalendarClient
+    ) -> list[str] | None:
+        """
+        Calendars to sync: the primary one, then the shared and room calendars
+        on the user's calendar list whose events the user can read. Hidden and
+        free/busy-only calendars are skipped; capped at SYNC_MAX_CALENDARS.
+        Returns None if the list cannot be read, which says nothing about
+        which calendars the user still has.
+        """
+        try:
+            items = await client.list_calendars()
+        except Exception as e:
+            logger.warning(f"Failed to list calendars: {e}")
+            return None
 
+        calendar_ids = ["primary"]
+        for item in items:
+            # The primary calendar is listed under the user's email
+            if item.get("primary") or item.get("deleted") or item.get("hidden"):
+                continue
+            if item.get("accessRole") not in READABLE_ROLES:
+                continue
+            calendar_ids.append(item["id"])
+        return calendar_ids[: settings.SYNC_MAX_CALENDARS]
+
+    async def _stop_channel(
+        self, client: GoogleCalendarClient, channel_id: str, resource_id: str | None
+    ) -> None:
+        """Stop a replaced channel. Failures only mean it lingers until expiry."""
+        if not resource_id:
+            # Registered before resourceId was stored; it expires on its own
+            logger.debug(f"Cannot stop channel {channel_id} without resource id")
+            return
+        try:
+            await client.stop_channel(channel_id, resource_id)
         except Exception as e:
-            if "Sync token is no longer valid" in str(e):
-                # Full sync required (delete sync token and retry)
-                logger.warning("Sync token invalid, clearing...")
-                if sync_state:
-                    sync_state.sync_token = None
-                    await self.session.commit()
-                # Retry logic needed? For now just fail and wait for next webhook
-            logger.error(f"Error syncing events: {e}")
+            logger.warning(f"Failed to stop channel {channel_id}: {e}")
 
     async def watch_events(self, slack_id: str) -> bool:
         """
-        Register a watch (webhook) for the user's primary calendar.
+        Register a watch (webhook) on each of the user's calendars.
+        Every calendar gets its own SyncState with its own channel and sync
+        token. Calendars that left the user's list are unwatched; if the list
+        cannot be read, the calendars already watched are renewed instead.
+        Returns True if at least one channel was registered.
         """
-        # 1. Get User Credentials
-        stmt = select(GoogleCredentials).where(GoogleCredentials.user_id == slack_id)
-        result = await self.session.execute(stmt)
-        creds_db = result.scalars().first()
+        # 1. Get a Calendar client for the user's credentials
+        client = await self._get_client(slack_id)
 
-        if not creds_db:
+        if not client:
             logger.error(f"No credentials found for user {slack_id}")
             return False
 
-        # 2. Build Google Credentials Object
-        # Need to decrypt refresh token if encrypted
-        refresh_token = (
-            decrypt_token(creds_db.refresh_token) if creds_db.refresh_token else None
+        stmt = (
+            select(SyncState)
+            .where(SyncState.user_id == slack_id)
+            .order_by(SyncState.id)
         )
-
-        creds = Credentials(
-            token=creds_db.access_token,
-            refresh_token=refresh_token,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=settings.GOOGLE_CLIENT_ID,
-            client_secret=settings.GOOGLE_CLIENT_SECRET,
-            scopes=["https://www.googleapis.com/auth/calendar.events"],
-        )
-
-        # 3. Call Google API
-        service = build("calendar", "v3", credentials=creds)
-
-        channel_id = str(uuid.uuid4())
-        # Ideally, we need a public HTTPS URL.
-        # For local dev, we use ngrok URL from settings.
-        # If not set, it will fail or we mock it.
-        webhook_url = (
-            f"{settings.PUBLIC_URL}/api/v1/webhook/google/calendar"
-            if hasattr(settings, "PUBLIC_URL")
-            else "https://example.com/webhook"
+        result = await self.session.execute(stmt)
+        states = {state.calendar_id: state for state in result.scalars().all()}
+
+        # 2. Call Google API, one channel per calendar
+        calendar_ids = await self.discover_calendars(client)
+        discovered = calendar_ids is not None
+        if not discovered:
+            calendar_ids = ["primary", *(c for c in states if c != "primary")]
+        results = await asyncio.gather(
+            *(
+                self._register_channel(client, slack_id, calendar_id)
+                for calendar_id in calendar_ids
+            ),
+            return_exceptions=True,
         )
 
-        try:
-            body = {"id": channel_id, "type": "web_hook", "address": webhook_url}
-            logger.info(f"Registering watch for {slack_id} with URL {webhook_url}")
-
-            response = service.events().watch(calendarId="primary", body=body).execute()
-            logger.info(f"Watch response: {response}")
+        # 3. Save SyncStates to DB
 
-            # 4. Save SyncState to DB
+        old_channels = []
+        registered = 0
+        for calendar_id, outcome in zip(calendar_ids, results):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to watch {calendar_id} for {slack_id}: {outcome}")
+                watch_registrations.inc(kind="watch", outcome="error")
+                continue
+            channel_id, response = outcome
             # We need to save channel_id (id) and resourceId (from response) to validaate webhooks
             resource_id = response.get("resourceId")
             logger.debug(f"Received resource_id: {resource_id}")
 
-            # Check if exists
-            stmt = select(SyncState).where(SyncState.user_id == slack_id)
-            result = await self.session.execute(stmt)
-            sync_state = result.scalars().first()
-
+            sync_state = states.get(calendar_id)
             if not sync_state:
-                sync_state = SyncState(user_id=slack_id)
+                sync_state = SyncState(user_id=slack_id, calendar_id=calendar_id)
                 self.session.add(sync_state)
+            else:
+                old_channels.append(
+                    (sync_state.resource_id, sync_state.channel_resource_id)
+                )
 
             sync_state.resource_id = channel_id  # We used this as channel ID
+            sync_state.channel_resource_id = resource_id
+            sync_state.expiration = _parse_expiration(response.get("expiration"))
             sync_state.sync_token = ""  # Initial sync
-            # We might want to save actual Google Resource ID too if needed for stopping channel
+            sync_state.page_token = None
+            sync_state.page_time_min = None
+            sync_state.renewal_failures = 0
+            sync_state.renewal_retry_at = None
+            registered += 1
+            watch_registrations.inc(kind="watch", outcome="ok")
+
+        # Calendars the user no longer has on their list
+        for calendar_id, sync_state in states.items():
+            if discovered and calendar_id not in calendar_ids:
+                old_channels.append(
+                    (sync_state.resource_id, sync_state.channel_resource_id)
+                )
+                await self.session.delete(sync_state)
 
+        try:
             await self.session.commit()
-            return True
-
         except Exception as e:
             logger.error(f"Failed to watch events: {e}")
             return False
+
+        for old_channel in old_channels:
+            await self._stop_channel(client, *old_channel)
+        return registered > 0
+
+    async def renew_watch(self, slack_id: str, calendar_id: str = "primary") -> bool:
+        """
+        Replace the push channel of one of the user's calendars before it
+        expires. The sync token is kept, so no changes are missed or
+        re-notified. The old channel is stopped only once the new one is saved.
+        """
+        stmt = select(SyncState).where(
+            SyncState.user_id == slack_id, SyncState.calendar_id == calendar_id
+        )
+        sync_state = (await self.session.execute(stmt)).scalars().first()
+        if not sync_state:
+            return False
+
+        client = await self._get_client(slack_id)
+        if not client:
+            logger.error(f"Cannot renew watch, no credentials for {slack_id}")
+            return False
+
+        old_channel = sync_state.resource_id
+        old_resource_id = sync_state.channel_resource_id
+        try:
+            channel_id, response = await self._register_channel(
+                client, slack_id, calendar_id
+            )
+        except Exception as e:
+            logger.error(f"Failed to renew watch for {slack_id}: {e}")
+            watch_registrations.inc(kind="renew", outcome="error")
+            return False
+
+        # Swap only if nobody replaced the channel meanwhile
+        result = await self.session.execute(
+            update(SyncState)
+            .where(SyncState.id == sync_state.id, SyncState.resource_id == old_channel)
+            .values(
+                resource_id=channel_id,
+                channel_resource_id=response.get("resourceId"),
+                expiration=_parse_expiration(response.get("expiration")),
+            )
+        )
+        await self.session.commit()
+
+        if result.rowcount == 0:
+            logger.info(f"Watch for {slack_id} was already replaced")
+            await self._stop_channel(client, channel_id, response.get("resourceId"))
+            watch_registrations.inc(kind="renew", outcome="superseded")
+            return False
+
+        await self._stop_channel(client, old_channel, old_resource_id)
+        watch_registrations.inc(kind="renew", outcome="ok")
+        return True
+
+
+def _sync_token_expired(result: object) -> bool:
+    """True for Google's 410 "Sync token is no longer valid" response."""
+    if isinstance(result, GoogleApiError) and result.status == 410:
+        return True
+    return isinstance(result, Exception) and "Sync token is no longer valid" in str(
+        result
+    )
+
+
+def _parse_expiration(value: str | int | None) -> datetime | None:
+    """Channel expiration comes back as epoch milliseconds (a string)."""
+    if not value:
+        return None
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select, update
+
+from app.core.config import settings
+from app.db.models import SyncState
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+async def renew_channel(user_id: str, calendar_id: str = "primary") -> bool:
+    """Renew the watch channel of one of a user's calendars in its own session."""
+    from app.services.calendar_service import CalendarService
+
+    async with SessionLocal() as session:
+        return await CalendarService(session).renew_watch(user_id, calendar_id)
+
+
+class ChannelRenewalScheduler:
+    """
+    Keeps Google push channels alive.
+
+    Every `interval` seconds it reads, via ix_sync_states_expiration, the
+    channels expiring within `lead` (or with no known expiration) and renews
+    them in batches of `batch_size`. Each renewal waits a random jitter of up
+    to `jitter` seconds, and at most `concurrency` run at once, so a large
+    bucket of channels registered together is spread out instead of hitting
+    Google all at the same moment. A channel whose renewal fails is retried
+    with exponential backoff from `interval` up to `max_backoff`, so revoked
+    grants do not cost a Google call on every sweep.
+    """
+
+    def __init__(
+        self,
+        renewer=renew_channel,
+        session_factory=SessionLocal,
+        interval: float = settings.CHANNEL_RENEWAL_INTERVAL,
+        lead: float = settings.CHANNEL_RENEWAL_LEAD,
+        batch_size: int = settings.CHANNEL_RENEWAL_BATCH_SIZE,
+        concurrency: int = settings.CHANNEL_RENEWAL_CONCURRENCY,
+        jitter: float = settings.CHANNEL_RENEWAL_JITTER,
+        max_backoff: float = settings.CHANNEL_RENEWAL_MAX_BACKOFF,
+    ):
+        self.renewer = renewer
+        self.session_factory = session_factory
+        self.interval = interval
+        self.lead = lead
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+
+        self.renewed = 0
+        self.failed = 0
+
+    async def due_batch(
+        self, after_id: int, horizon: datetime
+    ) -> list[tuple[int, str, str, int]]:
+        """
+        (id, user_id, calendar_id, renewal_failures) of channels expiring
+        before `horizon` and not backing off, keyset by id.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = (
+            select(
+                SyncState.id,
+                SyncState.user_id,
+                SyncState.calendar_id,
+                SyncState.renewal_failures,
+            )
+            .where(
+                or_(SyncState.expiration < horizon, SyncState.expiration.is_(None)),
+                or_(
+                    SyncState.renewal_retry_at.is_(None),
+                    SyncState.renewal_retry_at <= now,
+                ),
+                SyncState.id > after_id,
+            )
+            .order_by(SyncState.id)
+            .limit(self.batch_size)
+        )
+        async with self.session_factory() as session:
+            return [tuple(row) for row in (await session.execute(stmt)).all()]
+
+    async def _renew(
+        self,
+        state_id: int,
+        user_id: str,
+        calendar_id: str,
+        failures: int,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        if self.jitter:
+            await asyncio.sleep(random.uniform(0, self.jitter))
+        async with semaphore:
+            try:
+                ok = await self.renewer(user_id, calendar_id)
+            except Exception as e:
+                logger.error(
+                    f"Channel renewal failed for {user_id} ({calendar_id}): {e}"
+                )
+                ok = False
+        if ok:
+            self.renewed += 1
+            if failures:
+                await self._record(state_id, 0, None)
+        else:
+            self.failed += 1
+            failures += 1
+            delay = min(self.interval * 2 ** (failures - 1), self.max_backoff)
+            retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            await self._record(state_id, failures, retry_at)
+
+    async def _record(
+        self, state_id: int, failures: int, retry_at: datetime | None
+    ) -> None:
+        """Save the renewal outcome, so failed channels back off across sweeps."""
+        try:
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(SyncState)
+                    .where(SyncState.id == state_id)
+                    .values(renewal_failures=failures, renewal_retry_at=retry_at)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to record renewal of sync state {state_id}: {e}")
+
+    async def sweep(self) -> int:
+        """Renew every channel currently due. Returns the number attempted."""
+        horizon = datetime.now(timezone.utc) + timedelta(seconds=self.lead)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        last_id = 0
+        attempted = 0
+
+        while True:
+            batch = await self.due_batch(last_id, horizon)
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            attempted += len(batch)
+            await asyncio.gather(
+                *(self._renew(*state, semaphore=semaphore) for state in batch)
+            )
+
+        if attempted:
+            logger.info(
+                f"Channel renewal sweep: {attempted} due, "
+                f"{self.renewed} renewed / {self.failed} failed so far"
+            )
+        return attempted
+
+    async def run(self) -> None:
+        """Sweep periodically until cancelled."""
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Channel renewal sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+channel_renewal = ChannelRenewalScheduler()
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.models import PendingNotification
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+DigestSender = Callable[[str, str, list[dict[str, Any]] | None], Awaitable[None]]
+
+
+def format_event(event: dict[str, Any]) -> str:
+    """One Slack mrkdwn line for a changed (or deleted) event."""
+    summary = event.get("summary") or "(No Title)"
+    # "cancelled" status means deleted
+    if event.get("status") == "cancelled":
+        return f"🗑️ 일정이 삭제되었습니다: *{summary}*"
+    start = event.get("start", {}).get("dateTime", event.get("start", {}).get("date"))
+    html_link = event.get("htmlLink", "#")
+    return f"📅 일정이 변경/생성되었습니다: *<{html_link}|{summary}>*\n⏰ 시작: {start}"
+
+
+def _digest_fields(event: dict[str, Any]) -> dict[str, Any]:
+    """The parts of a Google event that `format_event` reads."""
+    return {
+        key: event[key]
+        for key in ("id", "status", "summary", "start", "htmlLink")
+        if key in event
+    }
+
+
+def build_digest(
+    events: list[dict[str, Any]], max_items: int
+) -> tuple[str, list[dict[str, Any]] | None]:
+    """
+    (text, blocks) for a batch of changes. A single change keeps the plain
+    one-event message; several become one Block Kit message listing the
+    first `max_items` and a "+N more" line for the rest.
+    """
+    if len(events) == 1:
+        return format_event(events[0]), None
+
+    text = f"📅 캘린더 일정 {len(events)}건이 변경되었습니다"
+    blocks: list[dict[str, Any]] = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"*{text}*"}},
+        {"type": "divider"},
+    ]
+    for event in events[:max_items]:
+        blocks.append(
+            {"type": "section", "text": {"type": "mrkdwn", "text": format_event(event)}}
+        )
+    overflow = len(events) - max_items
+    if overflow > 0:
+        blocks.append(
+            {
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": f"+{overflow} more"}],
+            }
+        )
+    return text, blocks
+
+
+async def send_digest(
+    user_id: str, text: str, blocks: list[dict[str, Any]] | None
+) -> None:
+    """Default sender: a Slack DM through the shared dispatcher."""
+    from app.core.slack import get_slack_app
+    from app.services.slack_service import SlackService
+
+    await SlackService(get_slack_app()).send_dm(user_id, text, blocks=blocks)
+
+
+class DigestBuffer:
+    """
+    Per-user digest of calendar change notifications.
+
+    Changes are staged as `pending_notifications` rows in the sync's own
+    transaction. Once it commits, the first change for a user opens a
+    debounce window of `window` seconds; every change committed before it
+    closes joins the same digest, the latest version of an event replacing
+    earlier ones. A bulk edit (e.g. dozens of recurring-meeting instances)
+    then costs one Slack message instead of one per event.
+
+    Rows are deleted only after the digest is sent. A failed send keeps them
+    for `retry_unsent`, up to `max_attempts` sends; rows left by a crashed
+    process are picked up the same way.
+    """
+
+    def __init__(
+        self,
+        sender: DigestSender = send_digest,
+        window: float = settings.NOTIFY_DIGEST_WINDOW,
+        max_items: int = settings.NOTIFY_DIGEST_MAX_ITEMS,
+        max_attempts: int = settings.NOTIFY_DIGEST_MAX_ATTEMPTS,
+        session_factory=SessionLocal,
+    ):
+        self.sender = sender
+        self.window = window
+        self.max_items = max_items
+        self.max_attempts = max_attempts
+        self.session_factory = session_factory
+        self._waiting: dict[str, asyncio.Task] = {}
+        self._sending: set[asyncio.Task] = set()
+
+        # Counters
+        self.received = 0
+        self.sent = 0
+        self.failed = 0
+
+    def stage(
+        self, session: AsyncSession, user_id: str, events: list[dict[str, Any]]
+    ) -> None:
+        """Add changed events to the session; committed by the caller."""
+        session.add_all(
+            PendingNotification(user_id=user_id, event=_digest_fields(event))
+            for event in events
+        )
+        self.received += len(events)
+
+    def schedule(self, user_id: str) -> None:
+        """Open the user's debounce window, after staged changes are committed."""
+        if user_id not in self._waiting:
+            self._waiting[user_id] = asyncio.create_task(self._flush_later(user_id))
+
+    async def _flush_later(self, user_id: str) -> None:
+        await asyncio.sleep(self.window)
+        task = self._waiting.pop(user_id)
+        self._sending.add(task)
+        try:
+            await self._flush(user_id)
+        except Exception as e:
+            logger.error(f"Failed to flush digest of {user_id}: {e}")
+        finally:
+            self._sending.discard(task)
+
+    async def _flush(self, user_id: str) -> None:
+        async with self.session_factory() as session:
+            stmt = (
+                select(PendingNotification)
+                .where(PendingNotification.user_id == user_id)
+                .order_by(PendingNotification.id)
+                .with_for_update(skip_locked=True)
+            )
+            rows = list((await session.execute(stmt)).scalars())
+            if not rows:
+                return
+
+            events: dict[str, dict[str, Any]] = {}
+            for row in rows:
+                key = row.event.get("id") or str(row.id)
+                # Re-inserted so the digest lists events by their latest change
+                events.pop(key, None)
+                events[key] = row.event
+            text, blocks = build_digest(list(events.values()), self.max_items)
+
+            try:
+                await self.sender(user_id, text, blocks)
+            except Exception as e:
+                self.failed += 1
+                attempts = max(row.attempts for row in rows) + 1
+                if attempts >= self.max_attempts:
+                    logger.error(
+                        f"Giving up on digest of {len(events)} to {user_id} "
+                        f"after {attempts} attempts: {e}"
+                    )
+                    await self._delete(session, rows)
+                else:
+                    logger.error(
+                        f"Failed to send digest of {len(events)} to {user_id}, "
+                        f"will retry: {e}"
+                    )
+                    for row in rows:
+                        row.attempts = attempts
+                await session.commit()
+                return
+
+            await self._delete(session, rows)
+            await session.commit()
+            self.sent += 1
+
+    @staticmethod
+    async def _delete(session: AsyncSession, rows: list[PendingNotification]) -> None:
+        await session.execute(
+            delete(PendingNotification).where(
+                PendingNotification.id.in_([row.id for row in rows])
+            )
+        )
+
+    async def retry_unsent(self) -> int:
+        """
+        Send the digests of changes committed more than a window ago that no
+        open window of this process covers: failed sends and rows left by a
+        crashed process. Returns the number of users flushed.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.window)
+        stmt = select(PendingNotification.user_id).where(
+            PendingNotification.created_at < cutoff
+        )
+        async with self.session_factory() as session:
+            user_ids = set((await session.execute(stmt.distinct())).scalars())
+
+        flushed = 0
+        for user_id in user_ids - self._waiting.keys():
+            try:
+                await self._flush(user_id)
+                flushed += 1
+            except Exception as e:
+                logger.error(f"Failed to flush digest of {user_id}: {e}")
+        return flushed
+
+    @property
+    def depth(self) -> int:
+        """Users with changes waiting for their window to close."""
+        return len(self._waiting)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "received": self.received,
+            "sent": self.sent,
+            "failed": self.failed,
+        }
+
+    async def drain(self) -> None:
+        """Send every open digest now (used on shutdown)."""
+        waiting = list(self._waiting)
+        for task in self._waiting.values():
+            task.cancel()
+        await asyncio.gather(
+            *self._waiting.values(), *self._sending, return_exceptions=True
+        )
+        self._waiting.clear()
+        for user_id in waiting:
+            try:
+                await self._flush(user_id)
+            except Exception as e:
+                logger.error(f"Failed to flush digest of {user_id}: {e}")
+
+
+digest_buffer = DigestBuffer()
+
+_digest_gauge = registry.gauge(
+    "notification_digests", "Slack notification digest buffer state", ("stat",)
+)
+
+
+@registry.collector
+def _collect_digest_stats() -> None:
+    for stat, value in digest_buffer.stats().items():
+        _digest_gauge.set(value, stat=stat)
@@ -0,0 +1,148 @@
+import logging
+from datetime import date, datetime, time, timezone
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import CalendarEvent
+
+logger = logging.getLogger(__name__)
+
+# Columns rewritten when an event changes (everything but the primary key)
+_UPDATE_COLUMNS = (
+    "etag",
+    "status",
+    "summary",
+    "start_at",
+    "end_at",
+    "all_day",
+    "updated",
+    "synced_at",
+)
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def _parse_time(field: dict[str, Any] | None) -> tuple[datetime | None, bool]:
+    """
+    Google sends {"dateTime": ...} for timed events and {"date": ...} for
+    all-day events. All-day dates are stored as midnight UTC.
+    """
+    if not field:
+        return None, False
+    if field.get("dateTime"):
+        return _parse_datetime(field["dateTime"]), False
+    if field.get("date"):
+        day = date.fromisoformat(field["date"])
+        return datetime.combine(day, time.min, tzinfo=timezone.utc), True
+    return None, False
+
+
+def event_row(user_id: str, calendar_id: str, item: dict[str, Any]) -> dict[str, Any]:
+    """Map a Google event resource to an `events` row."""
+    start_at, all_day = _parse_time(item.get("start"))
+    end_at, _ = _parse_time(item.get("end"))
+    return {
+        "user_id": user_id,
+        "calendar_id": calendar_id,
+        "event_id": item["id"],
+        "etag": item.get("etag"),
+        "status": item.get("status"),
+        "summary": item.get("summary"),
+        "start_at": start_at,
+        "end_at": end_at,
+        "all_day": all_day,
+        "updated": _parse_datetime(item.get("updated")),
+        "synced_at": datetime.now(timezone.utc),
+    }
+
+
+class EventStore:
+    """
+    Writes sync pages into the local `events` mirror.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def apply_page(
+        self, user_id: str, calendar_id: str, items: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Upsert one page of events and return only the items that are new or
+        whose etag changed. Unchanged events are neither written nor returned.
+        The caller commits (together with its page checkpoint).
+        """
+        # Last occurrence wins if Google repeats an event within a page
+        by_id = {item["id"]: item for item in items if item.get("id")}
+        if not by_id:
+            return []
+
+        stmt = select(CalendarEvent.event_id, CalendarEvent.etag).where(
+            CalendarEvent.user_id == user_id,
+            CalendarEvent.calendar_id == calendar_id,
+            CalendarEvent.event_id.in_(list(by_id)),
+        )
+        known = dict((await self.session.execute(stmt)).all())
+
+        changed = [
+            item
+            for event_id, item in by_id.items()
+            if event_id not in known or known[event_id] != item.get("etag")
+        ]
+        if not changed:
+            logger.debug(f"All {len(by_id)} events unchanged for {user_id}")
+            return []
+
+        insert_stmt = insert(CalendarEvent).values(
+            [event_row(user_id, calendar_id, item) for item in changed]
+        )
+        await self.session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=["user_id", "calendar_id", "event_id"],
+                set_={col: insert_stmt.excluded[col] for col in _UPDATE_COLUMNS},
+            )
+        )
+        return changed
+
+    async def mark_missing(
+        self, user_id: str, calendar_id: str, seen: set[str], since: datetime
+    ) -> list[dict[str, Any]]:
+        """
+        After a full listing from `since` on, cancel the mirrored events that
+        end after `since` but were not listed: they were deleted while no sync
+        token covered the calendar. Returns them as minimal cancelled event
+        resources. The caller commits.
+        """
+        stmt = select(CalendarEvent.event_id, CalendarEvent.summary).where(
+            CalendarEvent.user_id == user_id,
+            CalendarEvent.calendar_id == calendar_id,
+            CalendarEvent.end_at > since,
+            CalendarEvent.status != "cancelled",
+        )
+        missing = [
+            {
+                "id": event_id,
+                "status": "cancelled",
+                **({"summary": summary} if summary else {}),
+            }
+            for event_id, summary in (await self.session.execute(stmt)).all()
+            if event_id not in seen
+        ]
+        if missing:
+            await self.session.execute(
+                update(CalendarEvent)
+                .where(
+                    CalendarEvent.user_id == user_id,
+                    CalendarEvent.calendar_id == calendar_id,
+                    CalendarEvent.event_id.in_([event["id"] for event in missing]),
+                )
+                .values(status="cancelled", synced_at=datetime.now(timezone.utc))
+            )
+        return missing
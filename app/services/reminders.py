@@ -0,0 +1,291 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import and_, select
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.models import CalendarEvent
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+# (user_id, calendar_id, event_id)
+EventKey = tuple[str, str, str]
+ReminderSender = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+# Re-read rows synced this long before the watermark, so a sync transaction
+# that committed after a poll started is not skipped
+POLL_OVERLAP = timedelta(seconds=60)
+
+
+class ReminderHeap(Generic[K, V]):
+    """
+    Min-heap of reminders keyed by event, with lazy cancellation.
+
+    `schedule` pushes a new entry and `cancel` only forgets the key, so both
+    stay O(log n) / O(1) with hundreds of thousands of reminders; entries of
+    cancelled or rescheduled keys are dropped when they reach the top.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, K]] = []
+        # key -> (sequence number of its live entry, payload)
+        self._live: dict[K, tuple[int, V]] = {}
+        self._seq = itertools.count()
+
+    def schedule(self, key: K, fire_at: float, payload: V) -> None:
+        """Add or move the reminder for `key`."""
+        seq = next(self._seq)
+        self._live[key] = (seq, payload)
+        heapq.heappush(self._heap, (fire_at, seq, key))
+        # Rebuild once stale entries dominate, to bound memory
+        if len(self._heap) > 2 * len(self._live) + 1024:
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+
+    def cancel(self, key: K) -> bool:
+        return self._live.pop(key, None) is not None
+
+    def _is_live(self, entry: tuple[float, int, K]) -> bool:
+        live = self._live.get(entry[2])
+        return live is not None and live[0] == entry[1]
+
+    def _drop_stale(self) -> None:
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def next_at(self) -> float | None:
+        """Fire time of the earliest live reminder."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[tuple[K, V]]:
+        """Remove and return every live reminder due at `now`."""
+        due = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            _, _, key = heapq.heappop(self._heap)
+            _, payload = self._live.pop(key)
+            due.append((key, payload))
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._live
+
+
+async def send_reminder(user_id: str, reminder: dict[str, Any]) -> None:
+    """Default sender: a Slack DM through SlackService."""
+    from app.core.slack import get_slack_app
+    from app.services.slack_service import SlackService
+
+    minutes = max(
+        round((reminder["start_at"] - datetime.now(timezone.utc)).total_seconds() / 60),
+        0,
+    )
+    summary = reminder.get("summary") or "(No Title)"
+    start = reminder["start_at"].isoformat()
+    await SlackService(get_slack_app()).send_dm(
+        user_id, f"⏰ *{summary}* 일정이 {minutes}분 후에 시작합니다\n🕒 시작: {start}"
+    )
+
+
+class ReminderScheduler:
+    """
+    Sends a Slack reminder `lead` seconds before each upcoming event.
+
+    Fed from the `events` mirror rather than from the sync code, since syncs
+    run in the worker processes while this runs in the leader only: it loads
+    starts within `horizon`, then every `poll_interval` reads the rows synced
+    since its last poll (ix_events_synced_at) and reschedules or cancels just
+    those reminders. Before firing, the event is re-read so a move or delete
+    that lands between polls never produces a stale reminder.
+    """
+
+    def __init__(
+        self,
+        sender: ReminderSender = send_reminder,
+        session_factory=SessionLocal,
+        lead: float = settings.REMINDER_LEAD,
+        horizon: float = settings.REMINDER_HORIZON,
+        poll_interval: float = settings.REMINDER_POLL_INTERVAL,
+    ):
+        self.sender = sender
+        self.session_factory = session_factory
+        self.lead = timedelta(seconds=lead)
+        self.horizon = timedelta(seconds=horizon)
+        self.poll_interval = poll_interval
+
+        self.reminders: ReminderHeap[EventKey, dict[str, Any]] = ReminderHeap()
+        # Start times already reminded of, so a later edit of the title does
+        # not remind again
+        self._fired: dict[EventKey, datetime] = {}
+        self._watermark: datetime | None = None
+        self._loaded_until: datetime | None = None
+
+        # Counters
+        self.fired = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def apply(self, row: Any, now: datetime) -> None:
+        """Schedule, move or cancel the reminder for one mirrored event."""
+        key = (row.user_id, row.calendar_id, row.event_id)
+        start_at = row.start_at
+        if (
+            row.status == "cancelled"
+            or row.all_day
+            or start_at is None
+            or start_at <= now
+            or start_at > now + self.horizon
+            or self._fired.get(key) == start_at
+        ):
+            self.reminders.cancel(key)
+            return
+        fire_at = max(start_at - self.lead, now)
+        self.reminders.schedule(
+            key, fire_at.timestamp(), {"start_at": start_at, "summary": row.summary}
+        )
+
+    def _columns(self):
+        return select(
+            CalendarEvent.user_id,
+            CalendarEvent.calendar_id,
+            CalendarEvent.event_id,
+            CalendarEvent.status,
+            CalendarEvent.summary,
+            CalendarEvent.start_at,
+            CalendarEvent.all_day,
+            CalendarEvent.synced_at,
+        )
+
+    async def _scan(self, stmt, now: datetime) -> int:
+        count = 0
+        async with self.session_factory() as session:
+            result = await session.stream(stmt.execution_options(yield_per=1000))
+            async for row in result:
+                self.apply(row, now)
+                if self._watermark is None or row.synced_at > self._watermark:
+                    self._watermark = row.synced_at
+                count += 1
+        return count
+
+    async def extend(self) -> int:
+        """Load events whose start entered the horizon since the last call."""
+        now = datetime.now(timezone.utc)
+        until = now + self.horizon
+        since = self._loaded_until or now
+        stmt = self._columns().where(
+            CalendarEvent.start_at > since,
+            CalendarEvent.start_at <= until,
+            CalendarEvent.status != "cancelled",
+        )
+        if self._watermark is None:
+            # First load: later polls only need rows synced after it started
+            self._watermark = now
+        count = await self._scan(stmt, now)
+        self._loaded_until = until
+        return count
+
+    async def poll(self) -> int:
+        """Reschedule the events synced since the last poll."""
+        now = datetime.now(timezone.utc)
+        if self._watermark is None:
+            return await self.extend()
+        stmt = self._columns().where(
+            CalendarEvent.synced_at > self._watermark - POLL_OVERLAP
+        )
+        return await self._scan(stmt, now)
+
+    async def _still_due(self, key: EventKey, start_at: datetime) -> bool:
+        """The event still exists, confirmed, at the start time we scheduled."""
+        user_id, calendar_id, event_id = key
+        stmt = select(CalendarEvent.status, CalendarEvent.start_at).where(
+            and_(
+                CalendarEvent.user_id == user_id,
+                CalendarEvent.calendar_id == calendar_id,
+                CalendarEvent.event_id == event_id,
+            )
+        )
+        async with self.session_factory() as session:
+            row = (await session.execute(stmt)).first()
+        return (
+            row is not None and row.status != "cancelled" and row.start_at == start_at
+        )
+
+    async def fire_due(self) -> int:
+        """Send every reminder that is due. Returns the number sent."""
+        now = datetime.now(timezone.utc)
+        sent = 0
+        for key, reminder in self.reminders.pop_due(now.timestamp()):
+            if not await self._still_due(key, reminder["start_at"]):
+                self.skipped += 1
+                continue
+            self._fired[key] = reminder["start_at"]
+            try:
+                await self.sender(key[0], reminder)
+                self.fired += 1
+                sent += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Failed to send reminder to {key[0]}: {e}")
+
+        # Forget fired reminders of events that have started
+        for key, start_at in list(self._fired.items()):
+            if start_at <= now:
+                del self._fired[key]
+        return sent
+
+    async def run(self) -> None:
+        """Fire reminders on time and follow the mirror until cancelled."""
+        next_poll = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                if loop.time() >= next_poll:
+                    await self.extend()
+                    await self.poll()
+                    next_poll = loop.time() + self.poll_interval
+                await self.fire_due()
+            except Exception as e:
+                logger.error(f"Reminder scheduler error: {e}")
+
+            # Sleep until the next reminder or poll, whichever comes first
+            delay = next_poll - loop.time()
+            next_at = self.reminders.next_at()
+            if next_at is not None:
+                delay = min(delay, next_at - datetime.now(timezone.utc).timestamp())
+            await asyncio.sleep(max(delay, 0.05))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "scheduled": len(self.reminders),
+            "fired": self.fired,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
+
+
+reminder_scheduler = ReminderScheduler()
+
+_reminder_gauge = registry.gauge(
+    "event_reminders", "Upcoming event reminder scheduler state", ("stat",)
+)
+
+
+@registry.collector
+def _collect_reminder_stats() -> None:
+    for stat, value in reminder_scheduler.stats().items():
+        _reminder_gauge.set(value, stat=stat)
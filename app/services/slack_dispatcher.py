@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import registry, slack_request_duration, slack_requests
+from app.core.rate_limit import TokenBucket
+from app.core.tracing import current_span
+
+if TYPE_CHECKING:
+    from slack_sdk.errors import SlackApiError
+
+logger = logging.getLogger(__name__)
+
+# Slack Web API rate tiers in requests per minute
+# (https://api.slack.com/apis/rate-limits)
+TIER_RATES_PER_MINUTE = {1: 1, 2: 20, 3: 50, 4: 100}
+
+METHOD_TIERS = {
+    "conversations.open": 3,
+    "chat.update": 3,
+    "chat.delete": 3,
+    "users.info": 4,
+}
+
+# chat.postMessage has its own "special" limit: about one message per second
+# per channel, with a workspace-wide ceiling of several hundred per minute.
+POST_MESSAGE = "chat.postMessage"
+PER_CHANNEL_METHODS = {POST_MESSAGE}
+
+
+def _method_bucket(method: str) -> TokenBucket:
+    if method == POST_MESSAGE:
+        rate = settings.SLACK_POST_MESSAGE_RATE
+        return TokenBucket(rate=rate, capacity=rate)
+    tier = METHOD_TIERS.get(method, 2)
+    rate = TIER_RATES_PER_MINUTE[tier] / 60
+    return TokenBucket(rate=rate, capacity=max(1.0, rate * 10))
+
+
+class SlackDispatcher:
+    """
+    Outbound Slack Web API dispatcher shared by every SlackService.
+
+    - Per-method token buckets sized to Slack's rate tiers, plus per-channel
+      buckets for chat.postMessage.
+    - 429 responses pause the affected bucket for `Retry-After` seconds and
+      the call is retried instead of dropped.
+    - Calls to different channels run concurrently up to a bounded limit.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.SLACK_DISPATCH_CONCURRENCY,
+        max_retries: int = settings.SLACK_MAX_RETRIES,
+    ):
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._method_buckets: dict[str, TokenBucket] = {}
+        self._channel_buckets: TTLCache[str, TokenBucket] = TTLCache(
+            maxsize=10_000, ttl=600
+        )
+
+        # Metrics
+        self.queued = 0
+        self.in_flight = 0
+        self.sent = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def _buckets(self, method: str, channel: str | None) -> list[TokenBucket]:
+        bucket = self._method_buckets.get(method)
+        if bucket is None:
+            bucket = self._method_buckets[method] = _method_bucket(method)
+        buckets = [bucket]
+
+        if channel and method in PER_CHANNEL_METHODS:
+            channel_bucket = self._channel_buckets.get(channel)
+            if channel_bucket is None:
+                rate = settings.SLACK_CHANNEL_RATE
+                channel_bucket = TokenBucket(rate=rate, capacity=rate)
+                self._channel_buckets.set(channel, channel_bucket)
+            buckets.append(channel_bucket)
+        return buckets
+
+    async def call(
+        self, method: str, func: Callable[..., Awaitable[Any]], **kwargs: Any
+    ) -> Any:
+        """
+        Call a Slack client method (e.g. `client.chat_postMessage`) under
+        rate limiting. `method` is the Web API method name used for limits.
+        """
+        from slack_sdk.errors import SlackApiError
+
+        channel = kwargs.get("channel")
+        buckets = self._buckets(method, channel)
+
+        self.queued += 1
+        try:
+            for attempt in range(self.max_retries + 1):
+                # Wait for rate-limit slots before taking a concurrency slot
+                wait = max(bucket.reserve() for bucket in buckets)
+                if wait > 0:
+                    span = current_span()
+                    if span:
+                        # Time spent waiting for Slack rate limits
+                        span.set_attribute(
+                            "rate_limit_wait_ms",
+                            span.attributes.get("rate_limit_wait_ms", 0) + wait * 1000,
+                        )
+                    await asyncio.sleep(wait)
+
+                async with self._semaphore:
+                    self.in_flight += 1
+                    start = time.perf_counter()
+                    outcome = "error"
+                    try:
+                        response = await func(**kwargs)
+                        self.sent += 1
+                        outcome = "ok"
+                        return response
+                    except SlackApiError as e:
+                        if _status(e) != 429 or attempt == self.max_retries:
+                            self.errors += 1
+                            raise
+                        retry_after = _retry_after(e)
+                        self.rate_limited += 1
+                        outcome = "rate_limited"
+                        logger.warning(
+                            f"Slack rate limited {method}, retrying in {retry_after}s"
+                        )
+                        # Slack's special limit for postMessage is per channel
+                        buckets[-1].pause(retry_after)
+                    finally:
+                        elapsed = time.perf_counter() - start
+                        self._record_latency(elapsed)
+                        slack_request_duration.observe(elapsed, method=method)
+                        slack_requests.inc(method=method, outcome=outcome)
+                        self.in_flight -= 1
+        finally:
+            self.queued -= 1
+
+    def _record_latency(self, seconds: float) -> None:
+        self.latency_total += seconds
+        self.latency_max = max(self.latency_max, seconds)
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a rate-limit or concurrency slot."""
+        return self.queued - self.in_flight
+
+    def stats(self) -> dict[str, Any]:
+        calls = self.sent + self.errors + self.rate_limited
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "latency_avg": self.latency_total / calls if calls else 0.0,
+            "latency_max": self.latency_max,
+        }
+
+
+def _status(error: "SlackApiError") -> int | None:
+    return getattr(error.response, "status_code", None)
+
+
+def _retry_after(error: "SlackApiError") -> float:
+    headers = getattr(error.response, "headers", None) or {}
+    for key, value in headers.items():
+        if key.lower() == "retry-after":
+            try:
+                return float(value[0] if isinstance(value, list) else value)
+            except (TypeError, ValueError):
+                break
+    return 1.0
+
+
+slack_dispatcher = SlackDispatcher()
+
+_dispatcher_gauge = registry.gauge(
+    "slack_dispatcher", "Slack dispatcher queue state", ("stat",)
+)
+
+
+@registry.collector
+def _collect_dispatcher_stats() -> None:
+    _dispatcher_gauge.set(slack_dispatcher.queue_depth, stat="queue_depth")
+    _dispatcher_gauge.set(slack_dispatcher.in_flight, stat="in_flight")
@@ -1,27 +1,50 @@
-from slack_bolt import App
-from slack_sdk.errors import SlackApiError
+from typing import TYPE_CHECKING
 import logging
 
+from app.core.tracing import tracer
+from app.services.slack_dispatcher import SlackDispatcher, slack_dispatcher
+
+if TYPE_CHECKING:
+    from slack_bolt.async_app import AsyncApp
+
 logger = logging.getLogger(__name__)
 
 
 class SlackService:
-    def __init__(self, app: App):
+    def __init__(self, app: "AsyncApp", dispatcher: SlackDispatcher | None = None):
         self.app = app
+        self.dispatcher = dispatcher or slack_dispatcher
 
-    async def send_message(self, channel_id: str, text: str) -> None:
+    async def send_message(
+        self, channel_id: str, text: str, blocks: list[dict] | None = None
+    ) -> None:
         """
         Send a message to a specific channel.
+        With `blocks`, `text` is the notification fallback.
+        Goes through the shared dispatcher, which applies Slack's rate limits
+        and retries 429 responses after Retry-After.
         """
+        from slack_sdk.errors import SlackApiError
+
+        extra = {"blocks": blocks} if blocks else {}
         try:
-            await self.app.client.chat_postMessage(channel=channel_id, text=text)
+            await self.dispatcher.call(
+                "chat.postMessage",
+                self.app.client.chat_postMessage,
+                channel=channel_id,
+                text=text,
+                **extra,
+            )
         except SlackApiError as e:
             logger.error(f"Error sending message: {e}")
             raise e
 
-    async def send_dm(self, user_id: str, text: str) -> None:
+    async def send_dm(
+        self, user_id: str, text: str, blocks: list[dict] | None = None
+    ) -> None:
         """
         Send a Direct Message to a user.
         In Slack API, passing the user_id as channel sends a DM.
         """
-        await self.send_message(channel_id=user_id, text=text)
+        with tracer.span("slack.send_dm", user_id=user_id):
+            await self.send_message(channel_id=user_id, text=text, blocks=blocks)
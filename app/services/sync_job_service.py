@@ -0,0 +1,201 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.db.models import SyncJob
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+FAILED = "failed"
+
+
+class SyncJobService:
+    """
+    Postgres-backed queue of sync jobs.
+    Producers call `enqueue`; workers `claim` with FOR UPDATE SKIP LOCKED so
+    any number of worker processes can consume the table concurrently.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(self, user_id: str, traceparent: str | None = None) -> bool:
+        """
+        Add a pending sync job for the user.
+        Returns False if one is already pending (it will cover this change too).
+        `traceparent` links the job's spans to the request that queued it.
+        """
+        stmt = (
+            insert(SyncJob)
+            .values(user_id=user_id, status=PENDING, traceparent=traceparent)
+            .on_conflict_do_nothing(
+                index_elements=["user_id"], index_where=SyncJob.status == PENDING
+            )
+            .returning(SyncJob.id)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.scalar_one_or_none() is not None
+
+    async def claim(self) -> SyncJob | None:
+        """
+        Lock and mark the next runnable job as running.
+        Users with a job already running are skipped so one user's
+        calendar is never synced by two workers at once.
+        """
+        now = datetime.now(timezone.utc)
+        running = aliased(SyncJob)
+        stmt = (
+            select(SyncJob)
+            .where(
+                SyncJob.status == PENDING,
+                SyncJob.run_after <= now,
+                ~exists().where(
+                    running.user_id == SyncJob.user_id, running.status == RUNNING
+                ),
+            )
+            .order_by(SyncJob.run_after, SyncJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True, of=SyncJob)
+        )
+        result = await self.session.execute(stmt)
+        job = result.scalar_one_or_none()
+
+        if not job:
+            await self.session.rollback()
+            return None
+
+        job.status = RUNNING
+        job.locked_at = now
+        job.attempts += 1
+        await self.session.commit()
+        return job
+
+    def _leased(self, job: SyncJob):
+        """WHERE clause matching the job only while this worker holds it."""
+        return (
+            SyncJob.id == job.id,
+            SyncJob.status == RUNNING,
+            SyncJob.locked_at == job.locked_at,
+        )
+
+    def _lost_lease(self, job: SyncJob, rowcount: int) -> bool:
+        if rowcount:
+            return False
+        # Requeued as stale (and possibly claimed again) while this worker ran
+        logger.warning(f"Lost the lease on sync job {job.id}")
+        return True
+
+    async def heartbeat(self, job: SyncJob) -> bool:
+        """
+        Extend the lease on a running job, so `requeue_stale` leaves it alone.
+        Returns False if the lease was lost.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = (
+            update(SyncJob)
+            .where(*self._leased(job))
+            .values(locked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        if self._lost_lease(job, result.rowcount):
+            return False
+        job.locked_at = now
+        return True
+
+    async def complete(self, job: SyncJob) -> bool:
+        """
+        Finished jobs are deleted to keep the table small.
+        Returns False if the lease was lost.
+        """
+        stmt = (
+            delete(SyncJob)
+            .where(*self._leased(job))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return not self._lost_lease(job, result.rowcount)
+
+    async def fail(self, job: SyncJob, error: str) -> bool:
+        """
+        Retry with exponential backoff, or give up after SYNC_JOB_MAX_ATTEMPTS.
+        Returns False if the lease was lost.
+        """
+        if job.attempts >= settings.SYNC_JOB_MAX_ATTEMPTS:
+            return await self._mark_failed(job, error)
+
+        delay = settings.SYNC_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        stmt = (
+            update(SyncJob)
+            .where(*self._leased(job))
+            .values(
+                status=PENDING,
+                locked_at=None,
+                last_error=error,
+                run_after=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = await self.session.execute(stmt)
+            await self.session.commit()
+        except IntegrityError:
+            # A newer pending job for this user exists and will sync anyway
+            await self.session.rollback()
+            return await self._mark_failed(job, error)
+        return not self._lost_lease(job, result.rowcount)
+
+    async def _mark_failed(self, job: SyncJob, error: str) -> bool:
+        stmt = (
+            update(SyncJob)
+            .where(*self._leased(job))
+            .values(status=FAILED, locked_at=None, last_error=error)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return not self._lost_lease(job, result.rowcount)
+
+    async def requeue_stale(self) -> int:
+        """
+        Return jobs left running by a crashed worker to the queue: running
+        jobs whose lease was not extended for SYNC_JOB_STALE_AFTER.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.SYNC_JOB_STALE_AFTER
+        )
+        pending = aliased(SyncJob)
+        stmt = (
+            update(SyncJob)
+            .where(
+                SyncJob.status == RUNNING,
+                SyncJob.locked_at < cutoff,
+                ~exists().where(
+                    pending.user_id == SyncJob.user_id, pending.status == PENDING
+                ),
+            )
+            .values(status=PENDING, locked_at=None, last_error="worker timed out")
+        )
+        result = await self.session.execute(stmt)
+
+        # The rest already have a pending job for the same user
+        await self.session.execute(
+            update(SyncJob)
+            .where(SyncJob.status == RUNNING, SyncJob.locked_at < cutoff)
+            .values(status=FAILED, locked_at=None, last_error="worker timed out")
+        )
+        await self.session.commit()
+        if result.rowcount:
+            logger.warning(f"Requeued {result.rowcount} stale sync jobs")
+        return result.rowcount
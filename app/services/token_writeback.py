@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, bindparam, update
+
+from app.core.config import settings
+from app.db.models import GoogleCredentials
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_credentials = GoogleCredentials.__table__
+
+
+class TokenWriteBack:
+    """
+    Buffers access tokens refreshed by GoogleCalendarClient and persists them
+    to google_credentials in one batched UPDATE, so the next process (or a
+    rebuilt client) starts from a valid token instead of refreshing again.
+    Each UPDATE is guarded by the refresh token ciphertext the access token
+    was minted from, so a late write-back never overwrites the tokens of a
+    newer authorization.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._pending: dict[str, tuple[str, datetime | None, str]] = {}
+
+    def record(
+        self,
+        user_id: str,
+        access_token: str,
+        expires_at: datetime | None,
+        *,
+        refresh_token: str,
+    ):
+        """
+        Queue a refreshed token; only the latest one per user is kept.
+        `refresh_token` is the stored (encrypted) refresh token it came from.
+        """
+        self._pending[user_id] = (access_token, expires_at, refresh_token)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """Write all queued tokens. Returns the number of users updated."""
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        now = datetime.now(timezone.utc)
+        stmt = (
+            update(_credentials)
+            .where(
+                and_(
+                    _credentials.c.user_id == bindparam("b_user_id"),
+                    _credentials.c.refresh_token == bindparam("b_refresh_token"),
+                )
+            )
+            .values(
+                access_token=bindparam("b_access_token"),
+                expires_at=bindparam("b_expires_at"),
+                updated_at=now,
+            )
+        )
+        params = [
+            {
+                "b_user_id": user_id,
+                "b_access_token": token,
+                "b_expires_at": expires,
+                "b_refresh_token": refresh_token,
+            }
+            for user_id, (token, expires, refresh_token) in batch.items()
+        ]
+        try:
+            async with self.session_factory() as session:
+                await session.execute(stmt, params)
+                await session.commit()
+        except Exception:
+            # Put the batch back without overwriting newer refreshes
+            self._pending = {**batch, **self._pending}
+            raise
+
+        logger.debug(f"Persisted {len(batch)} refreshed access tokens")
+        return len(batch)
+
+    async def run(
+        self, interval: float = settings.GOOGLE_TOKEN_WRITEBACK_INTERVAL
+    ) -> None:
+        """Flush periodically until cancelled, then flush once more."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"Token write-back failed: {e}")
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
+
+
+token_writeback = TokenWriteBack()
@@ -1,12 +1,22 @@
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any
+import aiohttp
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from google_auth_oauthlib.flow import Flow
 
 from app.core.config import settings
+from app.core.exceptions import AuthError
 from app.db.models import User, GoogleCredentials
+from app.core.google_calendar import (
+    GOOGLE_TOKEN_URI,
+    get_http_session,
+    invalidate_client,
+)
 from app.core.security import encrypt_token
 
+if TYPE_CHECKING:
+    from google_auth_oauthlib.flow import Flow
+
 
 class AuthService:
     SCOPES = [
@@ -14,10 +24,13 @@ class AuthService:
         "https://www.googleapis.com/auth/calendar.events",
     ]
 
-    def _get_flow(self, state: str = None) -> Flow:
+    def _get_flow(self, state: str = None) -> "Flow":
         """
         Create a Google OAuth Flow instance from client config.
+        google_auth_oauthlib is imported here, on the login path only.
         """
+        from google_auth_oauthlib.flow import Flow
+
         client_config = {
             "web": {
                 "client_id": settings.GOOGLE_CLIENT_ID,
@@ -44,23 +57,44 @@ class AuthService:
         )
         return authorization_url, state
 
-    def exchange_code(self, code: str) -> dict[str, Any]:
+    async def exchange_code(
+        self,
+        code: str,
+        session: aiohttp.ClientSession | None = None,
+        token_uri: str = GOOGLE_TOKEN_URI,
+    ) -> dict[str, Any]:
         """
         Exchange the auth code for credentials (tokens).
+        Posts to Google's token endpoint on the shared aiohttp session instead
+        of the blocking `Flow.fetch_token`.
         """
-        flow = self._get_flow()
-        flow.fetch_token(code=code)
-
-        credentials = flow.credentials
+        data = {
+            "grant_type": "authorization_code",
+            "code": code,
+            "client_id": settings.GOOGLE_CLIENT_ID,
+            "client_secret": settings.GOOGLE_CLIENT_SECRET,
+            "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+        }
+        http = session or get_http_session()
+        async with http.post(token_uri, data=data) as response:
+            payload = await response.json(content_type=None)
+            if response.status != 200:
+                raise AuthError(f"Code exchange failed ({response.status}): {payload}")
+
+        expiry = None
+        if payload.get("expires_in"):
+            expiry = datetime.now(timezone.utc) + timedelta(
+                seconds=int(payload["expires_in"])
+            )
 
         return {
-            "access_token": credentials.token,
-            "refresh_token": credentials.refresh_token,
-            "token_uri": credentials.token_uri,
-            "client_id": credentials.client_id,
-            "client_secret": credentials.client_secret,
-            "scopes": credentials.scopes,
-            "expiry": credentials.expiry,
+            "access_token": payload["access_token"],
+            "refresh_token": payload.get("refresh_token"),
+            "token_uri": token_uri,
+            "client_id": settings.GOOGLE_CLIENT_ID,
+            "client_secret": settings.GOOGLE_CLIENT_SECRET,
+            "scopes": payload.get("scope", "").split() or self.SCOPES,
+            "expiry": expiry,
         }
 
 
@@ -117,4 +151,7 @@ class UserService:
         if token_data.get("expiry"):
             creds.expires_at = token_data["expiry"]
 
+        # Tokens changed: the cached Calendar client holds the old ones
+        invalidate_client(slack_id)
+
         return creds
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.tracing import current_traceparent, tracer
+from app.db.session import SessionLocal
+from app.services.sync_job_service import SyncJobService
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_sync(user_id: str) -> None:
+    """
+    Default queue runner: hand the sync to the durable job queue consumed by
+    `python -m app.worker`. Uses its own DB session, since the webhook
+    request's session is closed by the time this runs.
+    """
+    async with SessionLocal() as session:
+        await SyncJobService(session).enqueue(
+            user_id, traceparent=current_traceparent()
+        )
+
+
+class WebhookQueue:
+    """
+    In-process ingestion queue for Google Calendar webhooks, keyed by channel.
+
+    Google often sends several `exists` notifications for one edit. The first
+    notification for a channel schedules a sync after a short window; the ones
+    arriving before it starts are folded into it. A notification arriving while
+    the runner is in progress schedules exactly one follow-up pass.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[str], Awaitable[None]] = enqueue_sync,
+        window: float = settings.WEBHOOK_COALESCE_WINDOW,
+    ):
+        self.runner = runner
+        self.window = window
+        self._pending: dict[str, asyncio.Task] = {}
+        self._running: set[str] = set()
+        self._dirty: set[str] = set()
+
+        # Counters
+        self.received = 0
+        self.scheduled = 0
+        self.coalesced = 0
+        self.processed = 0
+        self.failed = 0
+
+    def submit(self, channel_id: str, user_id: str) -> bool:
+        """
+        Record a notification. Returns True if it scheduled a new sync pass,
+        False if it was coalesced into one already pending.
+        """
+        self.received += 1
+
+        if channel_id not in self._pending:
+            self._pending[channel_id] = asyncio.create_task(
+                self._process(channel_id, user_id)
+            )
+            self.scheduled += 1
+            return True
+
+        if channel_id in self._running and channel_id not in self._dirty:
+            # Changes may have landed after the running sync fetched its page
+            self._dirty.add(channel_id)
+            self.scheduled += 1
+            return True
+
+        self.coalesced += 1
+        return False
+
+    async def _process(self, channel_id: str, user_id: str) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.window)
+                self._dirty.discard(channel_id)
+                self._running.add(channel_id)
+                try:
+                    with tracer.span(
+                        "webhook_queue.run", channel_id=channel_id, user_id=user_id
+                    ):
+                        await self.runner(user_id)
+                except Exception as e:
+                    self.failed += 1
+                    logger.error(f"Webhook sync failed for channel {channel_id}: {e}")
+                finally:
+                    self._running.discard(channel_id)
+                    self.processed += 1
+
+                if channel_id not in self._dirty:
+                    break
+        finally:
+            self._pending.pop(channel_id, None)
+            self._dirty.discard(channel_id)
+
+    @property
+    def depth(self) -> int:
+        """Number of channels with a pending or running sync."""
+        return len(self._pending)
+
+    @property
+    def coalescing_ratio(self) -> float:
+        """Share of received notifications that did not cause their own sync."""
+        return self.coalesced / self.received if self.received else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "received": self.received,
+            "scheduled": self.scheduled,
+            "coalesced": self.coalesced,
+            "processed": self.processed,
+            "failed": self.failed,
+            "coalescing_ratio": self.coalescing_ratio,
+        }
+
+    async def drain(self) -> None:
+        """Wait for every pending sync to finish (used on shutdown)."""
+        while self._pending:
+            await asyncio.gather(*self._pending.values(), return_exceptions=True)
+
+
+webhook_queue = WebhookQueue()
+
+_queue_gauge = registry.gauge(
+    "webhook_queue", "Webhook coalescing queue state and totals", ("stat",)
+)
+
+
+@registry.collector
+def _collect_queue_stats() -> None:
+    for stat, value in webhook_queue.stats().items():
+        _queue_gauge.set(value, stat=stat)
@@ -0,0 +1,45 @@
+"""
+Slack worker: owns the Socket Mode connection.
+
+    python -m app.slack_worker
+
+Run exactly one of these next to the API. The API process then runs with
+SLACK_SOCKET_MODE_IN_API=false, so scaling uvicorn workers never opens
+extra socket connections and Slack events do not compete with webhook
+traffic. Closes the connection cleanly on SIGTERM/SIGINT.
+"""
+
+import asyncio
+import logging
+import signal
+import sys
+
+from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+
+from app.core.config import settings
+from app.core.slack import get_slack_app
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    handler = AsyncSocketModeHandler(get_slack_app(), settings.SLACK_APP_TOKEN)
+    try:
+        await handler.connect_async()
+        logger.info("Slack Socket Mode connected")
+        await stop.wait()
+    finally:
+        await handler.close_async()
+        logger.info("Slack Socket Mode closed")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if not settings.SLACK_APP_TOKEN.startswith("xapp"):
+        sys.exit("SLACK_APP_TOKEN must be an app-level token (xapp-...)")
+    asyncio.run(main())
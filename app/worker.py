@@ -0,0 +1,176 @@
+"""
+Sync worker: consumes the `sync_jobs` table and runs calendar syncs.
+
+    python -m app.worker [--concurrency N]
+
+Runs independently of the API process, so API pods and sync workers can be
+scaled separately. Stops taking new jobs on SIGTERM/SIGINT and lets the
+in-flight ones finish.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.core.google_calendar import close_http_session
+from app.core.tracing import tracer
+from app.db.models import SyncJob
+from app.db.session import SessionLocal
+from app.services.calendar_service import CalendarService
+from app.services.digest import digest_buffer
+from app.services.sync_job_service import SyncJobService
+from app.services.token_writeback import token_writeback
+
+logger = logging.getLogger(__name__)
+
+
+async def _heartbeat(job: SyncJob, done: asyncio.Event, sync: asyncio.Task) -> bool:
+    """
+    Extend the job's lease until `done`. If the lease is lost, cancel the
+    sync and return True.
+    """
+    while True:
+        await _wait(done, settings.SYNC_JOB_HEARTBEAT_INTERVAL)
+        if done.is_set():
+            return False
+        try:
+            async with SessionLocal() as session:
+                leased = await SyncJobService(session).heartbeat(job)
+        except Exception as e:
+            logger.error(f"Heartbeat of sync job {job.id} failed: {e}")
+            continue
+        if not leased:
+            # Another worker may be syncing this user by now
+            sync.cancel()
+            return True
+
+
+async def _run_sync(user_id: str) -> None:
+    async with SessionLocal() as session:
+        await CalendarService(session).sync_events(user_id)
+
+
+async def process_next_job() -> bool:
+    """
+    Claim one job and run its sync. Returns False if the queue was empty.
+    """
+    async with SessionLocal() as session:
+        job = await SyncJobService(session).claim()
+    if not job:
+        return False
+
+    logger.info(f"Running sync job {job.id} for user {job.user_id}")
+    with tracer.span(
+        "sync_job.run",
+        traceparent=job.traceparent,
+        job_id=job.id,
+        user_id=job.user_id,
+        attempt=job.attempts,
+    ):
+        sync = asyncio.create_task(_run_sync(job.user_id))
+        done = asyncio.Event()
+        heartbeat = asyncio.create_task(_heartbeat(job, done, sync))
+        try:
+            await sync
+        except Exception as e:
+            logger.error(f"Sync job {job.id} failed: {e}")
+            await _finish(heartbeat, done)
+            async with SessionLocal() as session:
+                await SyncJobService(session).fail(job, str(e))
+        except asyncio.CancelledError:
+            await _finish(heartbeat, done)
+            if heartbeat.cancelled() or not heartbeat.result():
+                raise
+            # Cancelled by the heartbeat: the lease is gone, leave the row alone
+            logger.warning(f"Sync job {job.id} abandoned after losing its lease")
+        else:
+            await _finish(heartbeat, done)
+            async with SessionLocal() as session:
+                await SyncJobService(session).complete(job)
+    return True
+
+
+async def _finish(heartbeat: asyncio.Task, done: asyncio.Event) -> None:
+    """Stop the heartbeat without interrupting a lease update in flight."""
+    done.set()
+    await asyncio.gather(heartbeat, return_exceptions=True)
+
+
+async def _wait(stop: asyncio.Event, timeout: float) -> None:
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def worker_loop(worker_id: int, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            has_job = await process_next_job()
+        except Exception as e:
+            logger.error(f"Worker {worker_id} error: {e}")
+            has_job = False
+
+        if not has_job:
+            await _wait(stop, settings.SYNC_WORKER_POLL_INTERVAL)
+
+
+async def reaper_loop(stop: asyncio.Event) -> None:
+    """Periodically requeue jobs whose worker died mid-sync."""
+    while not stop.is_set():
+        try:
+            async with SessionLocal() as session:
+                await SyncJobService(session).requeue_stale()
+        except Exception as e:
+            logger.error(f"Stale job reaper error: {e}")
+        await _wait(stop, settings.SYNC_JOB_STALE_AFTER / 2)
+
+
+async def digest_retry_loop(stop: asyncio.Event) -> None:
+    """Periodically resend digests that failed or were left by a crashed worker."""
+    while not stop.is_set():
+        try:
+            await digest_buffer.retry_unsent()
+        except Exception as e:
+            logger.error(f"Digest retry error: {e}")
+        await _wait(stop, settings.NOTIFY_DIGEST_RETRY_INTERVAL)
+
+
+async def main(concurrency: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info(f"Sync worker started with {concurrency} concurrent workers")
+    writeback_task = asyncio.create_task(token_writeback.run())
+    try:
+        await asyncio.gather(
+            reaper_loop(stop),
+            digest_retry_loop(stop),
+            *(worker_loop(i, stop) for i in range(concurrency)),
+        )
+    finally:
+        # Send notifications still inside their debounce window
+        await digest_buffer.drain()
+        writeback_task.cancel()
+        await asyncio.gather(writeback_task, return_exceptions=True)
+        await close_http_session()
+        tracer.exporter.close()
+        logger.info("Sync worker stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Panager calendar sync worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.SYNC_WORKER_CONCURRENCY,
+        help="number of jobs processed concurrently",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,170 @@
+"""
+Webhook / sync lookup latency benchmark.
+
+Seeds users, credentials and sync states into a scratch schema and measures
+the lookups done on every webhook and sync, first without and then with the
+indexes added in migration 19d248334afb (sync_states unique per calendar since
+83df8794532a):
+
+    python -m benchmarks.webhook_lookup [--users 100000] [--queries 2000]
+
+Uses the database from Settings (POSTGRES_*). Everything is created in the
+`bench_webhook_lookup` schema, which is dropped afterwards unless --keep.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+import asyncpg
+
+from app.core.config import settings
+
+SCHEMA = "bench_webhook_lookup"
+
+TABLES = """
+CREATE TABLE users (
+    slack_id varchar PRIMARY KEY,
+    email varchar,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+CREATE TABLE google_credentials (
+    id serial PRIMARY KEY,
+    user_id varchar NOT NULL REFERENCES users (slack_id),
+    access_token varchar NOT NULL,
+    refresh_token varchar NOT NULL,
+    expires_at timestamptz,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+CREATE TABLE sync_states (
+    id serial PRIMARY KEY,
+    user_id varchar NOT NULL REFERENCES users (slack_id),
+    calendar_id varchar NOT NULL DEFAULT 'primary',
+    resource_id varchar NOT NULL,
+    sync_token varchar,
+    page_token varchar,
+    expiration timestamptz
+);
+"""
+
+# Same DDL as migrations 19d248334afb and 83df8794532a
+INDEXES = """
+CREATE UNIQUE INDEX ix_sync_states_resource_id ON sync_states (resource_id);
+ALTER TABLE sync_states
+    ADD CONSTRAINT uq_sync_states_user_calendar UNIQUE (user_id, calendar_id);
+ALTER TABLE google_credentials
+    ADD CONSTRAINT uq_google_credentials_user_id UNIQUE (user_id);
+ANALYZE;
+"""
+
+LOOKUPS = {
+    "webhook: sync_states by resource_id": (
+        "SELECT * FROM sync_states WHERE resource_id = $1",
+        "channel",
+    ),
+    "sync: google_credentials by user_id": (
+        "SELECT * FROM google_credentials WHERE user_id = $1",
+        "user",
+    ),
+    "sync: sync_states by user_id": (
+        "SELECT * FROM sync_states WHERE user_id = $1",
+        "user",
+    ),
+    "renew: sync_states by user, calendar": (
+        "SELECT * FROM sync_states WHERE user_id = $1 AND calendar_id = 'primary'",
+        "user",
+    ),
+}
+
+
+async def seed(conn: asyncpg.Connection, users: int) -> list[tuple[str, str]]:
+    ids = [(f"U{i:09d}", str(uuid.uuid4())) for i in range(users)]
+    await conn.copy_records_to_table(
+        "users", records=[(slack_id,) for slack_id, _ in ids], columns=["slack_id"]
+    )
+    await conn.copy_records_to_table(
+        "google_credentials",
+        records=[(slack_id, "access", "refresh") for slack_id, _ in ids],
+        columns=["user_id", "access_token", "refresh_token"],
+    )
+    await conn.copy_records_to_table(
+        "sync_states",
+        records=[(slack_id, "primary", channel, "token") for slack_id, channel in ids],
+        columns=["user_id", "calendar_id", "resource_id", "sync_token"],
+    )
+    await conn.execute("ANALYZE")
+    return ids
+
+
+async def measure(
+    conn: asyncpg.Connection, ids: list[tuple[str, str]], queries: int
+) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, (sql, key) in LOOKUPS.items():
+        stmt = await conn.prepare(sql)
+        samples = []
+        for slack_id, channel in random.choices(ids, k=queries):
+            start = time.perf_counter()
+            await stmt.fetchrow(channel if key == "channel" else slack_id)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        plan = await conn.fetchval(f"EXPLAIN (FORMAT TEXT) {sql}", ids[0][1])
+        results[name] = {
+            "p50": statistics.median(samples),
+            "p95": samples[int(len(samples) * 0.95) - 1],
+            "p99": samples[int(len(samples) * 0.99) - 1],
+            "plan": plan.split("  (")[0],
+        }
+    return results
+
+
+def report(label: str, results: dict[str, dict[str, float]]) -> None:
+    print(f"\n{label}")
+    print(f"{'lookup':40} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  plan")
+    for name, r in results.items():
+        print(f"{name:40} {r['p50']:8.3f} {r['p95']:8.3f} {r['p99']:8.3f}  {r['plan']}")
+
+
+async def main(users: int, queries: int, keep: bool) -> None:
+    conn = await asyncpg.connect(
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.POSTGRES_SERVER,
+        port=settings.POSTGRES_PORT,
+        database=settings.POSTGRES_DB,
+    )
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        await conn.execute(f"SET search_path TO {SCHEMA}")
+        await conn.execute(TABLES)
+
+        start = time.perf_counter()
+        ids = await seed(conn, users)
+        print(f"Seeded {users} users in {time.perf_counter() - start:.1f}s")
+
+        report("Before (no indexes)", await measure(conn, ids, queries))
+        await conn.execute(INDEXES)
+        report(
+            "After (migrations 19d248334afb, 83df8794532a)",
+            await measure(conn, ids, queries),
+        )
+    finally:
+        if not keep:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--keep", action="store_true", help="keep the schema")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(main(args.users, args.queries, args.keep))
@@ -38,3 +38,42 @@ async def test_auth_callback(client: AsyncClient):
         "/api/v1/auth/google/callback", params={"code": "fake_code", "state": "U12345"}
     )
     assert response.status_code != 404
+
+
+@pytest.mark.asyncio
+async def test_auth_callback_defers_follow_ups(client: AsyncClient, session):
+    """
+    The page comes back right after the code exchange; the Slack DM and the
+    watch registration run as tracked background work.
+    """
+    from datetime import datetime, timedelta, timezone
+    from unittest.mock import AsyncMock, patch
+
+    from app.api.routes import auth
+    from app.core.tasks import TaskTracker
+    from app.db.models import GoogleCredentials
+
+    tracker = TaskTracker()
+    token_data = {
+        "access_token": "access",
+        "refresh_token": "refresh",
+        "expiry": datetime.now(timezone.utc) + timedelta(hours=1),
+    }
+    with (
+        patch.object(
+            auth.AuthService, "exchange_code", AsyncMock(return_value=token_data)
+        ),
+        patch.object(auth, "_after_login", AsyncMock()) as after_login,
+        patch.object(auth, "background_tasks", tracker),
+    ):
+        response = await client.get(
+            "/api/v1/auth/google/callback",
+            params={"code": "code", "state": "U12345"},
+        )
+        await tracker.drain()
+
+    assert response.status_code == 200
+    assert response.text == auth._success_page()
+    after_login.assert_awaited_once_with("U12345")
+    assert tracker.started == 1
+    assert await session.get(GoogleCredentials, 1) is not None
@@ -25,3 +25,41 @@ def test_health_check():
         "status": "ok",
         "message": "Proactive Manager API is running",
     }
+
+
+def _run_lifespan(socket_mode_in_api: bool):
+    from functools import partial
+    from unittest.mock import AsyncMock, patch
+
+    from app import main
+    from app.core.leader import LeaderElector
+    from app.core.config import settings
+
+    with (
+        patch.object(settings, "SLACK_SOCKET_MODE_IN_API", socket_mode_in_api),
+        # Imported inside run_socket_mode, so patch it where it is defined
+        patch(
+            "slack_bolt.adapter.socket_mode.async_handler.AsyncSocketModeHandler"
+        ) as MockHandler,
+        # Lead without the DB lock so the tasks start right away
+        patch.object(main, "LeaderElector", partial(LeaderElector, enabled=False)),
+        patch.object(main.channel_renewal, "run", AsyncMock()),
+        patch.object(main.reminder_scheduler, "run", AsyncMock()),
+        patch.object(main.token_writeback, "run", AsyncMock()),
+    ):
+        MockHandler.return_value.connect_async = AsyncMock()
+        MockHandler.return_value.close_async = AsyncMock()
+        with TestClient(main.app) as client:
+            client.get("/health")
+    return MockHandler
+
+
+def test_lifespan_closes_socket_mode_handler():
+    MockHandler = _run_lifespan(socket_mode_in_api=True)
+    MockHandler.return_value.connect_async.assert_awaited_once()
+    MockHandler.return_value.close_async.assert_awaited_once()
+
+
+def test_lifespan_without_socket_mode():
+    MockHandler = _run_lifespan(socket_mode_in_api=False)
+    MockHandler.assert_not_called()
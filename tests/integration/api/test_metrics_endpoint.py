@@ -0,0 +1,24 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.metrics import http_request_duration
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_route_latency_and_pool(client: AsyncClient):
+    before = http_request_duration.count(method="GET", route="/health", status="200")
+    await client.get("/health")
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert http_request_duration.count(method="GET", route="/health", status="200") == (
+        before + 1
+    )
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'route="/health"' in body
+    assert 'db_pool{stat="checked_out"}' in body
+    assert 'webhook_queue{stat="depth"}' in body
+    assert 'slack_dispatcher{stat="queue_depth"}' in body
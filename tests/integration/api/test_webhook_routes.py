@@ -1,5 +1,9 @@
 import pytest
+from unittest.mock import patch
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import SyncState, User
 
 
 @pytest.mark.asyncio
@@ -35,3 +39,84 @@ async def test_calendar_webhook_missing_headers(client: AsyncClient):
     response = await client.post("/api/v1/webhook/google/calendar", headers={})
     # Should probably be 400 Bad Request
     assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_calendar_webhook_known_channel_is_queued(
+    client: AsyncClient, session: AsyncSession
+):
+    """
+    A notification for a known channel is accepted with 202 and handed to the
+    ingestion queue instead of being synced inline.
+    """
+    session.add(User(slack_id="U12345"))
+    session.add(SyncState(user_id="U12345", resource_id="known-channel-id"))
+    await session.commit()
+
+    headers = {
+        "X-Goog-Channel-ID": "known-channel-id",
+        "X-Goog-Resource-State": "exists",
+    }
+    with patch("app.services.calendar_service.webhook_queue") as mock_queue:
+        response = await client.post("/api/v1/webhook/google/calendar", headers=headers)
+
+    assert response.status_code == 202
+    mock_queue.submit.assert_called_once_with("known-channel-id", "U12345")
+
+
+@pytest.mark.asyncio
+async def test_calendar_webhook_trace_reaches_sync_job(
+    client: AsyncClient, session: AsyncSession, db_engine
+):
+    """
+    The webhook span carries the channel id and message number, and its
+    trace context is stored on the queued sync job for the worker.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.core import tracing
+    from app.services.sync_job_service import SyncJobService
+    from app.services.webhook_queue import WebhookQueue
+
+    session.add(User(slack_id="U12345"))
+    session.add(SyncState(user_id="U12345", resource_id="known-channel-id"))
+    await session.commit()
+
+    exporter = tracing.InMemoryExporter()
+    factory = async_sessionmaker(bind=db_engine, expire_on_commit=False)
+
+    async def enqueue(user_id: str) -> None:
+        async with factory() as job_session:
+            await SyncJobService(job_session).enqueue(
+                user_id, traceparent=tracing.current_traceparent()
+            )
+
+    queue = WebhookQueue(runner=enqueue, window=0)
+    headers = {
+        "X-Goog-Channel-ID": "known-channel-id",
+        "X-Goog-Resource-State": "exists",
+        "X-Goog-Message-Number": "42",
+    }
+    with (
+        patch.object(tracing.tracer, "exporter", exporter),
+        patch("app.services.calendar_service.webhook_queue", queue),
+    ):
+        response = await client.post("/api/v1/webhook/google/calendar", headers=headers)
+        await queue.drain()
+
+        async with factory() as job_session:
+            job = await SyncJobService(job_session).claim()
+        with tracing.tracer.span("sync_job.run", traceparent=job.traceparent):
+            pass
+
+    assert response.status_code == 202
+    spans = {span.name: span for span in exporter.spans}
+    webhook = spans["webhook.google_calendar"]
+    assert webhook.attributes["channel_id"] == "known-channel-id"
+    assert webhook.attributes["message_number"] == "42"
+    assert spans["calendar.process_webhook"].parent_id == webhook.span_id
+    assert spans["calendar.process_webhook"].attributes["user_id"] == "U12345"
+    queued = spans["webhook_queue.run"]
+    assert queued.parent_id == spans["calendar.process_webhook"].span_id
+    assert spans["sync_job.run"].trace_id == webhook.trace_id
+    assert spans["sync_job.run"].parent_id == queued.span_id
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.commands.backfill import backfill
+from app.db.models import GoogleCredentials, User
+
+
+async def _seed(session: AsyncSession, count: int) -> None:
+    for i in range(count):
+        session.add(User(slack_id=f"U{i:02d}"))
+        session.add(
+            GoogleCredentials(user_id=f"U{i:02d}", access_token="a", refresh_token="r")
+        )
+    # No credentials: skipped
+    session.add(User(slack_id="U99"))
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_backfill_runs_every_user_with_bounded_concurrency(
+    db_engine: AsyncEngine, session: AsyncSession, tmp_path
+):
+    await _seed(session, 7)
+    seen = []
+    running = 0
+    peak = 0
+
+    async def handler(user_id: str) -> bool:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        seen.append(user_id)
+        if user_id == "U03":
+            raise RuntimeError("Google said no")
+        return user_id != "U05"
+
+    checkpoint = tmp_path / "checkpoint"
+    progress = await backfill(
+        concurrency=2,
+        chunk_size=3,
+        checkpoint=str(checkpoint),
+        handler=handler,
+        session_factory=async_sessionmaker(bind=db_engine, expire_on_commit=False),
+    )
+
+    assert sorted(seen) == [f"U{i:02d}" for i in range(7)]
+    assert peak == 2
+    assert (progress.total, progress.done) == (7, 7)
+    assert progress.failed == ["U03", "U05"]
+    # Failures are kept on record in the checkpoint
+    assert json.loads(checkpoint.read_text()) == {
+        "last_user_id": "U06",
+        "failed": ["U03", "U05"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_after_checkpoint(
+    db_engine: AsyncEngine, session: AsyncSession, tmp_path
+):
+    await _seed(session, 5)
+    checkpoint = tmp_path / "checkpoint"
+    checkpoint.write_text(json.dumps({"last_user_id": "U02", "failed": []}))
+    seen = []
+
+    async def handler(user_id: str) -> bool:
+        seen.append(user_id)
+        return True
+
+    progress = await backfill(
+        checkpoint=str(checkpoint),
+        handler=handler,
+        session_factory=async_sessionmaker(bind=db_engine, expire_on_commit=False),
+    )
+
+    assert sorted(seen) == ["U03", "U04"]
+    assert progress.total == 2
+    assert not checkpoint.exists()
@@ -0,0 +1,118 @@
+import json
+import logging
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.commands.reencrypt_tokens import reencrypt_batch, reencrypt_tokens
+from app.core import security
+from app.core.config import settings
+from app.db.models import GoogleCredentials, User
+
+
+@pytest.fixture
+def rotate_secret_key(monkeypatch):
+    """Returns a function that moves SECRET_KEY to PREVIOUS_SECRET_KEYS."""
+
+    def rotate():
+        monkeypatch.setattr(settings, "PREVIOUS_SECRET_KEYS", settings.SECRET_KEY)
+        monkeypatch.setattr(settings, "SECRET_KEY", Fernet.generate_key().decode())
+        security._get_fernet.cache_clear()
+        security._get_primary_fernet.cache_clear()
+
+    yield rotate
+    monkeypatch.undo()
+    security._get_fernet.cache_clear()
+    security._get_primary_fernet.cache_clear()
+
+
+async def _seed(session: AsyncSession, count: int) -> dict[str, str]:
+    tokens = {}
+    for i in range(count):
+        slack_id = f"U{i}"
+        tokens[slack_id] = security.encrypt_token(f"refresh-{i}")
+        session.add(User(slack_id=slack_id))
+        session.add(
+            GoogleCredentials(
+                user_id=slack_id, access_token="a", refresh_token=tokens[slack_id]
+            )
+        )
+    await session.commit()
+    return tokens
+
+
+@pytest.mark.asyncio
+async def test_reencrypt_rewrites_all_rows_in_batches(
+    db_engine: AsyncEngine, session: AsyncSession, tmp_path, rotate_secret_key
+):
+    old_tokens = await _seed(session, 5)
+    rotate_secret_key()
+    checkpoint = tmp_path / "checkpoint"
+
+    total = await reencrypt_tokens(
+        batch_size=2,
+        pause=0,
+        checkpoint=str(checkpoint),
+        session_factory=async_sessionmaker(bind=db_engine, expire_on_commit=False),
+    )
+
+    assert total == 5
+    assert not checkpoint.exists()
+    session.expire_all()
+    rows = (await session.execute(select(GoogleCredentials))).scalars().all()
+    for row in rows:
+        assert row.refresh_token != old_tokens[row.user_id]
+        assert security.is_current_key(row.refresh_token)
+        assert security.decrypt_token(row.refresh_token) == f"refresh-{row.user_id[1:]}"
+
+
+@pytest.mark.asyncio
+async def test_reencrypt_skips_current_rows_and_resumes_from_checkpoint(
+    db_engine: AsyncEngine, session: AsyncSession, tmp_path, rotate_secret_key
+):
+    rotate_secret_key()
+    await _seed(session, 3)
+    factory = async_sessionmaker(bind=db_engine, expire_on_commit=False)
+
+    # Already under the current key: nothing to rewrite
+    last_id, rewritten, skipped = await reencrypt_batch(0, 10, factory)
+    assert (rewritten, skipped) == (0, [])
+    assert last_id is not None
+
+    checkpoint = tmp_path / "checkpoint"
+    checkpoint.write_text(json.dumps({"last_id": last_id, "rewritten": 7}))
+    total = await reencrypt_tokens(
+        pause=0, checkpoint=str(checkpoint), session_factory=factory
+    )
+    assert total == 7
+
+
+@pytest.mark.asyncio
+async def test_reencrypt_skips_tokens_no_key_can_decrypt(
+    db_engine: AsyncEngine, session: AsyncSession, tmp_path, caplog, rotate_secret_key
+):
+    await _seed(session, 3)
+    # U1's token is under a key already dropped from PREVIOUS_SECRET_KEYS
+    lost_key = Fernet(Fernet.generate_key())
+    row = (
+        await session.execute(
+            select(GoogleCredentials).where(GoogleCredentials.user_id == "U1")
+        )
+    ).scalar_one()
+    row.refresh_token = lost_key.encrypt(b"refresh-1").decode()
+    await session.commit()
+    rotate_secret_key()
+    caplog.set_level(logging.INFO, logger="app.commands.reencrypt_tokens")
+
+    total = await reencrypt_tokens(
+        batch_size=2,
+        pause=0,
+        checkpoint=str(tmp_path / "checkpoint"),
+        session_factory=async_sessionmaker(bind=db_engine, expire_on_commit=False),
+    )
+
+    assert total == 2
+    assert "2 tokens rewritten, 1 skipped" in caplog.text
+    assert "could not be decrypted: U1" in caplog.text
@@ -21,3 +21,60 @@ async def test_database_connection():
         pytest.fail("app.db.session or get_db not found")
     except Exception as e:
         pytest.fail(f"Database connection failed: {str(e)}")
+
+
+def test_engine_options_from_settings():
+    from app.core.config import Settings
+    from app.db.session import engine_options
+
+    config = Settings(ENVIRONMENT="production", DB_POOL_SIZE=7, DB_MAX_OVERFLOW=3)
+    options = engine_options(config)
+    assert options["echo"] is False
+    assert (options["pool_size"], options["max_overflow"]) == (7, 3)
+    assert options["connect_args"]["statement_cache_size"] == 100
+
+    assert engine_options(Settings(ENVIRONMENT="local"))["echo"] is True
+    assert engine_options(Settings(ENVIRONMENT="local", DB_ECHO=False))["echo"] is False
+
+    pgbouncer = engine_options(Settings(DB_PGBOUNCER_MODE=True))["connect_args"]
+    assert pgbouncer["statement_cache_size"] == 0
+    assert pgbouncer["prepared_statement_cache_size"] == 0
+    assert pgbouncer["prepared_statement_name_func"]() != (
+        pgbouncer["prepared_statement_name_func"]()
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_reports_checkout_wait_and_usage():
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core.config import settings
+    from app.db.session import engine_options
+
+    options = {
+        **engine_options(settings),
+        "echo": False,
+        "pool_size": 1,
+        "max_overflow": 0,
+        "pool_timeout": 5,
+    }
+    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, **options)
+    try:
+
+        async def hold(seconds: float):
+            async with engine.connect() as conn:
+                in_use = engine.pool.stats()["checked_out"]
+                await conn.execute(text("SELECT pg_sleep(:s)"), {"s": seconds})
+                return in_use
+
+        assert await asyncio.gather(hold(0.2), hold(0)) == [1, 1]
+
+        stats = engine.pool.stats()
+        assert stats["checkouts"] == 2
+        assert stats["checked_out"] == 0
+        # The second checkout waited for the first connection to be returned
+        assert stats["wait_max"] >= 0.15
+    finally:
+        await engine.dispose()
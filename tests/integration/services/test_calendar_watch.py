@@ -0,0 +1,104 @@
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import GoogleApiError
+from app.db.models import SyncState, User
+from app.services.calendar_service import CalendarService
+
+
+@pytest.mark.asyncio
+async def test_watch_events_keeps_one_channel_per_calendar(session: AsyncSession):
+    session.add(User(slack_id="U1"))
+    session.add_all(
+        [
+            SyncState(
+                user_id="U1",
+                calendar_id="primary",
+                resource_id="old-primary",
+                channel_resource_id="res-primary",
+                sync_token="p-1",
+            ),
+            SyncState(
+                user_id="U1",
+                calendar_id="left@group",
+                resource_id="old-left",
+                channel_resource_id="res-left",
+            ),
+        ]
+    )
+    await session.commit()
+
+    client = Mock()
+    client.list_calendars = AsyncMock(
+        return_value=[
+            {"id": "u1@example.com", "primary": True, "accessRole": "owner"},
+            {"id": "team@group", "accessRole": "reader"},
+        ]
+    )
+    client.watch_events = AsyncMock(
+        side_effect=lambda calendar_id, body: {"resourceId": f"res-{calendar_id}"}
+    )
+    client.stop_channel = AsyncMock()
+
+    service = CalendarService(session)
+    with patch.object(service, "_get_client", AsyncMock(return_value=client)):
+        assert await service.watch_events("U1") is True
+
+    watched = [call.args[0] for call in client.watch_events.call_args_list]
+    assert watched == ["primary", "team@group"]
+    stopped = sorted(call.args for call in client.stop_channel.call_args_list)
+    assert stopped == [("old-left", "res-left"), ("old-primary", "res-primary")]
+
+    session.expire_all()
+    states = (
+        (await session.execute(select(SyncState).where(SyncState.user_id == "U1")))
+        .scalars()
+        .all()
+    )
+    by_calendar = {state.calendar_id: state for state in states}
+    assert set(by_calendar) == {"primary", "team@group"}
+    assert by_calendar["team@group"].channel_resource_id == "res-team@group"
+    # Re-watching starts each calendar over with an initial sync
+    assert by_calendar["primary"].sync_token == ""
+
+
+@pytest.mark.asyncio
+async def test_watch_events_keeps_calendars_when_list_fails(session: AsyncSession):
+    session.add(User(slack_id="U1"))
+    session.add_all(
+        [
+            SyncState(user_id="U1", calendar_id="primary", resource_id="old-primary"),
+            SyncState(
+                user_id="U1",
+                calendar_id="room@resource",
+                resource_id="old-room",
+                sync_token="r-1",
+            ),
+        ]
+    )
+    await session.commit()
+
+    client = Mock()
+    client.list_calendars = AsyncMock(side_effect=GoogleApiError(503, "Backend Error"))
+    client.watch_events = AsyncMock(
+        side_effect=lambda calendar_id, body: {"resourceId": f"res-{calendar_id}"}
+    )
+    client.stop_channel = AsyncMock()
+
+    service = CalendarService(session)
+    with patch.object(service, "_get_client", AsyncMock(return_value=client)):
+        assert await service.watch_events("U1") is True
+
+    # Both known calendars are renewed; none is treated as removed
+    watched = [call.args[0] for call in client.watch_events.call_args_list]
+    assert watched == ["primary", "room@resource"]
+
+    session.expire_all()
+    states = (
+        (await session.execute(select(SyncState).where(SyncState.user_id == "U1")))
+        .scalars()
+        .all()
+    )
+    assert sorted(state.calendar_id for state in states) == ["primary", "room@resource"]
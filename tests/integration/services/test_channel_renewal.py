@@ -0,0 +1,159 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock, patch
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.db.models import SyncState, User
+from app.services.calendar_service import CalendarService
+from app.services.channel_renewal import ChannelRenewalScheduler
+
+
+@pytest.mark.asyncio
+async def test_sweep_renews_only_channels_due(
+    db_engine: AsyncEngine, session: AsyncSession
+):
+    now = datetime.now(timezone.utc)
+    expirations = {
+        "U_SOON": now + timedelta(hours=1),
+        "U_EXPIRED": now - timedelta(hours=1),
+        "U_UNKNOWN": None,
+        "U_LATER": now + timedelta(days=6),
+    }
+    for slack_id, expiration in expirations.items():
+        session.add(User(slack_id=slack_id))
+        session.add(
+            SyncState(
+                user_id=slack_id, resource_id=f"ch-{slack_id}", expiration=expiration
+            )
+        )
+    await session.commit()
+
+    renewed = []
+
+    async def renewer(user_id: str, calendar_id: str) -> bool:
+        renewed.append(user_id)
+        return user_id != "U_EXPIRED"
+
+    scheduler = ChannelRenewalScheduler(
+        renewer=renewer,
+        session_factory=async_sessionmaker(bind=db_engine, expire_on_commit=False),
+        lead=86400,
+        batch_size=2,
+        concurrency=2,
+        jitter=0,
+    )
+
+    assert await scheduler.sweep() == 3
+    assert sorted(renewed) == ["U_EXPIRED", "U_SOON", "U_UNKNOWN"]
+    assert (scheduler.renewed, scheduler.failed) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_renewal_backs_off_until_it_succeeds(
+    db_engine: AsyncEngine, session: AsyncSession
+):
+    session.add(User(slack_id="U1"))
+    session.add(SyncState(user_id="U1", resource_id="ch-U1", expiration=None))
+    await session.commit()
+
+    outcomes = [False, False, True]
+    attempts = []
+
+    async def renewer(user_id: str, calendar_id: str) -> bool:
+        attempts.append(user_id)
+        return outcomes.pop(0)
+
+    scheduler = ChannelRenewalScheduler(
+        renewer=renewer,
+        session_factory=async_sessionmaker(bind=db_engine, expire_on_commit=False),
+        interval=300,
+        jitter=0,
+    )
+
+    async def backoff() -> tuple[int, float | None]:
+        session.expire_all()
+        state = await session.get(SyncState, 1)
+        if state.renewal_retry_at is None:
+            return state.renewal_failures, None
+        delay = state.renewal_retry_at - datetime.now(timezone.utc)
+        return state.renewal_failures, round(delay.total_seconds() / 60)
+
+    assert await scheduler.sweep() == 1
+    assert await backoff() == (1, 5)
+    # Backing off: the next sweep does not call Google
+    assert await scheduler.sweep() == 0
+
+    async def retry_now():
+        state = await session.get(SyncState, 1)
+        state.renewal_retry_at = datetime.now(timezone.utc)
+        await session.commit()
+
+    await retry_now()
+    assert await scheduler.sweep() == 1
+    assert await backoff() == (2, 10)
+
+    await retry_now()
+    assert await scheduler.sweep() == 1
+    assert await backoff() == (0, None)
+    assert attempts == ["U1"] * 3
+
+
+@pytest.mark.asyncio
+async def test_renew_watch_swaps_channel_and_keeps_sync_token(session: AsyncSession):
+    session.add(User(slack_id="U1"))
+    session.add(
+        SyncState(
+            user_id="U1",
+            resource_id="old-channel",
+            channel_resource_id="old-resource",
+            sync_token="sync-1",
+        )
+    )
+    await session.commit()
+
+    client = Mock()
+    client.watch_events = AsyncMock(
+        return_value={"resourceId": "new-resource", "expiration": "1767225600000"}
+    )
+    client.stop_channel = AsyncMock()
+
+    service = CalendarService(session)
+    with patch.object(service, "_get_client", AsyncMock(return_value=client)):
+        assert await service.renew_watch("U1") is True
+
+    new_channel = client.watch_events.call_args[0][1]["id"]
+    client.stop_channel.assert_awaited_once_with("old-channel", "old-resource")
+
+    session.expire_all()
+    sync_state = await session.get(SyncState, 1)
+    assert sync_state.resource_id == new_channel
+    assert sync_state.channel_resource_id == "new-resource"
+    assert sync_state.expiration == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert sync_state.sync_token == "sync-1"
+
+
+@pytest.mark.asyncio
+async def test_renew_watch_stops_new_channel_if_replaced_meanwhile(
+    session: AsyncSession,
+):
+    session.add(User(slack_id="U1"))
+    sync_state = SyncState(user_id="U1", resource_id="old-channel")
+    session.add(sync_state)
+    await session.commit()
+
+    async def watch_and_race(calendar_id, body):
+        # Another renewal (or a re-auth) wins while Google is answering
+        sync_state.resource_id = "someone-elses-channel"
+        await session.commit()
+        return {"resourceId": "new-resource"}
+
+    client = Mock()
+    client.watch_events = AsyncMock(side_effect=watch_and_race)
+    client.stop_channel = AsyncMock()
+
+    service = CalendarService(session)
+    with patch.object(service, "_get_client", AsyncMock(return_value=client)):
+        assert await service.renew_watch("U1") is False
+
+    new_channel = client.watch_events.call_args[0][1]["id"]
+    client.stop_channel.assert_awaited_once_with(new_channel, "new-resource")
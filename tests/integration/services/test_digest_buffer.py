@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.db.models import PendingNotification, User
+from app.services.digest import DigestBuffer
+
+
+def _event(n: int, **extra):
+    return {
+        "id": f"e{n}",
+        "status": "confirmed",
+        "summary": f"Standup #{n}",
+        "start": {"dateTime": "2026-03-02T10:00:00+09:00"},
+        "htmlLink": f"https://calendar/e{n}",
+        "attendees": [{"email": "someone@example.com"}],
+        **extra,
+    }
+
+
+@pytest.fixture
+def session_factory(db_engine: AsyncEngine):
+    return async_sessionmaker(bind=db_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def users(session: AsyncSession):
+    session.add_all([User(slack_id="U1"), User(slack_id="U2")])
+    await session.commit()
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def buffer(sent, session_factory):
+    async def sender(user_id, text, blocks):
+        sent.append((user_id, text, blocks))
+
+    return DigestBuffer(
+        sender=sender, window=0.01, max_items=3, session_factory=session_factory
+    )
+
+
+async def _commit_changes(session, buffer, user_id, events):
+    """Stage changes the way a sync does: in its transaction, then schedule."""
+    buffer.stage(session, user_id, events)
+    await session.commit()
+    buffer.schedule(user_id)
+
+
+async def _pending(session_factory) -> list[PendingNotification]:
+    async with session_factory() as session:
+        return list((await session.execute(select(PendingNotification))).scalars())
+
+
+@pytest.mark.asyncio
+async def test_changes_within_window_become_one_message(
+    buffer, sent, session, session_factory, users
+):
+    # A recurring-meeting edit arriving over two sync pages
+    await _commit_changes(session, buffer, "U1", [_event(n) for n in range(4)])
+    await _commit_changes(session, buffer, "U1", [_event(n) for n in range(4, 8)])
+    await _commit_changes(session, buffer, "U2", [_event(9, status="cancelled")])
+
+    await asyncio.sleep(0.1)
+
+    assert len(sent) == 2
+    by_user = {user_id: (text, blocks) for user_id, text, blocks in sent}
+    assert "8건" in by_user["U1"][0]
+    assert by_user["U2"][1] is None
+    assert buffer.stats()["sent"] == 2
+    assert buffer.depth == 0
+    assert await _pending(session_factory) == []
+
+
+@pytest.mark.asyncio
+async def test_latest_change_of_an_event_wins(buffer, sent, session, users):
+    await _commit_changes(session, buffer, "U1", [_event(1), _event(2)])
+    await _commit_changes(session, buffer, "U1", [_event(1, status="cancelled")])
+
+    await buffer.drain()
+
+    _, _, blocks = sent[0]
+    lines = [b["text"]["text"] for b in blocks if b["type"] == "section"][1:]
+    assert len(lines) == 2
+    assert lines[1].startswith("🗑️") and "Standup #1" in lines[1]
+
+
+@pytest.mark.asyncio
+async def test_drain_sends_before_window_closes(sent, session, session_factory, users):
+    async def sender(user_id, text, blocks):
+        sent.append(user_id)
+
+    buffer = DigestBuffer(
+        sender=sender, window=60, max_items=3, session_factory=session_factory
+    )
+    await _commit_changes(session, buffer, "U1", [_event(1)])
+
+    await buffer.drain()
+
+    assert sent == ["U1"]
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_changes_are_never_sent(buffer, sent, session, users):
+    buffer.stage(session, "U1", [_event(1)])
+    await session.rollback()
+    buffer.schedule("U1")
+
+    await buffer.drain()
+
+    assert sent == []
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_kept_and_retried(session, session_factory, users):
+    outcomes = [RuntimeError("slack down"), None]
+    sent = []
+
+    async def sender(user_id, text, blocks):
+        outcome = outcomes.pop(0)
+        if outcome:
+            raise outcome
+        sent.append((user_id, text))
+
+    buffer = DigestBuffer(
+        sender=sender, window=0, max_items=3, session_factory=session_factory
+    )
+    await _commit_changes(session, buffer, "U1", [_event(1)])
+    await asyncio.sleep(0.05)
+
+    # The change survives the failed send, with only the digest fields stored
+    (row,) = await _pending(session_factory)
+    assert (row.attempts, buffer.failed) == (1, 1)
+    assert "attendees" not in row.event
+
+    assert await buffer.retry_unsent() == 1
+    assert [(user_id, "Standup #1" in text) for user_id, text in sent] == [("U1", True)]
+    assert await _pending(session_factory) == []
+
+
+@pytest.mark.asyncio
+async def test_digest_is_dropped_after_max_attempts(session, session_factory, users):
+    async def sender(user_id, text, blocks):
+        raise RuntimeError("channel_not_found")
+
+    buffer = DigestBuffer(
+        sender=sender,
+        window=0,
+        max_items=3,
+        max_attempts=2,
+        session_factory=session_factory,
+    )
+    buffer.stage(session, "U1", [_event(1)])
+    await session.commit()
+
+    await buffer.retry_unsent()
+    assert len(await _pending(session_factory)) == 1
+    await buffer.retry_unsent()
+
+    assert await _pending(session_factory) == []
+    assert buffer.failed == 2
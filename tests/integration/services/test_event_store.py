@@ -0,0 +1,83 @@
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import CalendarEvent, User
+from app.services.event_store import EventStore
+
+
+def _event(event_id: str, etag: str, **extra):
+    return {
+        "id": event_id,
+        "etag": etag,
+        "status": "confirmed",
+        "summary": f"Meeting {event_id}",
+        "start": {"dateTime": "2026-03-02T10:00:00+09:00"},
+        "end": {"dateTime": "2026-03-02T11:00:00+09:00"},
+        "updated": "2026-03-01T00:00:00.000Z",
+        **extra,
+    }
+
+
+@pytest.mark.asyncio
+async def test_apply_page_skips_unchanged_etags(session: AsyncSession):
+    session.add(User(slack_id="U1"))
+    await session.commit()
+    store = EventStore(session)
+
+    changed = await store.apply_page(
+        "U1", "primary", [_event("e1", '"1"'), _event("e2", '"1"')]
+    )
+    await session.commit()
+    assert [item["id"] for item in changed] == ["e1", "e2"]
+
+    # e1 unchanged, e2 edited, e3 new
+    changed = await store.apply_page(
+        "U1",
+        "primary",
+        [
+            _event("e1", '"1"'),
+            _event("e2", '"2"', summary="Moved"),
+            _event("e3", '"1"'),
+        ],
+    )
+    await session.commit()
+    assert [item["id"] for item in changed] == ["e2", "e3"]
+
+    rows = {
+        row.event_id: row
+        for row in (await session.execute(select(CalendarEvent))).scalars()
+    }
+    assert set(rows) == {"e1", "e2", "e3"}
+    assert rows["e2"].summary == "Moved"
+    assert rows["e2"].etag == '"2"'
+    assert rows["e1"].start_at == datetime(2026, 3, 2, 1, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_apply_page_stores_all_day_and_cancelled_events(session: AsyncSession):
+    session.add(User(slack_id="U1"))
+    await session.commit()
+    store = EventStore(session)
+
+    await store.apply_page(
+        "U1",
+        "primary",
+        [
+            _event(
+                "e1", '"1"', start={"date": "2026-03-02"}, end={"date": "2026-03-03"}
+            ),
+            {"id": "e2", "etag": '"9"', "status": "cancelled"},
+        ],
+    )
+    await session.commit()
+
+    rows = {
+        row.event_id: row
+        for row in (await session.execute(select(CalendarEvent))).scalars()
+    }
+    assert rows["e1"].all_day is True
+    assert rows["e1"].start_at == datetime(2026, 3, 2, tzinfo=timezone.utc)
+    assert rows["e2"].status == "cancelled"
+    assert rows["e2"].start_at is None
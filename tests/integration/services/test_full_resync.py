@@ -0,0 +1,116 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import CalendarSyncError, GoogleApiError
+from app.db.models import CalendarEvent, SyncState, User
+from app.services.calendar_service import CalendarService
+
+
+def _mirrored(event_id: str, etag: str, end_at: datetime) -> CalendarEvent:
+    return CalendarEvent(
+        user_id="U1",
+        calendar_id="primary",
+        event_id=event_id,
+        etag=etag,
+        status="confirmed",
+        summary=f"Meeting {event_id}",
+        start_at=end_at - timedelta(hours=1),
+        end_at=end_at,
+    )
+
+
+def _listed(event_id: str, etag: str) -> dict:
+    return {
+        "id": event_id,
+        "etag": etag,
+        "status": "confirmed",
+        "summary": f"Meeting {event_id}",
+    }
+
+
+@pytest.mark.asyncio
+async def test_expired_token_resyncs_and_notifies_only_differences(
+    session: AsyncSession,
+):
+    now = datetime.now(timezone.utc)
+    session.add(User(slack_id="U1"))
+    await session.commit()
+    session.add(SyncState(user_id="U1", resource_id="chan", sync_token="dead"))
+    session.add_all(
+        [
+            _mirrored("kept", '"1"', now + timedelta(days=1)),
+            _mirrored("edited", '"1"', now + timedelta(days=2)),
+            _mirrored("gone", '"1"', now + timedelta(days=3)),
+            # Outside the resync window: not listed, but not deleted either
+            _mirrored("past", '"1"', now - timedelta(days=1)),
+        ]
+    )
+    await session.commit()
+
+    listing_calls = []
+
+    async def iter_event_pages(calendar_id, page_token=None, **params):
+        listing_calls.append(params)
+        yield {
+            "items": [_listed("kept", '"1"'), _listed("edited", '"2"')],
+            "nextPageToken": "p2",
+        }
+        yield {"items": [_listed("new", '"1"')], "nextSyncToken": "fresh"}
+
+    client = Mock()
+    client.batch_list_events = AsyncMock(
+        return_value=[GoogleApiError(410, "Sync token is no longer valid")]
+    )
+    client.iter_event_pages = iter_event_pages
+
+    service = CalendarService(session)
+    with patch.object(
+        service, "_get_client", AsyncMock(return_value=client)
+    ), patch.object(service, "_notify_events", AsyncMock()) as mock_notify:
+        await service.sync_events("U1")
+
+    notified = [
+        (item["id"], item["status"])
+        for call in mock_notify.await_args_list
+        for item in call.args[1]
+    ]
+    assert notified == [
+        ("edited", "confirmed"),
+        ("new", "confirmed"),
+        ("gone", "cancelled"),
+    ]
+    assert listing_calls[0]["timeMin"] and "syncToken" not in listing_calls[0]
+
+    session.expire_all()
+    sync_state = await session.get(SyncState, 1)
+    assert sync_state.sync_token == "fresh"
+    gone = await session.get(CalendarEvent, ("U1", "primary", "gone"))
+    past = await session.get(CalendarEvent, ("U1", "primary", "past"))
+    assert (gone.status, past.status) == ("cancelled", "confirmed")
+
+
+@pytest.mark.asyncio
+async def test_failed_resync_keeps_expired_token_for_retry(session: AsyncSession):
+    session.add(User(slack_id="U1"))
+    session.add(SyncState(user_id="U1", resource_id="chan", sync_token="dead"))
+    await session.commit()
+
+    async def iter_event_pages(calendar_id, page_token=None, **params):
+        raise GoogleApiError(503, "Backend Error")
+        yield
+
+    client = Mock()
+    client.batch_list_events = AsyncMock(
+        return_value=[GoogleApiError(410, "Sync token is no longer valid")]
+    )
+    client.iter_event_pages = iter_event_pages
+
+    service = CalendarService(session)
+    with patch.object(service, "_get_client", AsyncMock(return_value=client)):
+        with pytest.raises(CalendarSyncError):
+            await service.sync_events("U1")
+
+    session.expire_all()
+    assert (await session.get(SyncState, 1)).sync_token == "dead"
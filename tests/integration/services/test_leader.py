@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.leader import LeaderElector, lock_key
+
+
+def _elector(db_engine: AsyncEngine, runs: list[str], label: str) -> LeaderElector:
+    elector = LeaderElector(
+        "test-leader",
+        engine=db_engine,
+        renew_interval=0.05,
+        retry_interval=0.05,
+        enabled=True,
+    )
+
+    async def task():
+        runs.append(label)
+        await asyncio.Event().wait()
+
+    elector.register(task)
+    return elector
+
+
+async def _wait_for(condition, timeout: float = 2.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_lock_key_is_stable_signed_64_bit():
+    assert lock_key("panager-api") == lock_key("panager-api")
+    assert lock_key("panager-api") != lock_key("other")
+    assert -(2**63) <= lock_key("panager-api") < 2**63
+
+
+@pytest.mark.asyncio
+async def test_only_one_leader_and_fast_failover(db_engine: AsyncEngine):
+    runs: list[str] = []
+    first = _elector(db_engine, runs, "first")
+    second = _elector(db_engine, runs, "second")
+
+    first_task = asyncio.create_task(first.run())
+    await _wait_for(lambda: first.is_leader)
+    second_task = asyncio.create_task(second.run())
+    await asyncio.sleep(0.2)
+
+    assert not second.is_leader
+    assert runs == ["first"]
+
+    # Leader shuts down: the follower takes over within a retry interval
+    first_task.cancel()
+    await asyncio.gather(first_task, return_exceptions=True)
+    await _wait_for(lambda: second.is_leader)
+    assert runs == ["first", "second"]
+    assert not first.is_leader
+
+    second_task.cancel()
+    await asyncio.gather(second_task, return_exceptions=True)
+    assert not second.is_leader
+
+
+@pytest.mark.asyncio
+async def test_leader_steps_down_when_lock_connection_dies(db_engine: AsyncEngine):
+    runs: list[str] = []
+    elector = _elector(db_engine, runs, "leader")
+    task = asyncio.create_task(elector.run())
+    await _wait_for(lambda: elector.is_leader)
+    leader_tasks = list(elector._tasks)
+
+    # Kill the lock connection from the server side
+    async with db_engine.connect() as conn:
+        await conn.execute(
+            text(
+                "SELECT pg_terminate_backend(pid) FROM pg_locks "
+                "WHERE locktype = 'advisory' AND granted AND pid <> pg_backend_pid()"
+            )
+        )
+
+    # Steps down (cancelling its tasks), then wins the free lock again
+    await _wait_for(lambda: all(t.cancelled() for t in leader_tasks))
+    await _wait_for(lambda: elector.is_leader)
+    assert runs == ["leader", "leader"]
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,112 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.db.models import CalendarEvent, User
+from app.services.reminders import ReminderScheduler
+
+
+def _event(event_id: str, start_at: datetime, **extra) -> CalendarEvent:
+    return CalendarEvent(
+        user_id="U1",
+        calendar_id="primary",
+        event_id=event_id,
+        status="confirmed",
+        summary=f"Meeting {event_id}",
+        start_at=start_at,
+        end_at=start_at + timedelta(hours=1),
+        **extra,
+    )
+
+
+@pytest.fixture
+async def scheduler(db_engine: AsyncEngine):
+    sent = []
+
+    async def sender(user_id, reminder):
+        sent.append((user_id, reminder["summary"]))
+
+    scheduler = ReminderScheduler(
+        sender=sender,
+        session_factory=async_sessionmaker(bind=db_engine, expire_on_commit=False),
+        lead=600,
+        horizon=86400,
+    )
+    scheduler.sent = sent
+    return scheduler
+
+
+@pytest.mark.asyncio
+async def test_reminders_follow_synced_changes(
+    session: AsyncSession, scheduler: ReminderScheduler
+):
+    now = datetime.now(timezone.utc)
+    session.add(User(slack_id="U1"))
+    await session.commit()
+    session.add_all(
+        [
+            # Inside the lead time: due right away
+            _event("soon", now + timedelta(minutes=5)),
+            _event("later", now + timedelta(hours=2)),
+            _event("moved", now + timedelta(hours=3)),
+            _event("deleted", now + timedelta(minutes=8)),
+            _event("all-day", now + timedelta(hours=1), all_day=True),
+            _event("far", now + timedelta(days=3)),
+        ]
+    )
+    await session.commit()
+
+    assert await scheduler.extend() == 5
+    assert len(scheduler.reminders) == 4
+
+    # A sync moves one event into the lead time and deletes another
+    synced_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+    await session.execute(
+        update(CalendarEvent)
+        .where(CalendarEvent.event_id == "moved")
+        .values(start_at=now + timedelta(minutes=9), synced_at=synced_at)
+    )
+    await session.execute(
+        update(CalendarEvent)
+        .where(CalendarEvent.event_id == "deleted")
+        .values(status="cancelled", synced_at=synced_at)
+    )
+    await session.commit()
+    await scheduler.poll()
+
+    assert await scheduler.fire_due() == 2
+    assert sorted(scheduler.sent) == [("U1", "Meeting moved"), ("U1", "Meeting soon")]
+    assert ("U1", "primary", "later") in scheduler.reminders
+
+    # Re-synced without a time change (e.g. renamed): no second reminder
+    await session.execute(
+        update(CalendarEvent)
+        .where(CalendarEvent.event_id == "soon")
+        .values(summary="Renamed", synced_at=synced_at + timedelta(seconds=1))
+    )
+    await session.commit()
+    await scheduler.poll()
+    assert await scheduler.fire_due() == 0
+
+
+@pytest.mark.asyncio
+async def test_reminder_is_skipped_if_event_moved_before_poll(
+    session: AsyncSession, scheduler: ReminderScheduler
+):
+    now = datetime.now(timezone.utc)
+    session.add(User(slack_id="U1"))
+    await session.commit()
+    session.add(_event("soon", now + timedelta(minutes=5)))
+    await session.commit()
+    await scheduler.extend()
+
+    # Moved by a sync the scheduler has not polled yet
+    await session.execute(
+        update(CalendarEvent).values(start_at=now + timedelta(hours=5))
+    )
+    await session.commit()
+
+    assert await scheduler.fire_due() == 0
+    assert scheduler.sent == []
+    assert scheduler.skipped == 1
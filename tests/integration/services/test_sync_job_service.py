@@ -0,0 +1,218 @@
+import asyncio
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock, patch
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.exceptions import GoogleApiError
+from app.db.models import SyncJob, User
+from app.services.sync_job_service import SyncJobService
+
+
+@pytest.fixture
+def session_factory(db_engine: AsyncEngine):
+    return async_sessionmaker(bind=db_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def users(session: AsyncSession):
+    session.add_all([User(slack_id="U1"), User(slack_id="U2")])
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_keeps_one_pending_job_per_user(session: AsyncSession, users):
+    service = SyncJobService(session)
+
+    assert await service.enqueue("U1") is True
+    assert await service.enqueue("U1") is False
+    assert await service.enqueue("U2") is True
+
+    jobs = (await session.execute(select(SyncJob))).scalars().all()
+    assert sorted(job.user_id for job in jobs) == ["U1", "U2"]
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_locked_rows(session_factory, users):
+    async with session_factory() as session:
+        await SyncJobService(session).enqueue("U1")
+        await SyncJobService(session).enqueue("U2")
+
+    # Worker A holds its row lock in an open transaction
+    async with session_factory() as a, session_factory() as b:
+        locked = (
+            await a.execute(
+                select(SyncJob)
+                .where(SyncJob.user_id == "U1")
+                .with_for_update(skip_locked=True)
+            )
+        ).scalar_one()
+
+        # Worker B skips the locked row instead of waiting on it
+        job = await SyncJobService(b).claim()
+        assert job.user_id == "U2"
+        assert job.status == "running"
+        assert job.attempts == 1
+
+        assert locked.user_id == "U1"
+        assert await SyncJobService(b).claim() is None
+        await a.rollback()
+
+
+@pytest.mark.asyncio
+async def test_user_with_running_job_is_not_claimed_twice(session: AsyncSession, users):
+    service = SyncJobService(session)
+    await service.enqueue("U1")
+    first = await service.claim()
+
+    # A new change arrives while the first sync is running
+    await service.enqueue("U1")
+    assert await service.claim() is None
+
+    # The empty claim rolled back and expired `first` in this shared session
+    await session.refresh(first)
+    assert await service.complete(first) is True
+    second = await service.claim()
+    assert second.user_id == "U1"
+    assert second.id != first.id
+
+
+@pytest.mark.asyncio
+async def test_fail_retries_with_backoff_then_gives_up(session: AsyncSession, users):
+    service = SyncJobService(session)
+    await service.enqueue("U1")
+    job = await service.claim()
+
+    assert await service.fail(job, "boom") is True
+    await session.refresh(job)
+    assert job.status == "pending"
+    assert job.run_after > datetime.now(timezone.utc)
+    assert job.last_error == "boom"
+
+    job.run_after = datetime.now(timezone.utc)
+    await session.commit()
+    job = await service.claim()
+    with patch("app.services.sync_job_service.settings.SYNC_JOB_MAX_ATTEMPTS", 2):
+        assert await service.fail(job, "boom again") is True
+    await session.refresh(job)
+    assert job.status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_sync_and_deletes_job(session_factory, users):
+    from app import worker
+
+    async with session_factory() as session:
+        await SyncJobService(session).enqueue("U1")
+
+    with patch.object(worker, "SessionLocal", session_factory), patch.object(
+        worker.CalendarService, "sync_events", AsyncMock()
+    ) as mock_sync:
+        assert await worker.process_next_job() is True
+        assert await worker.process_next_job() is False
+
+    mock_sync.assert_awaited_once_with("U1")
+    async with session_factory() as session:
+        assert (await session.execute(select(SyncJob))).first() is None
+
+
+@pytest.mark.asyncio
+async def test_worker_reschedules_job_when_sync_fails(session_factory, users):
+    from app import worker
+
+    async with session_factory() as session:
+        await SyncJobService(session).enqueue("U1")
+
+    client = Mock()
+    client.batch_list_events = AsyncMock(
+        return_value=[GoogleApiError(503, "Backend Error")]
+    )
+    with patch.object(worker, "SessionLocal", session_factory), patch.object(
+        worker.CalendarService, "_get_client", AsyncMock(return_value=client)
+    ):
+        assert await worker.process_next_job() is True
+
+    async with session_factory() as session:
+        job = (await session.execute(select(SyncJob))).scalar_one()
+    assert job.status == "pending"
+    assert job.attempts == 1
+    assert job.last_error == "Sync failed for some calendars of U1"
+
+
+async def _expire_lease(session_factory, job_id: int) -> None:
+    """Age the job's lease past SYNC_JOB_STALE_AFTER, as a stalled worker would."""
+    async with session_factory() as session:
+        job = await session.get(SyncJob, job_id)
+        job.locked_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_requeued_job_is_not_completed_by_its_old_worker(session_factory, users):
+    async with session_factory() as session:
+        await SyncJobService(session).enqueue("U1")
+        job = await SyncJobService(session).claim()
+
+    await _expire_lease(session_factory, job.id)
+    async with session_factory() as session:
+        assert await SyncJobService(session).requeue_stale() == 1
+        # The old worker finishes late: the requeued row must survive
+        assert await SyncJobService(session).complete(job) is False
+        assert await SyncJobService(session).fail(job, "late") is False
+        assert await SyncJobService(session).heartbeat(job) is False
+
+        row = await session.get(SyncJob, job.id)
+        assert (row.status, row.last_error) == ("pending", "worker timed out")
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_long_sync_from_being_requeued(session_factory, users):
+    async with session_factory() as session:
+        await SyncJobService(session).enqueue("U1")
+        job = await SyncJobService(session).claim()
+
+    claimed_at = job.locked_at
+    with patch("app.services.sync_job_service.settings.SYNC_JOB_STALE_AFTER", 0.05):
+        await asyncio.sleep(0.1)
+        async with session_factory() as session:
+            assert await SyncJobService(session).heartbeat(job) is True
+            assert await SyncJobService(session).requeue_stale() == 0
+
+    assert job.locked_at > claimed_at
+    async with session_factory() as session:
+        assert await SyncJobService(session).complete(job) is True
+
+
+@pytest.mark.asyncio
+async def test_worker_abandons_sync_after_losing_its_lease(session_factory, users):
+    from app import worker
+
+    async with session_factory() as session:
+        await SyncJobService(session).enqueue("U1")
+
+    cancelled = asyncio.Event()
+
+    async def slow_sync(user_id):
+        # Stalls until another worker's reaper takes the job over
+        async with session_factory() as session:
+            job = (await session.execute(select(SyncJob))).scalar_one()
+        await _expire_lease(session_factory, job.id)
+        async with session_factory() as session:
+            await SyncJobService(session).requeue_stale()
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with patch.object(worker, "SessionLocal", session_factory), patch.object(
+        worker.CalendarService, "sync_events", side_effect=slow_sync
+    ), patch.object(worker.settings, "SYNC_JOB_HEARTBEAT_INTERVAL", 0.01):
+        assert await asyncio.wait_for(worker.process_next_job(), timeout=2) is True
+
+    assert cancelled.is_set()
+    async with session_factory() as session:
+        job = (await session.execute(select(SyncJob))).scalar_one()
+    assert job.status == "pending"
@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.db.models import GoogleCredentials, User
+from app.services.token_writeback import TokenWriteBack
+
+
+@pytest.mark.asyncio
+async def test_flush_persists_latest_token_per_user(
+    db_engine: AsyncEngine, session: AsyncSession
+):
+    for slack_id in ("U1", "U2"):
+        session.add(User(slack_id=slack_id))
+        session.add(
+            GoogleCredentials(
+                user_id=slack_id, access_token="old", refresh_token="refresh"
+            )
+        )
+    await session.commit()
+
+    writeback = TokenWriteBack(
+        session_factory=async_sessionmaker(bind=db_engine, expire_on_commit=False)
+    )
+    expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    writeback.record("U1", "stale", expires, refresh_token="refresh")
+    writeback.record("U1", "new-1", expires, refresh_token="refresh")
+    writeback.record("U2", "new-2", None, refresh_token="refresh")
+
+    assert await writeback.flush() == 2
+    assert writeback.pending == 0
+    assert await writeback.flush() == 0
+
+    session.expire_all()
+    rows = {
+        c.user_id: c
+        for c in (await session.execute(select(GoogleCredentials))).scalars()
+    }
+    assert rows["U1"].access_token == "new-1"
+    assert rows["U1"].expires_at == expires
+    assert rows["U2"].access_token == "new-2"
+
+
+@pytest.mark.asyncio
+async def test_flush_skips_tokens_of_a_replaced_grant(
+    db_engine: AsyncEngine, session: AsyncSession
+):
+    session.add(User(slack_id="U1"))
+    session.add(
+        GoogleCredentials(user_id="U1", access_token="old", refresh_token="grant-1")
+    )
+    await session.commit()
+
+    writeback = TokenWriteBack(
+        session_factory=async_sessionmaker(bind=db_engine, expire_on_commit=False)
+    )
+    # Refreshed from the first grant...
+    writeback.record("U1", "from-grant-1", None, refresh_token="grant-1")
+
+    # ...while the user re-authorized
+    creds = (await session.execute(select(GoogleCredentials))).scalar_one()
+    creds.access_token = "from-grant-2"
+    creds.refresh_token = "grant-2"
+    await session.commit()
+
+    await writeback.flush()
+
+    session.expire_all()
+    creds = (await session.execute(select(GoogleCredentials))).scalar_one()
+    assert (creds.access_token, creds.refresh_token) == ("from-grant-2", "grant-2")
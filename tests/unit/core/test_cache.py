@@ -0,0 +1,46 @@
+from app.core.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # Touch "a" so "b" becomes the least recently used entry
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_expiry():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=10, ttl=30, timer=timer)
+    cache.set("a", 1)
+
+    timer.now = 29
+    assert cache.get("a") == 1
+
+    timer.now = 30
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_pop_invalidates():
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    assert cache.get("a") is None
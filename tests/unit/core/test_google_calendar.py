@@ -0,0 +1,250 @@
+import asyncio
+import json
+from urllib.parse import quote_plus
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.core.exceptions import GoogleApiError
+from app.core.google_calendar import (
+    FIELD_PROFILES,
+    GoogleCalendarClient,
+    access_token_cache,
+)
+
+
+@pytest.fixture
+async def fake_google():
+    """
+    A tiny stand-in for the Google token and Calendar endpoints.
+    Only the token issued by the fake /token endpoint is accepted.
+    """
+    calls = []
+
+    async def token(request: web.Request):
+        form = await request.post()
+        calls.append(("token", form["refresh_token"]))
+        await asyncio.sleep(0.01)
+        return web.json_response({"access_token": "fresh-token", "expires_in": 3600})
+
+    async def list_events(request: web.Request):
+        calls.append(("list", dict(request.query)))
+        if request.headers["Authorization"] != "Bearer fresh-token":
+            return web.json_response({"error": {"code": 401}}, status=401)
+        if request.query.get("syncToken") == "stale":
+            return web.json_response(
+                {
+                    "error": {
+                        "code": 410,
+                        "message": "Sync token is no longer valid, a full sync is required.",
+                        "errors": [{"reason": "fullSyncRequired"}],
+                    }
+                },
+                status=410,
+            )
+        return web.json_response({"items": [{"id": "e1"}], "nextSyncToken": "tok"})
+
+    async def batch(request: web.Request):
+        """Answer each embedded events.list, in reverse order; unknown calendars 404."""
+        body = await request.text()
+        boundary = request.headers["Content-Type"].split("boundary=")[1]
+        lines = [
+            line
+            for line in body.split("\r\n")
+            if line.startswith(("Content-ID", "GET"))
+        ]
+        calls.append(("batch", [line for line in lines if line.startswith("GET")]))
+        parts = []
+        for content_id, request_line in zip(lines[::2], lines[1::2]):
+            index = content_id.split("<")[1].rstrip(">")
+            path = request_line.split()[1].split("?")[0]
+            calendar_id = path.split("/")[2]
+            if calendar_id == "gone%40group":
+                status, payload = (
+                    "404 Not Found",
+                    {"error": {"code": 404, "message": "Not Found"}},
+                )
+            else:
+                status, payload = "200 OK", {"items": [{"id": calendar_id}]}
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{index}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        text = "".join(reversed(parts)) + f"--{boundary}--\r\n"
+        return web.Response(
+            text=text, headers={"Content-Type": f"multipart/mixed; boundary={boundary}"}
+        )
+
+    async def stop(request: web.Request):
+        calls.append(("stop", await request.json()))
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post("/token", token)
+    app.router.add_get("/calendars/{calendar_id}/events", list_events)
+    app.router.add_post("/channels/stop", stop)
+    app.router.add_post("/batch", batch)
+
+    server = TestServer(app)
+    await server.start_server()
+    async with aiohttp.ClientSession() as http:
+        yield server, http, calls
+    await server.close()
+
+
+def _client(server, http, access_token="expired-token", **kwargs):
+    return GoogleCalendarClient(
+        access_token=access_token,
+        refresh_token="refresh-token",
+        **kwargs,
+        session=http,
+        base_url=str(server.make_url("")).rstrip("/"),
+        token_uri=str(server.make_url("/token")),
+        batch_url=str(server.make_url("/batch")),
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_events_refreshes_expired_token(fake_google):
+    server, http, calls = fake_google
+    client = _client(server, http)
+
+    result = await client.list_events("primary", singleEvents=True)
+
+    assert result["nextSyncToken"] == "tok"
+    assert client.access_token == "fresh-token"
+    assert client.expires_at is not None
+    assert [c[0] for c in calls] == ["list", "token", "list"]
+    assert calls[-1][1]["singleEvents"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_google_error_is_raised_with_status(fake_google):
+    server, http, _ = fake_google
+    client = _client(server, http, access_token="fresh-token")
+
+    with pytest.raises(GoogleApiError) as exc_info:
+        await client.list_events("primary", syncToken="stale")
+
+    assert exc_info.value.status == 410
+    assert exc_info.value.reason == "fullSyncRequired"
+    assert "Sync token is no longer valid" in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_stop_channel(fake_google):
+    server, http, calls = fake_google
+    client = _client(server, http, access_token="fresh-token")
+
+    await client.stop_channel("channel-1", "resource-1")
+
+    assert calls == [("stop", {"id": "channel-1", "resourceId": "resource-1"})]
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_refreshed_before_the_call(fake_google):
+    """A known-expired token is refreshed up front instead of failing with 401."""
+    server, http, calls = fake_google
+    client = _client(
+        server,
+        http,
+        access_token="old-token",
+        expires_at=datetime.now(timezone.utc) - timedelta(minutes=5),
+    )
+
+    await client.list_events("primary")
+
+    assert [c[0] for c in calls] == ["token", "list"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_request(fake_google):
+    server, http, calls = fake_google
+    refreshed = []
+    clients = [
+        _client(
+            server,
+            http,
+            access_token=None,
+            user_id="U-single-flight",
+            on_refresh=lambda *args: refreshed.append(args),
+        )
+        for _ in range(5)
+    ]
+
+    await asyncio.gather(*(client.list_events("primary") for client in clients))
+
+    assert [c[0] for c in calls].count("token") == 1
+    assert all(client.access_token == "fresh-token" for client in clients)
+    assert len(refreshed) == 1
+    assert refreshed[0][:2] == ("U-single-flight", "fresh-token")
+    assert access_token_cache.pop("U-single-flight")[0] == "fresh-token"
+
+
+@pytest.mark.asyncio
+async def test_batch_list_events_is_one_round_trip(fake_google):
+    server, http, calls = fake_google
+    client = _client(server, http, access_token="fresh-token")
+
+    results = await client.batch_list_events(
+        [
+            ("primary", {"singleEvents": True, "syncToken": "tok"}),
+            ("team@group", {"pageToken": None}),
+            ("gone@group", {}),
+        ]
+    )
+
+    assert [c[0] for c in calls] == ["batch"]
+    fields = "fields=" + quote_plus(FIELD_PROFILES["mirror"])
+    assert calls[0][1] == [
+        f"GET /calendars/primary/events?singleEvents=true&syncToken=tok&{fields} HTTP/1.1",
+        f"GET /calendars/team%40group/events?{fields} HTTP/1.1",
+        f"GET /calendars/gone%40group/events?{fields} HTTP/1.1",
+    ]
+    # Parts come back reordered; results follow the order of the calls
+    assert results[0] == {"items": [{"id": "primary"}]}
+    assert results[1] == {"items": [{"id": "team%40group"}]}
+    assert isinstance(results[2], GoogleApiError)
+    assert results[2].status == 404
+
+
+@pytest.mark.asyncio
+async def test_partial_gzip_response_is_measured():
+    """The field mask and gzip are requested; both body sizes are recorded."""
+    from app.core.metrics import google_response_bytes
+
+    seen = {}
+
+    async def list_events(request: web.Request):
+        seen.update(fields=request.query.get("fields"), headers=request.headers)
+        items = [{"id": f"e{i}", "summary": "Standup " * 20} for i in range(200)]
+        response = web.json_response({"items": items})
+        response.enable_compression()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/calendars/{calendar_id}/events", list_events)
+    server = TestServer(app)
+    await server.start_server()
+
+    def total(encoding):
+        return google_response_bytes.sum(operation="events.list", encoding=encoding)
+
+    wire_before, decoded_before = total("wire"), total("decoded")
+    try:
+        async with aiohttp.ClientSession() as http:
+            page = await _client(server, http, access_token="fresh-token").list_events()
+    finally:
+        await server.close()
+
+    assert len(page["items"]) == 200
+    assert seen["fields"] == FIELD_PROFILES["mirror"]
+    assert "gzip" in seen["headers"]["Accept-Encoding"]
+    assert "gzip" in seen["headers"]["User-Agent"]
+    wire, decoded = total("wire") - wire_before, total("decoded") - decoded_before
+    assert 0 < wire < decoded
@@ -0,0 +1,54 @@
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge_render_with_labels():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests", "Requests", ("status",))
+    depth = registry.gauge("depth", "Queue depth")
+
+    requests.inc(status="200")
+    requests.inc(2, status="200")
+    requests.inc(status='5"0')
+    depth.set(3)
+
+    assert requests.value(status="200") == 3
+    text = registry.render()
+    assert "# TYPE requests counter" in text
+    assert 'requests_total{status="200"} 3' in text
+    assert 'requests_total{status="5\\"0"} 1' in text
+    assert "# TYPE depth gauge\ndepth 3\n" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value)
+
+    assert latency.count() == 4
+    assert latency.sum() == pytest.approx(3.65)
+    text = registry.render()
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+
+
+def test_collectors_run_at_scrape_time_and_names_are_shared():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("pool", "Pool", ("stat",))
+    state = {"in_use": 1}
+
+    @registry.collector
+    def collect():
+        gauge.set(state["in_use"], stat="in_use")
+
+    state["in_use"] = 4
+    assert 'pool{stat="in_use"} 4' in registry.render()
+
+    assert registry.gauge("pool", "Pool", ("stat",)) is gauge
+    with pytest.raises(ValueError):
+        registry.counter("pool", "Pool")
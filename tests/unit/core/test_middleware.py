@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.middleware import RequestLoggingMiddleware
+
+
+def _app(**kwargs) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware, **kwargs)
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/hot")
+    async def hot():
+        return {"ok": True}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+def _access_records(caplog) -> list[dict]:
+    return [r.http for r in caplog.records if r.name == "app.core.middleware"]
+
+
+@pytest.mark.asyncio
+async def test_one_structured_record_and_process_time_header(caplog):
+    caplog.set_level(logging.INFO, logger="app.core.middleware")
+    async with AsyncClient(
+        transport=ASGITransport(app=_app(sample_rates={})), base_url="http://test"
+    ) as client:
+        response = await client.get("/ok?token=secret")
+
+    assert response.status_code == 200
+    assert float(response.headers["X-Process-Time"]) >= 0
+
+    records = _access_records(caplog)
+    assert len(records) == 1
+    assert records[0]["method"] == "GET"
+    assert records[0]["path"] == "/ok"  # no query string
+    assert records[0]["status"] == 200
+    assert records[0]["duration_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_sampled_route_is_logged_at_its_rate(caplog):
+    caplog.set_level(logging.INFO, logger="app.core.middleware")
+    app = _app(sample_rates={"/hot": 0.0})
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for _ in range(5):
+            await client.get("/hot")
+        await client.get("/ok")
+
+    assert [r["path"] for r in _access_records(caplog)] == ["/ok"]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_always_logged(caplog):
+    caplog.set_level(logging.INFO, logger="app.core.middleware")
+    app = _app(sample_rates={"/boom": 0.0})
+    async with AsyncClient(
+        transport=ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://test",
+    ) as client:
+        response = await client.get("/boom")
+
+    assert response.status_code == 500
+    records = _access_records(caplog)
+    assert len(records) == 1
+    assert records[0]["status"] == 500
+    assert "boom" in records[0]["error"]
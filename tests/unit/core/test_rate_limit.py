@@ -0,0 +1,45 @@
+import pytest
+
+from app.core.rate_limit import TokenBucket
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_reservations_queue_up_fifo():
+    timer = FakeTimer()
+    bucket = TokenBucket(rate=2, capacity=2, timer=timer)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # Burst used up: each next reservation waits one more token interval
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_refill_is_capped_at_capacity():
+    timer = FakeTimer()
+    bucket = TokenBucket(rate=1, capacity=2, timer=timer)
+    bucket.reserve()
+    bucket.reserve()
+
+    timer.now += 60
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_pause_blocks_until_retry_after():
+    timer = FakeTimer()
+    bucket = TokenBucket(rate=10, capacity=10, timer=timer)
+
+    bucket.pause(30)
+    assert bucket.reserve() == pytest.approx(30)
+
+    timer.now += 30
+    assert bucket.reserve() == 0
@@ -37,3 +37,56 @@ def test_encryption_same_value_different_output():
     enc2 = encrypt_token(token)
 
     assert enc1 != enc2
+
+
+@pytest.fixture
+def rotated_keys(monkeypatch):
+    """Switch SECRET_KEY to a new key, keeping the old one as a fallback."""
+    from cryptography.fernet import Fernet
+
+    from app.core import security
+    from app.core.config import settings
+
+    old_key = settings.SECRET_KEY
+    old_token = security.encrypt_token("refresh-under-old-key")
+
+    monkeypatch.setattr(settings, "SECRET_KEY", Fernet.generate_key().decode())
+    monkeypatch.setattr(settings, "PREVIOUS_SECRET_KEYS", old_key)
+    security._get_fernet.cache_clear()
+    security._get_primary_fernet.cache_clear()
+    security._decrypted_cache.clear()
+    yield old_token
+    security._get_fernet.cache_clear()
+    security._get_primary_fernet.cache_clear()
+    security._decrypted_cache.clear()
+
+
+def test_fernet_is_built_once():
+    from app.core.security import _get_fernet
+
+    assert _get_fernet() is _get_fernet()
+
+
+def test_decrypt_uses_cache():
+    from unittest.mock import patch
+
+    from app.core import security
+
+    encrypted = security.encrypt_token("cached-token")
+    assert security.decrypt_token(encrypted) == "cached-token"
+
+    with patch.object(security, "_get_fernet") as get_fernet:
+        assert security.decrypt_token(encrypted) == "cached-token"
+    get_fernet.assert_not_called()
+
+
+def test_previous_key_still_decrypts_and_rotates(rotated_keys):
+    from app.core.security import decrypt_token, is_current_key, rotate_token
+
+    old_token = rotated_keys
+    assert not is_current_key(old_token)
+    assert decrypt_token(old_token) == "refresh-under-old-key"
+
+    rotated = rotate_token(old_token)
+    assert is_current_key(rotated)
+    assert decrypt_token(rotated) == "refresh-under-old-key"
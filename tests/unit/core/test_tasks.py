@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from app.core.tasks import TaskTracker
+
+
+@pytest.mark.asyncio
+async def test_tracker_keeps_and_drains_tasks():
+    tracker = TaskTracker()
+    done = []
+
+    async def work(n: int):
+        await asyncio.sleep(0.01)
+        done.append(n)
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    for n in range(3):
+        tracker.spawn(work(n))
+    tracker.spawn(broken())
+    assert tracker.pending == 4
+
+    await tracker.drain()
+
+    assert sorted(done) == [0, 1, 2]
+    assert tracker.pending == 0
+    assert (tracker.started, tracker.failed) == (4, 1)
+
+
+@pytest.mark.asyncio
+async def test_drain_cancels_after_timeout():
+    tracker = TaskTracker()
+    task = tracker.spawn(asyncio.sleep(10))
+
+    await tracker.drain(timeout=0.01)
+
+    assert task.cancelled()
+    assert tracker.pending == 0
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.tracing import (
+    InMemoryExporter,
+    JsonlExporter,
+    Tracer,
+    current_traceparent,
+    format_traces,
+)
+
+
+@pytest.fixture
+def exporter():
+    return InMemoryExporter()
+
+
+@pytest.fixture
+def tracer(exporter):
+    return Tracer(exporter)
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks(tracer, exporter):
+    async def child():
+        with tracer.span("child"):
+            await asyncio.sleep(0)
+
+    with tracer.span("root", channel_id="ch-1") as root:
+        # Tasks copy the context, so spans inside them are children too
+        await asyncio.create_task(child())
+
+    child_span, root_span = exporter.spans
+    assert root_span is root
+    assert root_span.parent_id is None
+    assert root_span.attributes == {"channel_id": "ch-1"}
+    assert child_span.trace_id == root.trace_id
+    assert child_span.parent_id == root.span_id
+    assert root_span.duration_ns >= child_span.duration_ns > 0
+    assert current_traceparent() is None
+
+
+def test_traceparent_continues_remote_trace(tracer, exporter):
+    with tracer.span("api") as api:
+        traceparent = current_traceparent()
+    assert traceparent == api.traceparent
+
+    # e.g. the worker, in another process
+    with tracer.span("worker", traceparent=traceparent) as worker:
+        pass
+    assert worker.trace_id == api.trace_id
+    assert worker.parent_id == api.span_id
+
+    with tracer.span("fresh", traceparent="garbage") as fresh:
+        pass
+    assert fresh.trace_id != api.trace_id
+
+
+def test_errors_are_recorded(tracer, exporter):
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("boom")
+
+    assert "boom" in exporter.spans[0].error
+
+
+def test_jsonl_exporter_and_trace_printer(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonlExporter(str(path))
+    tracer = Tracer(exporter)
+
+    with tracer.span("webhook", message_number="7"):
+        with tracer.span("sync"):
+            pass
+    exporter.close()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [s["name"] for s in spans] == ["sync", "webhook"]
+
+    printed = format_traces(spans).splitlines()
+    assert printed[0].startswith(f"trace {spans[0]['trace_id']}")
+    assert printed[1].strip().startswith("webhook")
+    assert "message_number=7" in printed[1]
+    assert printed[2].startswith("    sync")
@@ -55,3 +55,27 @@ def test_sync_state_model_structure():
         assert sync.resource_id == "res_123"
     except ImportError:
         pytest.fail("app.db.models.SyncState not found")
+
+
+def test_lookup_columns_are_unique():
+    """
+    Webhook and sync lookups rely on unique indexes (migration 19d248334afb);
+    sync states are unique per calendar since 83df8794532a.
+    """
+    from sqlalchemy import UniqueConstraint
+    from app.db.models import GoogleCredentials, SyncState
+
+    def unique_columns(model):
+        return {
+            tuple(c.name for c in constraint.columns)
+            for constraint in model.__table__.constraints
+            if isinstance(constraint, UniqueConstraint)
+        } | {
+            tuple(c.name for c in index.columns)
+            for index in model.__table__.indexes
+            if index.unique
+        }
+
+    assert ("user_id",) in unique_columns(GoogleCredentials)
+    assert ("user_id", "calendar_id") in unique_columns(SyncState)
+    assert ("resource_id",) in unique_columns(SyncState)
@@ -1,5 +1,8 @@
+from datetime import datetime, timezone
+
+import aiohttp
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 
 def test_generate_auth_url():
@@ -16,7 +19,7 @@ def test_generate_auth_url():
     auth_service = AuthService()
 
     # We patch the actual google flow to avoid making network requests or needing real client secrets
-    with patch("app.services.user_service.Flow") as MockFlow:
+    with patch("google_auth_oauthlib.flow.Flow") as MockFlow:
         mock_flow_instance = MockFlow.from_client_config.return_value
         mock_flow_instance.authorization_url.return_value = (
             "https://accounts.google.com/o/oauth2/auth?foo=bar",
@@ -36,31 +39,64 @@ def test_generate_auth_url():
         )
 
 
-def test_exchange_code():
+@pytest.fixture
+async def fake_token_endpoint():
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    forms = []
+
+    async def token(request: web.Request):
+        form = dict(await request.post())
+        forms.append(form)
+        if form["code"] != "fake_auth_code":
+            return web.json_response({"error": "invalid_grant"}, status=400)
+        return web.json_response(
+            {
+                "access_token": "access_token_123",
+                "refresh_token": "refresh_token_123",
+                "expires_in": 3599,
+                "scope": "https://www.googleapis.com/auth/calendar.readonly",
+                "token_type": "Bearer",
+            }
+        )
+
+    app = web.Application()
+    app.router.add_post("/token", token)
+    server = TestServer(app)
+    await server.start_server()
+    async with aiohttp.ClientSession() as http:
+        yield str(server.make_url("/token")), http, forms
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_exchange_code(fake_token_endpoint):
     """
     Test exchanging the auth code for credentials.
     """
     from app.services.user_service import AuthService
 
+    token_uri, http, forms = fake_token_endpoint
     auth_service = AuthService()
     fake_code = "fake_auth_code"
 
-    with patch("app.services.user_service.Flow") as MockFlow:
-        mock_flow_instance = MockFlow.from_client_config.return_value
+    creds_data = await auth_service.exchange_code(
+        fake_code, session=http, token_uri=token_uri
+    )
 
-        # Mock fetch_token
-        mock_flow_instance.fetch_token.return_value = None
+    assert forms[0]["code"] == fake_code
+    assert forms[0]["grant_type"] == "authorization_code"
+    assert creds_data["access_token"] == "access_token_123"
+    assert creds_data["refresh_token"] == "refresh_token_123"
+    assert creds_data["expiry"] > datetime.now(timezone.utc)
 
-        # Mock credentials object returned by flow
-        mock_creds = MagicMock()
-        mock_creds.token = "access_token_123"
-        mock_creds.refresh_token = "refresh_token_123"
-        mock_creds.expiry = "2026-01-01T00:00:00Z"
 
-        mock_flow_instance.credentials = mock_creds
-
-        creds_data = auth_service.exchange_code(fake_code)
+@pytest.mark.asyncio
+async def test_exchange_code_rejected(fake_token_endpoint):
+    from app.core.exceptions import AuthError
+    from app.services.user_service import AuthService
 
-        mock_flow_instance.fetch_token.assert_called_once_with(code=fake_code)
-        assert creds_data["access_token"] == "access_token_123"
-        assert creds_data["refresh_token"] == "refresh_token_123"
+    token_uri, http, _ = fake_token_endpoint
+    with pytest.raises(AuthError):
+        await AuthService().exchange_code("bad", session=http, token_uri=token_uri)
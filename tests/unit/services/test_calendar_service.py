@@ -1,7 +1,19 @@
+import asyncio
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, Mock, patch
 import pytest
-from app.services.calendar_service import CalendarService
-from app.db.models import GoogleCredentials
+from app.services.calendar_service import CalendarService, ResyncLimiter
+from app.services.user_service import UserService
+from app.core.exceptions import GoogleApiError
+from app.core.google_calendar import access_token_cache, client_cache
+from app.db.models import GoogleCredentials, SyncState
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache():
+    client_cache.clear()
+    yield
+    client_cache.clear()
 
 
 @pytest.fixture
@@ -31,39 +43,385 @@ async def test_watch_events(calendar_service, mock_session):
     # Let's assume CalendarService uses UserService or queries directly?
     # In Phase 4, CalendarService was simple. We need to upgrade it.
 
-    # Mocking the session execute to return credentials
-    mock_result = Mock()
-    mock_result.scalars.return_value.first.return_value = mock_creds
-    mock_session.execute.return_value = mock_result
+    # Mocking the session execute to return credentials, then no SyncState yet
+    creds_result = Mock()
+    creds_result.scalars.return_value.first.return_value = mock_creds
+    state_result = Mock()
+    state_result.scalars.return_value.all.return_value = []
+    mock_session.execute.side_effect = [creds_result, state_result]
+    mock_session.add = Mock()
 
-    # Mock google_auth_oauthlib and googleapiclient
-    with patch("app.services.calendar_service.build") as mock_build, patch(
+    # Mock the async Google Calendar client
+    with patch(
+        "app.services.calendar_service.GoogleCalendarClient"
+    ) as MockClient, patch(
         "app.services.calendar_service.decrypt_token"
     ) as mock_decrypt:
         mock_decrypt.return_value = "decrypted_refresh_token"
 
-        mock_service = Mock()
-        mock_events = Mock()
-        mock_watch = Mock()
-
-        mock_build.return_value = mock_service
-        mock_service.events.return_value = mock_events
-        mock_events.watch.return_value = mock_watch
-        mock_watch.execute.return_value = {
-            "kind": "api#channel",
-            "id": "new-resource-id",
-            "resourceId": "resource-id-from-google",
-            "resourceUri": "https://...",
-        }
+        mock_client = MockClient.return_value
+        mock_client.list_calendars = AsyncMock(return_value=[])
+        mock_client.watch_events = AsyncMock(
+            return_value={
+                "kind": "api#channel",
+                "id": "new-resource-id",
+                "resourceId": "resource-id-from-google",
+                "resourceUri": "https://...",
+                "expiration": "1767225600000",
+            }
+        )
 
         # when
         result = await calendar_service.watch_events(slack_id)
 
         # then
         assert result is True
+        MockClient.assert_called_once()
+        client_kwargs = MockClient.call_args.kwargs
+        assert client_kwargs["access_token"] == "fake_access_token"
+        assert client_kwargs["refresh_token"] == "decrypted_refresh_token"
+        assert client_kwargs["user_id"] == slack_id
         # Verify watch was called with correct parameters
-        mock_events.watch.assert_called()
-        call_args = mock_events.watch.call_args[1]
-        assert call_args["calendarId"] == "primary"
-        assert call_args["body"]["type"] == "web_hook"
+        mock_client.watch_events.assert_awaited_once()
+        calendar_id, body = mock_client.watch_events.call_args[0]
+        assert calendar_id == "primary"
+        assert body["type"] == "web_hook"
         # Verification of public URL is important in prod, but mocked here.
+
+        sync_state = mock_session.add.call_args[0][0]
+        assert sync_state.resource_id == body["id"]
+        assert sync_state.channel_resource_id == "resource-id-from-google"
+        assert sync_state.expiration == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_get_client_is_cached_until_credentials_change(
+    calendar_service, mock_session
+):
+    """
+    The per-user client is reused across syncs and dropped when
+    UserService.save_credentials stores new tokens.
+    """
+    slack_id = "U12345"
+    mock_creds = Mock(spec=GoogleCredentials)
+    mock_creds.access_token = "fake_access_token"
+    mock_creds.refresh_token = "fake_refresh_token"
+
+    mock_result = Mock()
+    mock_result.scalars.return_value.first.return_value = mock_creds
+    mock_result.scalar_one_or_none.return_value = Mock()
+    mock_session.execute.return_value = mock_result
+    mock_session.add = Mock()
+
+    with patch("app.services.calendar_service.decrypt_token") as mock_decrypt:
+        mock_decrypt.return_value = "decrypted_refresh_token"
+
+        first = await calendar_service._get_client(slack_id)
+        second = await calendar_service._get_client(slack_id)
+
+        assert first is second
+        assert mock_decrypt.call_count == 1
+
+        await UserService(mock_session).save_credentials(
+            slack_id, {"access_token": "new_access_token"}
+        )
+        third = await calendar_service._get_client(slack_id)
+
+        assert third is not first
+        assert mock_decrypt.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_client_is_rebuilt_after_reauth_in_another_process(
+    calendar_service, mock_session
+):
+    """
+    A client cached by the worker is dropped, with its access token, once
+    the stored refresh token changes even though save_credentials ran elsewhere.
+    """
+    slack_id = "U12345"
+    mock_creds = Mock(spec=GoogleCredentials)
+    mock_creds.access_token = "new_access_token"
+    mock_creds.refresh_token = "old_ciphertext"
+    mock_creds.expires_at = None
+
+    mock_result = Mock()
+    mock_result.scalars.return_value.first.return_value = mock_creds
+    mock_session.execute.return_value = mock_result
+
+    with patch("app.services.calendar_service.decrypt_token") as mock_decrypt:
+        mock_decrypt.return_value = "decrypted_refresh_token"
+
+        first = await calendar_service._get_client(slack_id)
+        access_token_cache.set(slack_id, ("stale_access_token", None))
+
+        mock_creds.refresh_token = "new_ciphertext"
+        second = await calendar_service._get_client(slack_id)
+
+    assert second is not first
+    assert mock_decrypt.call_count == 2
+    assert second.access_token == "new_access_token"
+    assert slack_id not in access_token_cache
+
+
+def _pages(*pages):
+    """
+    Build a fake batch_list_events serving one calendar's pages in order,
+    recording the arguments of every call.
+    """
+    calls = []
+    remaining = list(pages)
+
+    async def batch_list_events(batch):
+        results = []
+        for calendar_id, params in batch:
+            calls.append({"calendar_id": calendar_id, **params})
+            results.append(remaining.pop(0))
+        return results
+
+    return batch_list_events, calls
+
+
+@pytest.mark.asyncio
+async def test_sync_events_streams_pages_and_checkpoints(
+    calendar_service, mock_session
+):
+    """
+    Every page is notified and checkpointed before the next one;
+    the sync token is taken from the last page only.
+    """
+    sync_state = SyncState(user_id="U12345", resource_id="chan", sync_token="tok-1")
+    mock_result = Mock()
+    mock_result.scalars.return_value = [sync_state]
+    mock_session.execute.return_value = mock_result
+
+    checkpoints = []
+    mock_session.commit.side_effect = lambda: checkpoints.append(
+        (sync_state.page_token, sync_state.sync_token)
+    )
+
+    batch_list_events, calls = _pages(
+        {"items": [{"id": "e1"}], "nextPageToken": "page-2"},
+        {"items": [{"id": "e2"}], "nextSyncToken": "tok-2"},
+    )
+    mock_client = Mock()
+    mock_client.batch_list_events = batch_list_events
+
+    with patch.object(
+        calendar_service, "_get_client", AsyncMock(return_value=mock_client)
+    ), patch.object(
+        calendar_service, "_notify_events", AsyncMock()
+    ) as mock_notify, patch(
+        "app.services.calendar_service.EventStore.apply_page",
+        AsyncMock(side_effect=lambda user_id, calendar_id, items: items),
+    ):
+        await calendar_service.sync_events("U12345")
+
+    assert calls[0]["syncToken"] == "tok-1"
+    assert calls[0]["pageToken"] is None
+    assert calls[1]["pageToken"] == "page-2"
+    assert checkpoints == [("page-2", "tok-1"), (None, "tok-2")]
+    assert mock_notify.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_events_resumes_from_page_checkpoint(calendar_service, mock_session):
+    sync_state = SyncState(
+        user_id="U12345",
+        resource_id="chan",
+        sync_token="",
+        page_token="page-7",
+        page_time_min="2026-03-02T01:00:00Z",
+    )
+    mock_result = Mock()
+    mock_result.scalars.return_value = [sync_state]
+    mock_session.execute.return_value = mock_result
+
+    batch_list_events, calls = _pages({"items": [{"id": "e1"}], "nextSyncToken": "tok"})
+    mock_client = Mock()
+    mock_client.batch_list_events = batch_list_events
+
+    with patch.object(
+        calendar_service, "_get_client", AsyncMock(return_value=mock_client)
+    ), patch.object(
+        calendar_service, "_notify_events", AsyncMock()
+    ) as mock_notify, patch(
+        "app.services.calendar_service.EventStore.apply_page",
+        AsyncMock(side_effect=lambda user_id, calendar_id, items: items),
+    ):
+        await calendar_service.sync_events("U12345")
+
+    # Initial sync resumed in its original time window, no notifications
+    assert calls[0]["pageToken"] == "page-7"
+    assert calls[0]["timeMin"] == "2026-03-02T01:00:00Z"
+    mock_notify.assert_not_awaited()
+    assert (sync_state.page_token, sync_state.page_time_min) == (None, None)
+    assert sync_state.sync_token == "tok"
+
+
+@pytest.mark.asyncio
+async def test_initial_sync_checkpoints_its_window_with_the_page(
+    calendar_service, mock_session
+):
+    sync_state = SyncState(user_id="U12345", resource_id="chan", sync_token="")
+    mock_result = Mock()
+    mock_result.scalars.return_value = [sync_state]
+    mock_session.execute.return_value = mock_result
+
+    checkpoints = []
+    mock_session.commit.side_effect = lambda: checkpoints.append(
+        (sync_state.page_token, sync_state.page_time_min)
+    )
+
+    batch_list_events, calls = _pages(
+        {"items": [{"id": "e1"}], "nextPageToken": "page-2"},
+        {"items": [{"id": "e2"}], "nextSyncToken": "tok"},
+    )
+    mock_client = Mock()
+    mock_client.batch_list_events = batch_list_events
+
+    with patch.object(
+        calendar_service, "_get_client", AsyncMock(return_value=mock_client)
+    ), patch(
+        "app.services.calendar_service.EventStore.apply_page",
+        AsyncMock(side_effect=lambda user_id, calendar_id, items: items),
+    ):
+        await calendar_service.sync_events("U12345")
+
+    time_min = calls[0]["timeMin"]
+    assert calls[1]["timeMin"] == time_min
+    assert checkpoints == [("page-2", time_min), (None, None)]
+
+
+def test_initial_sync_checkpoint_without_window_restarts():
+    sync_state = SyncState(sync_token="", page_token="page-7", calendar_id="primary")
+
+    list_args, is_initial_sync = CalendarService._list_args(sync_state)
+
+    assert is_initial_sync
+    assert list_args["timeMin"].endswith("Z")
+    assert sync_state.page_token is None
+
+
+@pytest.mark.asyncio
+async def test_sync_events_batches_calendars_with_own_tokens(
+    calendar_service, mock_session
+):
+    """
+    All calendars are fetched in one batch per round; each keeps its own
+    sync token, and an expired token sends only its own calendar to a resync.
+    """
+    primary = SyncState(
+        user_id="U12345", calendar_id="primary", resource_id="c1", sync_token="p-1"
+    )
+    team = SyncState(
+        user_id="U12345", calendar_id="team@group", resource_id="c2", sync_token="t-1"
+    )
+    room = SyncState(
+        user_id="U12345",
+        calendar_id="room@resource",
+        resource_id="c3",
+        sync_token="r-1",
+    )
+    mock_result = Mock()
+    mock_result.scalars.return_value = [primary, team, room]
+    mock_session.execute.return_value = mock_result
+
+    rounds = []
+
+    async def batch_list_events(batch):
+        rounds.append(
+            [(calendar_id, params["pageToken"]) for calendar_id, params in batch]
+        )
+        results = []
+        for calendar_id, params in batch:
+            if calendar_id == "primary" and params["pageToken"] is None:
+                results.append({"items": [{"id": "e1"}], "nextPageToken": "p-page-2"})
+            elif calendar_id == "primary":
+                results.append({"items": [{"id": "e2"}], "nextSyncToken": "p-2"})
+            elif calendar_id == "team@group":
+                results.append({"items": [{"id": "e3"}], "nextSyncToken": "t-2"})
+            else:
+                results.append(GoogleApiError(410, "Sync token is no longer valid"))
+        return results
+
+    mock_client = Mock()
+    mock_client.batch_list_events = batch_list_events
+    applied = []
+
+    async def apply_page(user_id, calendar_id, items):
+        applied.append((calendar_id, [item["id"] for item in items]))
+        return items
+
+    with patch.object(
+        calendar_service, "_get_client", AsyncMock(return_value=mock_client)
+    ), patch.object(
+        calendar_service, "_notify_events", AsyncMock()
+    ) as mock_notify, patch(
+        "app.services.calendar_service.EventStore.apply_page",
+        AsyncMock(side_effect=apply_page),
+    ), patch.object(
+        calendar_service, "_full_resync", AsyncMock(return_value=0)
+    ) as mock_resync:
+        await calendar_service.sync_events("U12345")
+
+    assert rounds == [
+        [("primary", None), ("team@group", None), ("room@resource", None)],
+        [("primary", "p-page-2")],
+    ]
+    assert applied == [
+        ("primary", ["e1"]),
+        ("team@group", ["e3"]),
+        ("primary", ["e2"]),
+    ]
+    assert (primary.sync_token, team.sync_token, room.sync_token) == (
+        "p-2",
+        "t-2",
+        "r-1",
+    )
+    mock_resync.assert_awaited_once_with(mock_client, room)
+    assert mock_notify.await_count == 3
+    assert mock_session.commit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_discover_calendars_skips_unreadable_calendars(calendar_service):
+    client = Mock()
+    client.list_calendars = AsyncMock(
+        return_value=[
+            {"id": "me@example.com", "primary": True, "accessRole": "owner"},
+            {"id": "team@group", "accessRole": "writer"},
+            {"id": "room@resource", "accessRole": "reader"},
+            {"id": "boss@example.com", "accessRole": "freeBusyReader"},
+            {"id": "old@group", "accessRole": "reader", "hidden": True},
+        ]
+    )
+
+    assert await calendar_service.discover_calendars(client) == [
+        "primary",
+        "team@group",
+        "room@resource",
+    ]
+
+    client.list_calendars = AsyncMock(side_effect=GoogleApiError(403, "forbidden"))
+    assert await calendar_service.discover_calendars(client) is None
+
+
+@pytest.mark.asyncio
+async def test_resync_limiter_caps_total_and_per_user_concurrency():
+    limiter = ResyncLimiter(concurrency=2)
+    active: list[str] = []
+    peaks = {"total": 0, "per_user": 0}
+
+    async def resync(user_id: str):
+        async with limiter.slot(user_id):
+            active.append(user_id)
+            peaks["total"] = max(peaks["total"], len(active))
+            peaks["per_user"] = max(peaks["per_user"], active.count(user_id))
+            await asyncio.sleep(0.01)
+            active.remove(user_id)
+
+    await asyncio.gather(*(resync(user) for user in ["U1", "U1", "U1", "U2", "U3"]))
+
+    assert peaks == {"total": 2, "per_user": 1}
+    assert limiter._users == {}
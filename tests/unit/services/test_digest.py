@@ -0,0 +1,33 @@
+from app.services.digest import build_digest
+
+
+def _event(n: int, **extra):
+    return {
+        "id": f"e{n}",
+        "status": "confirmed",
+        "summary": f"Standup #{n}",
+        "start": {"dateTime": "2026-03-02T10:00:00+09:00"},
+        "htmlLink": f"https://calendar/e{n}",
+        **extra,
+    }
+
+
+def test_digest_without_overflow_has_no_more_line():
+    _, blocks = build_digest([_event(1), _event(2)], max_items=3)
+    assert blocks[-1]["type"] == "section"
+
+
+def test_digest_lists_first_items_and_counts_the_rest():
+    text, blocks = build_digest([_event(n) for n in range(8)], max_items=3)
+
+    assert "8건" in text
+    listed = [b for b in blocks if b["type"] == "section"][1:]
+    assert len(listed) == 3
+    assert blocks[-1]["elements"][0]["text"] == "+5 more"
+
+
+def test_single_change_keeps_plain_message():
+    text, blocks = build_digest([_event(9, status="cancelled")], max_items=3)
+
+    assert text == "🗑️ 일정이 삭제되었습니다: *Standup #9*"
+    assert blocks is None
@@ -0,0 +1,34 @@
+import random
+
+from app.services.reminders import ReminderHeap
+
+
+def test_heap_fires_in_order_and_skips_cancelled_and_moved():
+    heap = ReminderHeap()
+    heap.schedule("a", 30, "A")
+    heap.schedule("b", 10, "B")
+    heap.schedule("c", 20, "C")
+    heap.cancel("c")
+    # Moved later: the old entry at 10 is stale
+    heap.schedule("b", 40, "B2")
+
+    assert len(heap) == 2
+    assert heap.next_at() == 30
+    assert heap.pop_due(35) == [("a", "A")]
+    assert heap.pop_due(35) == []
+    assert heap.pop_due(40) == [("b", "B2")]
+    assert len(heap) == 0 and heap.next_at() is None
+
+
+def test_heap_stays_bounded_under_churn():
+    heap = ReminderHeap()
+    rng = random.Random(0)
+    for n in range(20000):
+        # Keep rescheduling a small set of events
+        heap.schedule(n % 100, rng.random() * 1000, n)
+
+    assert len(heap) == 100
+    assert len(heap._heap) <= 2 * 100 + 1024 + 1
+    fired = heap.pop_due(1000)
+    assert len(fired) == 100
+    assert len({key for key, _ in fired}) == 100
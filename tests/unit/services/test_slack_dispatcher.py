@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from slack_sdk.errors import SlackApiError
+
+from app.services.slack_dispatcher import SlackDispatcher
+
+
+def _rate_limited(retry_after: str) -> SlackApiError:
+    response = MagicMock()
+    response.status_code = 429
+    response.headers = {"retry-after": retry_after}
+    return SlackApiError("ratelimited", response)
+
+
+@pytest.mark.asyncio
+async def test_retries_after_429_with_retry_after():
+    dispatcher = SlackDispatcher(concurrency=2, max_retries=3)
+    send = AsyncMock(side_effect=[_rate_limited("7"), {"ok": True}])
+
+    with patch("app.services.slack_dispatcher.asyncio.sleep") as mock_sleep:
+        response = await dispatcher.call(
+            "chat.postMessage", send, channel="U1", text="hi"
+        )
+
+    assert response == {"ok": True}
+    assert send.await_count == 2
+    # The retry waited for the server-provided Retry-After
+    assert mock_sleep.await_args.args[0] == pytest.approx(7, abs=0.1)
+    stats = dispatcher.stats()
+    assert stats["sent"] == 1
+    assert stats["rate_limited"] == 1
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    dispatcher = SlackDispatcher(concurrency=2, max_retries=1)
+    send = AsyncMock(side_effect=_rate_limited("1"))
+
+    with patch("app.services.slack_dispatcher.asyncio.sleep"):
+        with pytest.raises(SlackApiError):
+            await dispatcher.call("chat.postMessage", send, channel="U1", text="hi")
+
+    assert send.await_count == 2
+    assert dispatcher.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_same_channel_is_paced_other_channels_are_not():
+    dispatcher = SlackDispatcher(concurrency=10)
+    send = AsyncMock(return_value={"ok": True})
+
+    with patch("app.services.slack_dispatcher.asyncio.sleep") as mock_sleep:
+        await dispatcher.call("chat.postMessage", send, channel="U1", text="1")
+        await dispatcher.call("chat.postMessage", send, channel="U2", text="1")
+        assert mock_sleep.await_count == 0
+
+        # Second message to U1 within the same second waits for its channel bucket
+        await dispatcher.call("chat.postMessage", send, channel="U1", text="2")
+        assert mock_sleep.await_count == 1
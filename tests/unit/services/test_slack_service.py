@@ -39,3 +39,16 @@ async def test_send_dm():
     mock_app.client.chat_postMessage.assert_awaited_once_with(
         channel=user_id, text=text
     )
+
+
+@pytest.mark.asyncio
+async def test_send_dm_with_blocks():
+    mock_app = MagicMock()
+    mock_app.client.chat_postMessage = AsyncMock(return_value={"ok": True})
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": "*hi*"}}]
+
+    await SlackService(mock_app).send_dm(user_id="U12345", text="hi", blocks=blocks)
+
+    mock_app.client.chat_postMessage.assert_awaited_once_with(
+        channel="U12345", text="hi", blocks=blocks
+    )
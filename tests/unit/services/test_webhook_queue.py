@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.services.webhook_queue import WebhookQueue
+
+
+@pytest.mark.asyncio
+async def test_notifications_within_window_are_coalesced():
+    runs = []
+
+    async def runner(user_id: str):
+        runs.append(user_id)
+
+    queue = WebhookQueue(runner=runner, window=0.01)
+
+    assert queue.submit("channel-1", "U1") is True
+    assert queue.submit("channel-1", "U1") is False
+    assert queue.submit("channel-1", "U1") is False
+    assert queue.submit("channel-2", "U2") is True
+    assert queue.depth == 2
+
+    await queue.drain()
+
+    assert sorted(runs) == ["U1", "U2"]
+    assert queue.depth == 0
+    assert queue.stats()["coalesced"] == 2
+    assert queue.coalescing_ratio == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_notification_during_running_sync_schedules_one_follow_up():
+    started = asyncio.Event()
+    release = asyncio.Event()
+    runs = []
+
+    async def runner(user_id: str):
+        runs.append(user_id)
+        if len(runs) == 1:
+            started.set()
+            await release.wait()
+
+    queue = WebhookQueue(runner=runner, window=0)
+    queue.submit("channel-1", "U1")
+    await started.wait()
+
+    # Two notifications while the first sync is running -> one extra pass
+    assert queue.submit("channel-1", "U1") is True
+    assert queue.submit("channel-1", "U1") is False
+    release.set()
+
+    await queue.drain()
+    assert runs == ["U1", "U1"]
+
+
+@pytest.mark.asyncio
+async def test_runner_failure_is_isolated():
+    async def runner(user_id: str):
+        raise RuntimeError("boom")
+
+    queue = WebhookQueue(runner=runner, window=0)
+    queue.submit("channel-1", "U1")
+    await queue.drain()
+
+    assert queue.failed == 1
+    assert queue.depth == 0
@@ -0,0 +1,32 @@
+import asyncio
+import signal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app import slack_worker
+
+
+@pytest.mark.asyncio
+async def test_slack_worker_closes_socket_on_sigterm():
+    loop = asyncio.get_running_loop()
+    with patch.object(
+        slack_worker, "AsyncSocketModeHandler"
+    ) as MockHandler, patch.object(loop, "add_signal_handler") as add_signal_handler:
+        handler = MockHandler.return_value
+        handler.connect_async = AsyncMock()
+        handler.close_async = AsyncMock()
+
+        task = asyncio.create_task(slack_worker.main())
+        await asyncio.sleep(0.01)
+        handler.connect_async.assert_awaited_once()
+        handler.close_async.assert_not_awaited()
+
+        # Run the SIGTERM handler main() registered, without signalling pytest
+        handlers = {
+            call.args[0]: call.args[1] for call in add_signal_handler.call_args_list
+        }
+        handlers[signal.SIGTERM]()
+        await asyncio.wait_for(task, timeout=1)
+
+    handler.close_async.assert_awaited_once()
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+# Imported lazily, on the code paths that need them
+LAZY_MODULES = (
+    "slack_bolt",
+    "slack_sdk",
+    "google_auth_oauthlib",
+)
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed_ms = (time.perf_counter() - start) * 1000
+loaded = [m for m in {LAZY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"ms": elapsed_ms, "loaded": loaded}}))
+"""
+
+
+def _import_app_main() -> dict:
+    """Import app.main in a fresh interpreter, as a cold API start would."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ.copy(),
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_app_main_does_not_import_heavy_clients():
+    assert _import_app_main()["loaded"] == []
+
+
+def test_app_main_import_time_within_budget():
+    budget_ms = float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", "2000"))
+    # Best of three, so one noisy run on a busy machine does not fail the build
+    best_ms = min(_import_app_main()["ms"] for _ in range(3))
+    assert (
+        best_ms <= budget_ms
+    ), f"import app.main took {best_ms:.0f}ms, budget is {budget_ms:.0f}ms"